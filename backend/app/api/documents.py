@@ -1,13 +1,25 @@
 """Documents API Endpoint."""
+import asyncio
+import json
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from typing import List, Optional
-
-from app.rag.ingestion import get_indexed_documents, ingest_pdfs
+from typing import Any, Dict, List, Optional
+
+from app.rag.ingestion import get_indexed_documents
+from app.rag.ingestion_jobs import (
+    get_ingestion_job,
+    has_active_ingestion_job,
+    list_ingestion_jobs,
+    start_ingestion_job,
+)
 from app.rag.vector_store import get_collection_stats, clear_collection
 
 router = APIRouter()
 
+# Seconds between checks for new progress events in the SSE stream
+EVENT_POLL_INTERVAL = 0.5
+
 
 class DocumentInfo(BaseModel):
     """Information about an indexed document."""
@@ -28,13 +40,17 @@ class IngestRequest(BaseModel):
     clear_existing: Optional[bool] = False
 
 
-class IngestResponse(BaseModel):
-    """Response for ingestion endpoint."""
-    success: bool
-    message: str
-    files_processed: int
-    chunks_created: int
-    total_documents_in_db: int
+class IngestJobResponse(BaseModel):
+    """Status of a background ingestion job."""
+    job_id: str
+    status: str
+    clear_existing: bool
+    created_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    progress: Dict[str, Any]
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
 
 
 @router.get("", response_model=DocumentsResponse)
@@ -62,40 +78,80 @@ async def list_documents():
         raise HTTPException(status_code=500, detail=f"Error listing documents: {str(e)}")
 
 
-@router.post("/ingest", response_model=IngestResponse)
+@router.post("/ingest", response_model=IngestJobResponse, status_code=202)
 async def trigger_ingestion(request: IngestRequest = IngestRequest()):
     """
-    Trigger ingestion of PDFs from the raw_pdfs directory.
+    Start ingestion of PDFs from the raw_pdfs directory as a background job.
 
-    This endpoint reads all PDF files from data/raw_pdfs,
-    processes them into chunks, and stores them in ChromaDB.
+    Parsing, figure extraction and embedding run on a worker thread, so
+    chat requests keep being served meanwhile. Poll
+    /ingest/jobs/{job_id} or follow /ingest/jobs/{job_id}/events (SSE)
+    for progress.
     """
     try:
-        result = ingest_pdfs(clear_existing=request.clear_existing)
-
-        if result["success"]:
-            return IngestResponse(
-                success=True,
-                message=f"Successfully processed {result['files_processed']} files",
-                files_processed=result["files_processed"],
-                chunks_created=result["chunks_created"],
-                total_documents_in_db=result["total_documents_in_db"]
-            )
-        else:
-            return IngestResponse(
-                success=False,
-                message=result.get("error", "Unknown error"),
-                files_processed=0,
-                chunks_created=0,
-                total_documents_in_db=0
-            )
+        job = start_ingestion_job(clear_existing=bool(request.clear_existing))
+        return IngestJobResponse(**job.to_dict())
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error during ingestion: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error starting ingestion: {str(e)}")
+
+
+@router.get("/ingest/jobs", response_model=List[IngestJobResponse])
+async def list_ingestion_jobs_endpoint():
+    """List recent ingestion jobs, newest first."""
+    return [IngestJobResponse(**job.to_dict()) for job in list_ingestion_jobs()]
+
+
+@router.get("/ingest/jobs/{job_id}", response_model=IngestJobResponse)
+async def get_ingestion_job_status(job_id: str):
+    """Get status, progress counters and (when finished) the result of a job."""
+    job = get_ingestion_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Ingestion job not found: {job_id}")
+    return IngestJobResponse(**job.to_dict())
+
+
+@router.get("/ingest/jobs/{job_id}/events")
+async def stream_ingestion_job_events(job_id: str):
+    """
+    Server-Sent Events stream of ingestion progress.
+
+    Returns:
+    - event: progress - Each progress event (stage, file, pages, chunks, batch)
+    - event: done - Final job status and result when the job finishes
+    """
+    job = get_ingestion_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Ingestion job not found: {job_id}")
+
+    async def generate():
+        cursor = 0
+        while True:
+            finished = job.finished
+            events = job.events_since(cursor)
+            cursor += len(events)
+            for event in events:
+                yield f"event: progress\ndata: {json.dumps(event)}\n\n"
+            if finished:
+                yield f"event: done\ndata: {json.dumps(job.to_dict())}\n\n"
+                return
+            await asyncio.sleep(EVENT_POLL_INTERVAL)
+
+    return StreamingResponse(
+        generate(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+            "X-Accel-Buffering": "no"  # Disable nginx buffering
+        }
+    )
 
 
 @router.delete("/clear")
 async def clear_documents():
     """Clear all documents from the knowledge base."""
+    if has_active_ingestion_job():
+        raise HTTPException(status_code=409, detail="An ingestion job is in progress")
     try:
         success = clear_collection()
         if success:
@@ -28,6 +28,21 @@ class Settings(BaseSettings):
     AZURE_EMBEDDING_API_VERSION: str = "2023-05-15"
     EMBEDDING_MODEL: str = "text-embedding-3-large"
 
+    # Embedding Cache
+    EMBEDDING_CACHE_ENABLED: bool = True
+    EMBEDDING_CACHE_DIRECTORY: str = "../data/embedding_cache"
+    QUERY_EMBEDDING_CACHE_MEMORY_SIZE: int = 2048
+    QUERY_EMBEDDING_CACHE_MAX_DISK_ENTRIES: int = 100000
+    # Chunk embeddings kept on disk (least recently used dropped first); keep
+    # above the corpus size so unchanged chunks are never re-embedded
+    DOCUMENT_EMBEDDING_CACHE_MAX_ENTRIES: int = 500000
+
+    # Embedding Rate Limits (quota of the embedding deployment)
+    EMBEDDING_TOKENS_PER_MINUTE: int = 350000
+    EMBEDDING_REQUESTS_PER_MINUTE: int = 2100
+    EMBEDDING_BATCH_MAX_TOKENS: int = 16000
+    EMBEDDING_MAX_RETRIES: int = 6
+
     # Azure Document Intelligence
     AZURE_DOC_INTELLIGENCE_ENDPOINT: str = ""
     AZURE_DOC_INTELLIGENCE_KEY: str = ""
@@ -40,17 +55,59 @@ class Settings(BaseSettings):
     # ChromaDB
     CHROMA_PERSIST_DIRECTORY: str = "../data/chroma_db"
     CHROMA_COLLECTION_NAME: str = "maintenance_docs"
+    # Similarity search backend: "chroma" (HNSW index) or "numpy" (exact search
+    # over the embeddings exported to a memory-mapped matrix)
+    VECTOR_BACKEND: str = "chroma"
+
+    # Retrieval: "vector" (similarity only) or "hybrid" (opt-in: similarity + BM25
+    # lexical index, fused by reciprocal rank before reranking; the lexical
+    # index is only maintained in hybrid mode and is rebuilt from Chroma on
+    # first use after switching, so switching needs no re-ingest)
+    RETRIEVAL_MODE: str = "vector"
+    # Opt-in: append the chunks referenced by the results ("see Table 5-10",
+    # "Note 4"), one hop, up to this many tokens per search
+    RETRIEVAL_EXPAND_REFERENCES: bool = False
+    REFERENCE_EXPANSION_TOKEN_BUDGET: int = 1500
 
     # RAW PDFs Directory
     RAW_PDFS_DIRECTORY: str = "../data/raw_pdfs"
 
+    # Ingestion Pipeline (parse, figures and embedding run concurrently)
+    INGESTION_PARSE_WORKERS: int = 4
+    INGESTION_FIGURE_WORKERS: int = 0  # 0 = one per CPU core
+    INGESTION_FIGURE_PAGES_PER_TASK: int = 20  # pages per figure rendering task
+    # "eager" renders figure PNGs at ingestion; "lazy" only records their regions
+    # and the image route renders each figure on first request
+    FIGURE_RENDER_MODE: str = "eager"
+    INGESTION_QUEUE_SIZE: int = 8
+
     # Document Intelligence Settings
     USE_AZURE_DOC_INTELLIGENCE: bool = True
     DOC_INTELLIGENCE_OUTPUT_FORMAT: str = "markdown"
+    DOC_INTELLIGENCE_CACHE_ENABLED: bool = True
+    DOC_INTELLIGENCE_CACHE_DIRECTORY: str = "../data/doc_intelligence_cache"
+    DOC_INTELLIGENCE_OFFLINE: bool = False  # replay cached results only, never call Azure
+    DOC_INTELLIGENCE_PAGES_PER_RANGE: int = 100  # split longer PDFs (0 = never split)
+    DOC_INTELLIGENCE_MAX_CONCURRENCY: int = 4
+
+    # Parser used without Azure DI: "pymupdf" (text + figures in one pass) or "pypdf"
+    PDF_FALLBACK_PARSER: str = "pymupdf"
 
     # Agentic RAG Settings
     USE_AGENTIC_RAG: bool = True
     MAX_AGENT_ITERATIONS: int = 5
+    # Opt-in: search on the raw question before the first agent turn (not
+    # counted against MAX_AGENT_ITERATIONS; skipped for follow-up questions)
+    AGENT_PREFETCH_RETRIEVAL: bool = False
+
+    # HTTP Client Pools (shared keep-alive clients for Azure calls)
+    HTTP_MAX_CONNECTIONS: int = 100
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    HTTP_KEEPALIVE_EXPIRY: float = 30.0
+    HTTP_TIMEOUT: float = 60.0
+    HTTP_CONNECT_TIMEOUT: float = 10.0
+    HTTP_USE_HTTP2: bool = False
+    HTTP_VERIFY_SSL: bool = False
 
     # API Settings
     API_HOST: str = "0.0.0.0"
@@ -0,0 +1,201 @@
+"""
+Shared HTTP Client Registry.
+
+Long-lived httpx clients with keep-alive connection pools for every
+outbound Azure call (OpenAI chat/embeddings, Cohere reranker). Reusing the
+pools avoids a TCP + TLS handshake per request. Each named client counts
+requests and newly opened connections so reuse can be monitored.
+
+An httpx.AsyncClient pool belongs to the event loop that opened its
+connections, but the async clients are handed to long-lived SDK objects
+and may be used from several loops (the server loop, asyncio.run in the
+scripts, helpers that start their own loop). The shared async client is
+therefore a facade that sends each request through a pool owned by the
+running loop.
+"""
+import asyncio
+import importlib.util
+import threading
+import weakref
+from typing import Callable, Dict
+
+import httpx
+
+from app.core.config import settings
+
+# Named clients (one pool per upstream service)
+AZURE_OPENAI = "azure_openai"
+RERANKER = "reranker"
+
+_sync_clients: Dict[str, httpx.Client] = {}
+_async_clients: Dict[str, httpx.AsyncClient] = {}
+_stats: Dict[str, Dict[str, int]] = {}
+_lock = threading.Lock()
+
+
+def _http2_enabled() -> bool:
+    """HTTP/2 is only used when requested and the h2 package is installed."""
+    if not settings.HTTP_USE_HTTP2:
+        return False
+    if importlib.util.find_spec("h2") is None:
+        print("Warning: HTTP_USE_HTTP2 is set but the h2 package is not installed")
+        return False
+    return True
+
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=settings.HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY,
+    )
+
+
+def _timeout() -> httpx.Timeout:
+    return httpx.Timeout(settings.HTTP_TIMEOUT, connect=settings.HTTP_CONNECT_TIMEOUT)
+
+
+def _record(name: str, counter: str) -> None:
+    with _lock:
+        stats = _stats.setdefault(name, {"requests": 0, "connections_opened": 0})
+        stats[counter] += 1
+
+
+def _sync_hooks(name: str) -> dict:
+    """Event hooks that count requests and new TCP connections (sync client)."""
+
+    def trace(event_name: str, info: dict) -> None:
+        if event_name == "connection.connect_tcp.complete":
+            _record(name, "connections_opened")
+
+    def on_request(request: httpx.Request) -> None:
+        _record(name, "requests")
+        request.extensions["trace"] = trace
+
+    return {"request": [on_request]}
+
+
+def _async_hooks(name: str) -> dict:
+    """Event hooks that count requests and new TCP connections (async client)."""
+
+    async def trace(event_name: str, info: dict) -> None:
+        if event_name == "connection.connect_tcp.complete":
+            _record(name, "connections_opened")
+
+    async def on_request(request: httpx.Request) -> None:
+        _record(name, "requests")
+        request.extensions["trace"] = trace
+
+    return {"request": [on_request]}
+
+
+def get_http_client(name: str = AZURE_OPENAI) -> httpx.Client:
+    """Get the shared synchronous client for a service (created on first use)."""
+    with _lock:
+        client = _sync_clients.get(name)
+        if client is None or client.is_closed:
+            client = httpx.Client(
+                verify=settings.HTTP_VERIFY_SSL,
+                http2=_http2_enabled(),
+                limits=_limits(),
+                timeout=_timeout(),
+                event_hooks=_sync_hooks(name),
+            )
+            _sync_clients[name] = client
+        return client
+
+
+class LoopLocalAsyncClient(httpx.AsyncClient):
+    """
+    AsyncClient facade with one connection pool per event loop.
+
+    Requests are built by this client (same verify / timeout defaults) and
+    sent through the pool of the running loop, created on first use in that
+    loop. Pools of loops that have been garbage collected are dropped.
+    """
+
+    def __init__(self, factory: Callable[[], httpx.AsyncClient]):
+        super().__init__(verify=settings.HTTP_VERIFY_SSL, timeout=_timeout())
+        self._factory = factory
+        self._loop_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self._loop_clients_lock = threading.Lock()
+
+    def _loop_client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        with self._loop_clients_lock:
+            client = self._loop_clients.get(loop)
+            if client is None or client.is_closed:
+                client = self._factory()
+                self._loop_clients[loop] = client
+            return client
+
+    async def send(self, request: httpx.Request, **kwargs) -> httpx.Response:
+        return await self._loop_client().send(request, **kwargs)
+
+    async def aclose(self) -> None:
+        """Close the pool of the running loop; pools of other loops are dropped."""
+        loop = asyncio.get_running_loop()
+        with self._loop_clients_lock:
+            clients = list(self._loop_clients.items())
+            self._loop_clients.clear()
+        for client_loop, client in clients:
+            # Other loops' connections can only be closed by those loops
+            if client_loop is loop:
+                await client.aclose()
+        await super().aclose()
+
+
+def get_async_http_client(name: str = AZURE_OPENAI) -> httpx.AsyncClient:
+    """Get the shared asynchronous client for a service (created on first use)."""
+
+    def create_pool() -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            verify=settings.HTTP_VERIFY_SSL,
+            http2=_http2_enabled(),
+            limits=_limits(),
+            timeout=_timeout(),
+            event_hooks=_async_hooks(name),
+        )
+
+    with _lock:
+        client = _async_clients.get(name)
+        if client is None or client.is_closed:
+            client = LoopLocalAsyncClient(create_pool)
+            _async_clients[name] = client
+        return client
+
+
+def get_http_client_stats() -> Dict[str, Dict[str, int]]:
+    """
+    Get request/connection counters per named client.
+
+    reused_connections is the number of requests served on an already
+    open keep-alive connection.
+    """
+    with _lock:
+        result = {}
+        for name, stats in _stats.items():
+            requests = stats["requests"]
+            opened = stats["connections_opened"]
+            result[name] = {
+                "requests": requests,
+                "connections_opened": opened,
+                "reused_connections": max(0, requests - opened),
+            }
+        return result
+
+
+async def close_http_clients() -> None:
+    """Close all pooled clients (called from the FastAPI lifespan hook)."""
+    with _lock:
+        sync_clients = list(_sync_clients.values())
+        async_clients = list(_async_clients.values())
+        _sync_clients.clear()
+        _async_clients.clear()
+
+    for client in sync_clients:
+        client.close()
+    for client in async_clients:
+        await client.aclose()
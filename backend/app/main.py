@@ -1,6 +1,7 @@
 """
 FastAPI Entry Point - Maintenance RAG PoC
 """
+import asyncio
 from pathlib import Path
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
@@ -9,9 +10,15 @@ from fastapi.responses import FileResponse
 from contextlib import asynccontextmanager
 
 from app.core.config import settings
+from app.core.http_clients import close_http_clients, get_http_client_stats
 from app.api import chat, documents
 from app.rag.vector_store import get_collection_stats
 from app.rag.llm import get_available_models
+from app.rag.embedding_cache import close_embedding_cache, get_embedding_cache_stats
+from app.rag.rate_limiter import get_embedding_rate_limiter_stats
+from app.rag.ingestion_jobs import shutdown_ingestion_jobs
+from app.rag.image_extractor import get_figure_image
+from app.rag.agent import init_agent_registry, is_agentic_rag_available
 
 
 @asynccontextmanager
@@ -21,9 +28,15 @@ async def lifespan(app: FastAPI):
     print("Starting Maintenance RAG API...")
     stats = get_collection_stats()
     print(f"Vector Store: {stats['count']} documents indexed")
+    if is_agentic_rag_available():
+        agent_count = init_agent_registry()
+        print(f"Agent registry: {agent_count} compiled agents ready")
     yield
     # Shutdown
     print("Shutting down Maintenance RAG API...")
+    shutdown_ingestion_jobs()
+    close_embedding_cache()
+    await close_http_clients()
 
 
 app = FastAPI(
@@ -74,10 +87,13 @@ async def serve_pdf(filename: str):
 
 @app.get("/api/images/{pdf_name}/{image_file}")
 async def serve_image(pdf_name: str, image_file: str):
-    """Serve extracted images from the images directory."""
+    """Serve extracted images from the images directory (rendering lazy figures on first request)."""
     image_path = IMAGES_DIRECTORY / pdf_name / image_file
     if not image_path.exists():
-        return {"error": "Image not found"}
+        rendered_path = await asyncio.to_thread(get_figure_image, pdf_name, image_file)
+        if rendered_path is None:
+            return {"error": "Image not found"}
+        image_path = rendered_path
 
     # Determine media type from extension
     ext = image_path.suffix.lower()
@@ -123,7 +139,10 @@ async def health_check():
                 "status": vector_store_status,
                 "documents_indexed": vector_count
             },
-            "llm_provider": "azure_openai"
+            "llm_provider": "azure_openai",
+            "http_clients": get_http_client_stats(),
+            "embedding_cache": get_embedding_cache_stats(),
+            "embedding_rate_limiter": get_embedding_rate_limiter_stats()
         },
         "available_models": list(get_available_models().keys())
     }
@@ -7,6 +7,8 @@ cross-referencing multiple sections of documentation.
 
 Key Features:
 - Multi-hop retrieval: Agent can search multiple times to gather complete information
+- Exact reference lookups: "See Table 5-10" / "Refer to Page 131" are fetched
+  directly from the reference index, without a semantic search
 - Loop detection: Prevents infinite loops by tracking search queries
 - Configurable iteration limit: Safety net for maximum agent iterations
 - Transparent reasoning: Each step is logged for debugging and trust
@@ -17,11 +19,14 @@ from langchain_core.tools import tool
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 from langgraph.graph import StateGraph, END
 from langgraph.prebuilt import ToolNode
+import asyncio
 import operator
+import uuid
 
 from app.core.config import settings
-from app.rag.vector_store import get_retriever
-from app.rag.llm import get_llm
+from app.rag.reference_index import get_reference_index, parse_reference
+from app.rag.vector_store import get_documents_by_ids, get_retriever, get_vector_store
+from app.rag.llm import get_llm, get_available_models, resolve_model_id
 
 
 # =============================================================================
@@ -48,21 +53,77 @@ class AgentState(TypedDict):
 # RETRIEVAL TOOL
 # =============================================================================
 
-# Global storage for retrieved documents during agent execution
-# This allows us to capture full document content for the trust layer
-_retrieved_documents_store: List[Dict[str, Any]] = []
+def _document_key(doc_entry: Dict[str, Any]) -> tuple:
+    """Deduplication key for a retrieved document: (source, page, chunk_index)."""
+    return (doc_entry.get("source"), doc_entry.get("page"), doc_entry.get("chunk_index"))
 
 
-def clear_retrieved_documents():
-    """Clear the retrieved documents store before a new query."""
-    global _retrieved_documents_store
-    _retrieved_documents_store = []
+def merge_retrieved_documents(
+    existing: List[Dict[str, Any]],
+    new_docs: Sequence[Dict[str, Any]]
+) -> List[Dict[str, Any]]:
+    """
+    Append newly retrieved documents to the accumulated list, skipping duplicates.
+
+    Returns a new list; the input lists are not modified.
+    """
+    merged = list(existing)
+    seen = {_document_key(d) for d in merged}
+    for doc_entry in new_docs:
+        key = _document_key(doc_entry)
+        if key not in seen:
+            seen.add(key)
+            merged.append(doc_entry)
+    return merged
 
 
-def get_retrieved_documents() -> List[Dict[str, Any]]:
-    """Get all documents retrieved during agent execution."""
-    global _retrieved_documents_store
-    return _retrieved_documents_store
+def format_tool_results(docs: Sequence, query: str) -> tuple:
+    """
+    Format retrieved chunks as tool output.
+
+    Returns (content for the LLM, document entries for the trust layer).
+    """
+    # Format results with clear source attribution
+    results = []
+    doc_entries = []
+    for i, doc in enumerate(docs, 1):
+        source = doc.metadata.get("source", "Unknown")
+        page = doc.metadata.get("page", "N/A")
+        chapter = doc.metadata.get("chapter")
+        section = doc.metadata.get("section")
+        chunk_index = doc.metadata.get("chunk_index")
+        total_chunks = doc.metadata.get("total_chunks")
+        # Store full content for trust layer (1500 chars as per requirement)
+        full_content = doc.page_content[:1500]
+        location = f"{source} (Page {page})"
+        page_label = doc.metadata.get("page_label")
+        if page_label and str(page_label) != str(page):
+            location = f"{source} (Page {page}, printed page {page_label})"
+        if doc.metadata.get("referenced_as"):
+            location += f" - {doc.metadata['referenced_as']}, referenced by an earlier result"
+
+        # Store document with full metadata for trust layer
+        doc_entry = {
+            "content": full_content,
+            "source": source,
+            "page": page if page != "N/A" else None,
+            "chapter": chapter,
+            "section": section,
+            "chunk_index": chunk_index,
+            "total_chunks": total_chunks,
+            "query": query
+        }
+
+        doc_entries.append(doc_entry)
+
+        results.append(
+            f"[Document {i}]\n"
+            f"Source: {location}\n"
+            f"Content:\n{full_content}\n"
+            f"---"
+        )
+
+    return "\n\n".join(results), doc_entries
 
 
 def create_retrieval_tool(k: int = 4):
@@ -70,7 +131,9 @@ def create_retrieval_tool(k: int = 4):
     Create a retrieval tool for the agent.
 
     This tool searches the maintenance documentation knowledge base
-    and returns relevant document chunks.
+    and returns relevant document chunks. The full document entries are
+    attached to the ToolMessage as an artifact, so they are collected into
+    the per-request AgentState instead of any shared storage.
 
     Args:
         k: Number of documents to retrieve per search.
@@ -80,8 +143,8 @@ def create_retrieval_tool(k: int = 4):
     """
     retriever = get_retriever(k=k)
 
-    @tool
-    def search_maintenance_docs(query: str) -> str:
+    @tool(response_format="content_and_artifact")
+    async def search_maintenance_docs(query: str) -> tuple:
         """
         Search the maintenance documentation knowledge base.
 
@@ -92,9 +155,10 @@ def create_retrieval_tool(k: int = 4):
         - Lubrication intervals and requirements
         - Safety procedures and warnings
 
-        If the search results mention references to other pages, tables,
-        or notes (e.g., "See Table 5-10", "Refer to Page 131", "Note 4"),
-        you should perform another search to find that specific content.
+        If the search results mention a specific page, table or figure
+        (e.g., "See Table 5-10", "Refer to Page 131"), fetch it with
+        lookup_document_reference instead. For other references (e.g.,
+        "Note 4", "Section 3"), perform another search.
 
         Args:
             query: Search query describing what information you need.
@@ -102,54 +166,108 @@ def create_retrieval_tool(k: int = 4):
         Returns:
             Relevant documentation excerpts with source information.
         """
-        global _retrieved_documents_store
-        docs = retriever.invoke(query)
+        docs = await retriever.ainvoke(query)
 
         if not docs:
-            return "No relevant documents found for this query."
-
-        # Format results with clear source attribution
-        results = []
-        for i, doc in enumerate(docs, 1):
-            source = doc.metadata.get("source", "Unknown")
-            page = doc.metadata.get("page", "N/A")
-            chapter = doc.metadata.get("chapter")
-            section = doc.metadata.get("section")
-            chunk_index = doc.metadata.get("chunk_index")
-            total_chunks = doc.metadata.get("total_chunks")
-            # Store full content for trust layer (1500 chars as per requirement)
-            full_content = doc.page_content[:1500]
-
-            # Store document with full metadata for trust layer
-            doc_entry = {
-                "content": full_content,
-                "source": source,
-                "page": page if page != "N/A" else None,
-                "chapter": chapter,
-                "section": section,
-                "chunk_index": chunk_index,
-                "total_chunks": total_chunks,
-                "query": query
-            }
+            return "No relevant documents found for this query.", []
+
+        return format_tool_results(docs, query)
+
+    return search_maintenance_docs
+
+
+# Upper bound on chunks returned by one reference lookup
+LOOKUP_MAX_CHUNKS = 8
+
+
+def _lookup_reference_documents(kind: str, label: str, source: Optional[str]) -> List:
+    """Resolve a page / table / figure to its chunks (blocking: index + Chroma get)."""
+    index = get_reference_index(get_vector_store()._collection)
+    if source and not any(source.casefold() in name.casefold() for name in index.sources()):
+        # Unknown or misspelled file name: search every manual instead
+        source = None
+    return get_documents_by_ids(index.lookup(kind, label, source)[:LOOKUP_MAX_CHUNKS])
+
+
+def create_lookup_tool():
+    """
+    Create the exact reference lookup tool for the agent.
+
+    Pages, tables and figures are resolved through the reference index
+    built at ingestion and loaded from Chroma by chunk ID: no embedding
+    call, vector query or rerank. Results use the same format and
+    artifact as search_maintenance_docs.
+    """
+
+    @tool(response_format="content_and_artifact")
+    async def lookup_document_reference(reference: str, source: Optional[str] = None) -> tuple:
+        """
+        Fetch a referenced page, table or figure directly from the manuals.
 
-            # Avoid duplicates based on source + page + chunk_index
-            is_duplicate = any(
-                d["source"] == source and d["page"] == doc_entry["page"] and d.get("chunk_index") == chunk_index
-                for d in _retrieved_documents_store
+        Use this tool (instead of a search) when documentation points to a
+        specific location, for example:
+        - "See Table 5-10" -> reference="Table 5-10"
+        - "Refer to Page 131" -> reference="Page 131"
+        - "as shown in Fig. 3-1" -> reference="Figure 3-1"
+
+        Pass the source document of the result that contains the reference
+        (e.g. "Manual_R2000iC.pdf") so the lookup stays in that manual.
+        Page numbers are the numbers printed on the manual's pages, as cited
+        in its text ("printed page" in search results); manuals without
+        printed page numbers use the PDF page number.
+
+        Args:
+            reference: "Page N", "Table X-Y" or "Figure X-Y".
+            source: Document file name the reference appeared in (optional).
+
+        Returns:
+            The content of the referenced page, table or figure caption.
+        """
+        parsed = parse_reference(reference)
+        if parsed is None:
+            return (
+                f"'{reference}' is not a page, table or figure reference. "
+                "Use search_maintenance_docs for other references.",
+                [],
             )
-            if not is_duplicate:
-                _retrieved_documents_store.append(doc_entry)
-
-            results.append(
-                f"[Document {i}]\n"
-                f"Source: {source} (Page {page})\n"
-                f"Content:\n{full_content}\n"
-                f"---"
+
+        kind, label = parsed
+        docs = await asyncio.to_thread(_lookup_reference_documents, kind, label, source)
+        if not docs:
+            where = f" in {source}" if source else ""
+            return (
+                f"{kind.capitalize()} {label} was not found{where}. "
+                "Use search_maintenance_docs to search for its content instead.",
+                [],
             )
 
-        return "\n\n".join(results)
+        return format_tool_results(docs, _tool_query("lookup_document_reference", {
+            "reference": reference, "source": source,
+        }))
+
+    return lookup_document_reference
 
-    return search_maintenance_docs
+
+def _tool_query(name: str, args: Dict[str, Any]) -> Optional[str]:
+    """
+    The query a tool call stands for (loop detection, status events).
+
+    Lookups are recorded as "lookup: Table 5-10 in Manual.pdf" so they
+    never collide with a search query.
+    """
+    if name == "search_maintenance_docs":
+        return args.get("query", "")
+    if name == "lookup_document_reference":
+        query = f"lookup: {args.get('reference', '')}"
+        if args.get("source"):
+            query += f" in {args['source']}"
+        return query
+    return None
+
+
+def create_agent_tools() -> List:
+    """The agent's tools: semantic search and exact reference lookup."""
+    return [create_retrieval_tool(), create_lookup_tool()]
 
 
 # =============================================================================
@@ -163,20 +281,24 @@ Help users with maintenance questions by searching the documentation and providi
 
 ## Critical Instructions
 
-1. **ALWAYS Search First**: Before answering any maintenance question, use the search_maintenance_docs tool to find relevant information.
+1. **ALWAYS Search First**: Before answering any maintenance question, use the search_maintenance_docs tool to find relevant information. If results for the question are already in the conversation, build on them instead of repeating the same search.
 
 2. **Follow ALL References - THIS IS CRITICAL**: When search results mention ANY of the following:
    - "See Table X" or "Refer to Table X"
    - "See Page X" or "Refer to Page X" or any page number reference
+   - "Fig. X" or "See Figure X"
    - "Note X" or "See Note X"
    - "Section X" or "Chapter X"
    - "For details, see..." or "Refer to..."
    - Blank or incomplete entries that reference another location for specifications
    - Any mention of detailed specifications being elsewhere in the manual
 
-   You MUST perform an additional search to find that referenced content.
+   You MUST retrieve that referenced content:
+   - Pages, tables and figures: use lookup_document_reference (e.g. reference="Table 5-10", source="<document of the result>"). It fetches the exact content directly and is much faster than a search.
+   - Everything else (notes, sections, "for details see..."), or a lookup that finds nothing: perform an additional search_maintenance_docs search.
+   Results marked "referenced by an earlier result" (e.g. "Table 5-10, referenced by an earlier result") ARE that referenced content, added automatically - do not look them up again.
    Do NOT guess or assume what the reference contains.
-   NEVER tell the user "refer to page X for details" or "see page X" - YOU must search for that content yourself and include it in your answer.
+   NEVER tell the user "refer to page X for details" or "see page X" - YOU must retrieve that content yourself and include it in your answer.
 
 3. **Be Thorough - Multiple Aspects**: Complex maintenance questions often involve information spread across multiple pages:
    - The maintenance schedule table (e.g., what to do at 300 hours)
@@ -189,12 +311,14 @@ Help users with maintenance questions by searching the documentation and providi
 
 4. **Multi-hop Reasoning**: Complex questions often require multiple searches. For example:
    - First search: Find the maintenance schedule table
-   - Second search: Find the referenced lubrication specifications page
-   - Third search: Find specific procedure details or notes referenced
+   - Then: Look up the referenced lubrication specifications page or table
+   - Then: Search for specific procedure details or notes referenced
+
+   When several searches or lookups do not depend on each other's results (e.g. "maintenance schedule" and "grease specifications"), request them together in the same turn - they run in parallel.
 
 5. **When to Stop Searching**:
    - You have found ALL referenced information (no unresolved references remain)
-   - You have performed the same search query twice (avoid loops)
+   - You have performed the same search or lookup twice (avoid loops)
    - You have gathered specific, detailed information for every aspect of the question
 
 6. **Answer Format**:
@@ -214,12 +338,12 @@ Your thought process:
 1. Search for "300 hours maintenance schedule"
 2. Find: "Lubrication: As appropriate (Note 4)" and "See page 131 for lubrication details"
 3. Recognize: Need to find the lubrication specifications page
-4. Search for "lubrication specifications" or "lubrication interval grease"
+4. Look up "Page 131" in the same document (and "Note 4" with a search, in the same turn)
 5. Find: "Table 5-10: J1 axis = 24,000 Hr, Shaft = Every 2,000km movement"
 6. Now provide complete answer with ALL specific details including intervals per component
 
 WRONG approach: Answering "lubrication is not required at 300 hours, see page 131 for details"
-RIGHT approach: Searching for page 131 content, finding the specific intervals, and including them in the answer
+RIGHT approach: Looking up page 131, finding the specific intervals, and including them in the answer
 
 Remember: Incomplete information leads to incorrect maintenance, which can cause equipment damage or safety hazards. Always be thorough."""
 
@@ -228,7 +352,7 @@ Remember: Incomplete information leads to incorrect maintenance, which can cause
 # AGENT NODES
 # =============================================================================
 
-def create_agent_node(model_id: Optional[str] = None):
+def create_agent_node(model_id: Optional[str] = None, tools: Optional[List] = None):
     """
     Create the agent reasoning node.
 
@@ -236,10 +360,11 @@ def create_agent_node(model_id: Optional[str] = None):
     or provide a final answer.
     """
     llm = get_llm(model_id=model_id)
-    tools = [create_retrieval_tool()]
+    tools = tools or create_agent_tools()
 
-    # Bind tools to LLM
-    llm_with_tools = llm.bind_tools(tools)
+    # Bind tools to LLM. Independent searches issued in the same turn are
+    # executed concurrently by the tool node.
+    llm_with_tools = llm.bind_tools(tools, parallel_tool_calls=True)
 
     prompt = ChatPromptTemplate.from_messages([
         ("system", AGENT_SYSTEM_PROMPT),
@@ -248,14 +373,57 @@ def create_agent_node(model_id: Optional[str] = None):
 
     chain = prompt | llm_with_tools
 
-    def agent_node(state: AgentState) -> Dict[str, Any]:
+    async def agent_node(state: AgentState) -> Dict[str, Any]:
         """Process the current state and decide next action."""
-        response = chain.invoke({"messages": state["messages"]})
+        response = await chain.ainvoke({"messages": state["messages"]})
         return {"messages": [response]}
 
     return agent_node
 
 
+# Tool call IDs of prefetch searches (not counted against MAX_AGENT_ITERATIONS)
+PREFETCH_CALL_PREFIX = "prefetch_"
+
+
+def prefetch_node(state: AgentState) -> Dict[str, Any]:
+    """
+    Issue the first search on the original question without an LLM call.
+
+    The first agent turn almost always just searches for a paraphrase of
+    the question, so this node emits that tool call directly. The tool node
+    then executes it like any other search and the agent starts reasoning
+    with the results already in its context. The prefetch hop does not
+    count against MAX_AGENT_ITERATIONS.
+    """
+    return {
+        "messages": [AIMessage(
+            content="",
+            tool_calls=[{
+                "name": "search_maintenance_docs",
+                "args": {"query": state["original_question"]},
+                "id": f"{PREFETCH_CALL_PREFIX}{uuid.uuid4().hex[:24]}",
+                "type": "tool_call",
+            }]
+        )]
+    }
+
+
+def route_entry(state: AgentState) -> str:
+    """
+    Decide whether the request starts with a prefetch search.
+
+    Follow-up questions ("and the torque for that?") only make sense with
+    the chat history, so searching on their raw text retrieves off-topic
+    chunks: with history, the agent writes the first query itself.
+
+    Returns:
+        "prefetch" for a standalone question, "agent" otherwise
+    """
+    if len(state["messages"]) > 1:
+        return "agent"
+    return "prefetch"
+
+
 def should_continue(state: AgentState) -> str:
     """
     Determine if the agent should continue searching or end.
@@ -279,21 +447,25 @@ def should_continue(state: AgentState) -> str:
         print(f"Agent reached max iterations ({max_iterations}), forcing end")
         return "end"
 
-    # Loop detection: check if we're repeating queries
+    # Loop detection: stop if every search / lookup in this turn repeats an
+    # earlier one. A turn that mixes a repeated query with new parallel
+    # calls still runs, so the new calls are not lost.
     executed_queries = state.get("executed_queries", [])
-    for tool_call in last_message.tool_calls:
-        if tool_call.get("name") == "search_maintenance_docs":
-            query = tool_call.get("args", {}).get("query", "")
-            if query in executed_queries:
-                print(f"Loop detected: query '{query}' already executed")
-                return "end"
+    queries = [
+        _tool_query(tool_call.get("name"), tool_call.get("args", {}))
+        for tool_call in last_message.tool_calls
+    ]
+    queries = [query for query in queries if query is not None]
+    if queries and all(query in executed_queries for query in queries):
+        print(f"Loop detected: queries {queries} already executed")
+        return "end"
 
     return "tools"
 
 
-def create_tool_node():
+def create_tool_node(tools: Optional[List] = None):
     """Create the tool execution node."""
-    tools = [create_retrieval_tool()]
+    tools = tools or create_agent_tools()
     return ToolNode(tools)
 
 
@@ -301,25 +473,42 @@ def update_state_after_tools(state: AgentState) -> Dict[str, Any]:
     """
     Update state after tool execution.
 
-    Tracks executed queries and increments iteration count.
+    Tracks executed queries, collects the documents returned by the latest
+    tool calls and increments iteration count (except for the prefetch hop,
+    which the model did not ask for).
     """
     messages = state["messages"]
     executed_queries = list(state.get("executed_queries", []))
     iteration_count = state.get("iteration_count", 0)
 
+    # Tool results of the current hop follow the last AI message
+    new_docs = []
+    for msg in reversed(messages):
+        if not isinstance(msg, ToolMessage):
+            break
+        new_docs[:0] = msg.artifact or []
+    retrieved_documents = merge_retrieved_documents(
+        state.get("retrieved_documents", []), new_docs
+    )
+
     # Find the most recent AI message with tool calls
+    prefetch = False
     for msg in reversed(messages):
         if hasattr(msg, "tool_calls") and msg.tool_calls:
             for tool_call in msg.tool_calls:
-                if tool_call.get("name") == "search_maintenance_docs":
-                    query = tool_call.get("args", {}).get("query", "")
-                    if query and query not in executed_queries:
-                        executed_queries.append(query)
+                query = _tool_query(tool_call.get("name"), tool_call.get("args", {}))
+                if query and query not in executed_queries:
+                    executed_queries.append(query)
+            prefetch = all(
+                (tool_call.get("id") or "").startswith(PREFETCH_CALL_PREFIX)
+                for tool_call in msg.tool_calls
+            )
             break
 
     return {
         "executed_queries": executed_queries,
-        "iteration_count": iteration_count + 1
+        "retrieved_documents": retrieved_documents,
+        "iteration_count": iteration_count if prefetch else iteration_count + 1
     }
 
 
@@ -327,13 +516,16 @@ def update_state_after_tools(state: AgentState) -> Dict[str, Any]:
 # GRAPH CONSTRUCTION
 # =============================================================================
 
-def create_rag_agent(model_id: Optional[str] = None) -> StateGraph:
+def create_rag_agent(
+    model_id: Optional[str] = None,
+    prefetch_retrieval: Optional[bool] = None
+) -> StateGraph:
     """
     Create the RAG agent graph.
 
     The graph structure:
 
-    START -> agent -> [should_continue?]
+    START -> [route_entry? prefetch -> tool_node -> update_state ->] agent -> [should_continue?]
                           |
               +-----------+-----------+
               |                       |
@@ -347,22 +539,45 @@ def create_rag_agent(model_id: Optional[str] = None) -> StateGraph:
               |
               +---> agent (loop back)
 
+    With prefetch_retrieval enabled, the first search of a question without
+    chat history runs on the original question before the first agent turn,
+    saving one LLM round trip.
+
     Args:
         model_id: Optional LLM model ID to use.
+        prefetch_retrieval: Override settings.AGENT_PREFETCH_RETRIEVAL.
 
     Returns:
         Compiled LangGraph agent.
     """
+    if prefetch_retrieval is None:
+        prefetch_retrieval = settings.AGENT_PREFETCH_RETRIEVAL
+
+    # The same tool instances are bound to the LLM and executed by the
+    # tool node, so the retriever (and its vector store) is built once
+    tools = create_agent_tools()
+
     # Create the graph
     workflow = StateGraph(AgentState)
 
     # Add nodes
-    workflow.add_node("agent", create_agent_node(model_id))
-    workflow.add_node("tools", create_tool_node())
+    workflow.add_node("agent", create_agent_node(model_id, tools))
+    workflow.add_node("tools", create_tool_node(tools))
     workflow.add_node("update_state", update_state_after_tools)
 
     # Set entry point
-    workflow.set_entry_point("agent")
+    if prefetch_retrieval:
+        workflow.add_node("prefetch", prefetch_node)
+        workflow.set_conditional_entry_point(
+            route_entry,
+            {
+                "prefetch": "prefetch",
+                "agent": "agent"
+            }
+        )
+        workflow.add_edge("prefetch", "tools")
+    else:
+        workflow.set_entry_point("agent")
 
     # Add conditional edges from agent
     workflow.add_conditional_edges(
@@ -382,6 +597,62 @@ def create_rag_agent(model_id: Optional[str] = None) -> StateGraph:
     return workflow.compile()
 
 
+# =============================================================================
+# AGENT REGISTRY
+# =============================================================================
+
+# Compiled agents keyed by model ID. Compiled graphs are stateless (all
+# per-request data lives in the AgentState passed to ainvoke/astream),
+# so a single instance per model can serve every request.
+_agent_registry: Dict[str, Any] = {}
+
+
+def get_rag_agent(model_id: Optional[str] = None):
+    """
+    Get the compiled RAG agent for a model, building it on first use.
+
+    Args:
+        model_id: Optional LLM model ID. Uses default if not provided.
+
+    Returns:
+        Compiled LangGraph agent shared across requests.
+    """
+    # Keyed by the model get_llm() serves, so aliases share one agent
+    model = resolve_model_id(model_id)
+    agent = _agent_registry.get(model)
+    if agent is None:
+        agent = create_rag_agent(model)
+        _agent_registry[model] = agent
+    return agent
+
+
+def init_agent_registry() -> int:
+    """
+    Build the compiled agent for every available model.
+
+    Called from the FastAPI lifespan hook so the first request of each
+    model does not pay the graph construction cost.
+
+    Returns:
+        Number of agents in the registry.
+    """
+    for model_id in get_available_models():
+        try:
+            get_rag_agent(model_id)
+        except Exception as e:
+            print(f"Warning: could not build agent for {model_id}: {e}")
+    return len(_agent_registry)
+
+
+def clear_agent_registry():
+    """
+    Drop all compiled agents; called by clear_collection, since their
+    retrievers hold the vector store of the deleted collection. Agents are
+    rebuilt on their next request.
+    """
+    _agent_registry.clear()
+
+
 # =============================================================================
 # MAIN QUERY FUNCTION
 # =============================================================================
@@ -408,9 +679,6 @@ async def query_rag_agent(
         - iterations: Number of retrieval iterations
         - queries_executed: List of search queries performed
     """
-    # Clear retrieved documents store before new query
-    clear_retrieved_documents()
-
     # Build initial messages
     messages = []
 
@@ -435,8 +703,8 @@ async def query_rag_agent(
         "final_answer": None
     }
 
-    # Create and run the agent
-    agent = create_rag_agent(model_id)
+    # Run the shared agent for this model
+    agent = get_rag_agent(model_id)
     final_state = await agent.ainvoke(initial_state)
 
     # Extract the final answer
@@ -454,10 +722,12 @@ async def query_rag_agent(
                 answer = msg.content
                 break
 
+    # Documents collected across all hops of this request
+    retrieved_docs = final_state.get("retrieved_documents", [])
+
     # If still no answer (agent hit max iterations with only tool calls),
     # generate a final answer from the retrieved documents
     if not answer:
-        retrieved_docs = get_retrieved_documents()
         if retrieved_docs:
             from app.rag.chain import format_docs, SYSTEM_PROMPT
             from langchain_core.documents import Document as LCDoc
@@ -474,9 +744,6 @@ async def query_rag_agent(
             chain = prompt | llm | StrOutputParser()
             answer = await chain.ainvoke({"context": context, "question": question})
 
-    # Get all retrieved documents with full content for trust layer
-    retrieved_docs = get_retrieved_documents()
-
     # Format sources with full metadata and content
     sources = []
     seen_sources = set()
@@ -536,12 +803,21 @@ async def run_agentic_retrieval_streaming(
     events as the agent performs each retrieval hop. It enables the streaming
     endpoint to use multi-hop retrieval while providing real-time feedback.
 
+    The agent's final answer is taken from the model stream (LangGraph
+    "messages" stream mode), so callers do not need a second LLM call to
+    produce it. Tokens are forwarded as soon as they arrive. A turn may
+    stream text ("Let me search for...") before its tool calls; when such a
+    turn turns out to call tools, a discard event tells the caller to drop
+    the tokens streamed since the last discard, and the text is not part of
+    the answer. If the agent stops without answering (iteration limit or
+    loop detection) the result event has an empty answer.
+
     Yields dicts with:
     - {'type': 'status', 'step': ..., 'message': ..., 'query': ..., 'index': ...}
-    - {'type': 'result', 'docs': [...], 'queries_executed': [...], 'iterations': int}
+    - {'type': 'token', 'token': ...}
+    - {'type': 'discard'}
+    - {'type': 'result', 'docs': [...], 'queries_executed': [...], 'iterations': int, 'answer': str}
     """
-    clear_retrieved_documents()
-
     # Build messages
     messages = []
     if chat_history:
@@ -561,37 +837,85 @@ async def run_agentic_retrieval_streaming(
         "final_answer": None
     }
 
-    agent = create_rag_agent(model_id)
+    agent = get_rag_agent(model_id)
 
     seen_queries = set()
     search_count = 0
     iteration_count = 0
+    retrieved_docs: List[Dict[str, Any]] = []
+    answer = ""
+    # IDs of streamed agent messages that turned out to be tool-call turns
+    tool_call_message_ids = set()
+    # IDs of agent messages whose text has been streamed to the caller
+    streamed_message_ids = set()
 
     try:
-        # Stream agent execution, intercepting tool calls for status updates
-        async for event in agent.astream(initial_state, stream_mode="updates"):
-            for node_name, state_update in event.items():
-                if node_name == "agent":
+        # Stream agent execution: "updates" for status, "messages" for tokens
+        async for mode, payload in agent.astream(
+            initial_state, stream_mode=["updates", "messages"]
+        ):
+            if mode == "messages":
+                chunk, chunk_metadata = payload
+                if chunk_metadata.get("langgraph_node") != "agent":
+                    continue
+                if getattr(chunk, "tool_call_chunks", None):
+                    if chunk.id not in tool_call_message_ids:
+                        tool_call_message_ids.add(chunk.id)
+                        if chunk.id in streamed_message_ids:
+                            # Text before the tool calls was not the answer
+                            answer = ""
+                            yield {'type': 'discard'}
+                    continue
+                if chunk.id in tool_call_message_ids:
+                    continue
+                if isinstance(chunk.content, str) and chunk.content:
+                    streamed_message_ids.add(chunk.id)
+                    answer += chunk.content
+                    yield {'type': 'token', 'token': chunk.content}
+                continue
+
+            for node_name, state_update in payload.items():
+                if node_name in ("agent", "prefetch"):
                     # Check if agent is making tool calls (new searches)
                     new_messages = state_update.get("messages", [])
                     for msg in new_messages:
+                        msg_id = getattr(msg, "id", None)
+                        if node_name == "agent" and isinstance(msg, AIMessage):
+                            if msg.tool_calls:
+                                # Tool calls that were not streamed as chunks
+                                if msg_id in streamed_message_ids and msg_id not in tool_call_message_ids:
+                                    answer = ""
+                                    yield {'type': 'discard'}
+                                tool_call_message_ids.add(msg_id)
+                            elif (
+                                msg_id not in streamed_message_ids
+                                and isinstance(msg.content, str)
+                                and msg.content
+                            ):
+                                # The model did not stream: send the answer whole
+                                answer += msg.content
+                                yield {'type': 'token', 'token': msg.content}
                         if hasattr(msg, "tool_calls") and msg.tool_calls:
                             for tc in msg.tool_calls:
-                                if tc.get("name") == "search_maintenance_docs":
-                                    query = tc.get("args", {}).get("query", "")
-                                    if query and query not in seen_queries:
-                                        seen_queries.add(query)
-                                        search_count += 1
+                                query = _tool_query(tc.get("name"), tc.get("args", {}))
+                                if query and query not in seen_queries:
+                                    seen_queries.add(query)
+                                    search_count += 1
+                                    if tc.get("name") == "lookup_document_reference":
+                                        label = f'Lookup {search_count}: {tc["args"].get("reference", "")}'
+                                    else:
                                         short_q = query[:60] + "..." if len(query) > 60 else query
-                                        yield {
-                                            'type': 'status',
-                                            'step': 'searching',
-                                            'message': f'Search {search_count}: {short_q}',
-                                            'query': query,
-                                            'index': search_count
-                                        }
+                                        label = f'Search {search_count}: {short_q}'
+                                    yield {
+                                        'type': 'status',
+                                        'step': 'searching',
+                                        'message': label,
+                                        'query': query,
+                                        'index': search_count
+                                    }
                 elif node_name == "update_state":
                     iteration_count = state_update.get("iteration_count", iteration_count)
+                    retrieved_docs = state_update.get("retrieved_documents", retrieved_docs)
 
     except Exception as e:
         print(f"Agentic retrieval error: {e}")
@@ -601,14 +925,12 @@ async def run_agentic_retrieval_streaming(
             'message': f'Agent encountered issue, using gathered documents...'
         }
 
-    # Get all retrieved documents
-    retrieved_docs = get_retrieved_documents()
-
     print(f"Agentic retrieval complete: {search_count} searches, {len(retrieved_docs)} documents, {iteration_count} iterations")
 
     yield {
         'type': 'result',
         'docs': retrieved_docs,
         'queries_executed': list(seen_queries),
-        'iterations': iteration_count
+        'iterations': iteration_count,
+        'answer': answer
     }
@@ -5,23 +5,292 @@ Replaces LlamaParse with Azure AI Document Intelligence for PDF parsing.
 Uses the prebuilt-layout model for accurate extraction of tables,
 figures, and structured content in Markdown format.
 """
-import io
+import gzip
+import hashlib
+import json
+import threading
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from pathlib import Path
-from typing import List, Optional
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
 
 from langchain_core.documents import Document
 from app.core.config import settings
 
 
+# Document Intelligence model used for all analyses
+LAYOUT_MODEL = "prebuilt-layout"
+
+
+def _body_sha256(body) -> str:
+    """SHA-256 of a request body (bytes or a seekable binary stream)."""
+    digest = hashlib.sha256()
+    if isinstance(body, (bytes, bytearray)):
+        digest.update(body)
+        return digest.hexdigest()
+
+    position = body.tell()
+    for block in iter(lambda: body.read(1024 * 1024), b""):
+        digest.update(block)
+    body.seek(position)
+    return digest.hexdigest()
+
+
+class _CompletedPoller:
+    """Poller stand-in for a result served from the cache."""
+
+    def __init__(self, result):
+        self._result = result
+
+    def result(self, timeout: Optional[float] = None):
+        return self._result
+
+    def done(self) -> bool:
+        return True
+
+
+class _CachingPoller:
+    """Wraps a service poller and stores the result once it completes."""
+
+    def __init__(self, poller, client: "CachingDocumentIntelligenceClient", cache_path: Path):
+        self._poller = poller
+        self._client = client
+        self._cache_path = cache_path
+
+    def result(self, timeout: Optional[float] = None):
+        result = self._poller.result(timeout=timeout)
+        self._client.save(self._cache_path, result)
+        return result
+
+    def done(self) -> bool:
+        return self._poller.done()
+
+
+class CachingDocumentIntelligenceClient:
+    """
+    Disk cache in front of DocumentIntelligenceClient.begin_analyze_document.
+
+    Analysis results are stored as gzipped JSON keyed by the SHA-256 of the
+    analyzed bytes, the model and the output format, so re-ingesting an
+    unchanged PDF (or experimenting with chunking parameters) needs no DI
+    call. With no inner client it is a replay-only stand-in that serves
+    cached results and raises LookupError on a miss, which lets the whole
+    DI path run offline.
+    """
+
+    def __init__(self, inner, cache_dir: Path):
+        self.inner = inner
+        self.cache_dir = cache_dir
+
+    def cache_path(self, content_hash: str, model_id: str, output_format: Optional[str]) -> Path:
+        output_format = str(output_format or "text")
+        return self.cache_dir / model_id / output_format / f"{content_hash}.json.gz"
+
+    def load(self, cache_path: Path):
+        from azure.ai.documentintelligence.models import AnalyzeResult
+
+        if not cache_path.exists():
+            return None
+        try:
+            with gzip.open(cache_path, "rt", encoding="utf-8") as f:
+                return AnalyzeResult(json.load(f))
+        except Exception as e:
+            print(f"Error reading cached Azure DI result {cache_path.name}: {e}")
+            return None
+
+    def save(self, cache_path: Path, result) -> None:
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = cache_path.with_suffix(".tmp")
+            with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+                json.dump(result.as_dict(), f)
+            tmp_path.replace(cache_path)
+        except Exception as e:
+            print(f"Error caching Azure DI result {cache_path.name}: {e}")
+
+    def begin_analyze_document(self, model_id: str, body, **kwargs):
+        output_format = kwargs.get("output_content_format")
+        cache_key = _body_sha256(body)
+        if kwargs.get("pages"):
+            cache_key = f"{cache_key}_pages_{kwargs['pages']}"
+        cache_path = self.cache_path(cache_key, model_id, output_format)
+
+        cached = self.load(cache_path)
+        if cached is not None:
+            print(f"  Using cached Azure DI result ({cache_path.name})")
+            return _CompletedPoller(cached)
+
+        if self.inner is None:
+            raise LookupError(
+                f"No cached Azure DI result for this document ({cache_path.name}) "
+                "and DOC_INTELLIGENCE_OFFLINE is set"
+            )
+
+        poller = self.inner.begin_analyze_document(model_id, body, **kwargs)
+        return _CachingPoller(poller, self, cache_path)
+
+
 def _get_client():
-    """Get Azure Document Intelligence client."""
+    """
+    Get Azure Document Intelligence client.
+
+    Wrapped with the on-disk result cache when DOC_INTELLIGENCE_CACHE_ENABLED
+    is set; replay-only (no network) when DOC_INTELLIGENCE_OFFLINE is set.
+    """
+    cache_dir = Path(settings.DOC_INTELLIGENCE_CACHE_DIRECTORY)
+    if settings.DOC_INTELLIGENCE_OFFLINE:
+        return CachingDocumentIntelligenceClient(None, cache_dir)
+
     from azure.ai.documentintelligence import DocumentIntelligenceClient
     from azure.core.credentials import AzureKeyCredential
 
-    return DocumentIntelligenceClient(
+    client = DocumentIntelligenceClient(
         endpoint=settings.AZURE_DOC_INTELLIGENCE_ENDPOINT,
         credential=AzureKeyCredential(settings.AZURE_DOC_INTELLIGENCE_KEY),
     )
+    if settings.DOC_INTELLIGENCE_CACHE_ENABLED:
+        return CachingDocumentIntelligenceClient(client, cache_dir)
+    return client
+
+
+class AnalyzedRange(NamedTuple):
+    """Analysis result for a contiguous page range of a PDF."""
+    page_offset: int  # result page N is page page_offset + N of the original PDF
+    result: object
+
+
+# Caps concurrent DI analyses across every file being ingested
+_analysis_slots = threading.BoundedSemaphore(max(1, settings.DOC_INTELLIGENCE_MAX_CONCURRENCY))
+
+
+def _analyze(client, body):
+    """Run one prebuilt-layout analysis inside the concurrency cap."""
+    with _analysis_slots:
+        poller = client.begin_analyze_document(
+            LAYOUT_MODEL,
+            body=body,
+            content_type="application/pdf",
+            output_content_format=settings.DOC_INTELLIGENCE_OUTPUT_FORMAT,
+        )
+        return poller.result()
+
+
+def _page_count(pdf_path: Path) -> int:
+    import fitz
+
+    from app.rag.image_extractor import fitz_lock
+
+    with fitz_lock, fitz.open(pdf_path) as doc:
+        return doc.page_count
+
+
+def _iter_page_ranges(pdf_path: Path, pages_per_range: int) -> Iterator[Tuple[int, bytes]]:
+    """
+    Split a PDF into sub-PDFs of at most pages_per_range pages, yielding
+    (page_offset, pdf_bytes) one range at a time.
+
+    PyMuPDF is not thread-safe: fitz_lock is taken per range, not across
+    yields, so other fitz calls (e.g. figure renders of the API) run
+    between ranges. The bytes are deterministic (no new /ID), so cached
+    range results stay valid.
+    """
+    import fitz
+
+    from app.rag.image_extractor import fitz_lock
+
+    with fitz_lock:
+        doc = fitz.open(pdf_path)
+    try:
+        for start in range(0, doc.page_count, pages_per_range):
+            with fitz_lock:
+                end = min(start + pages_per_range, doc.page_count) - 1
+                with fitz.open() as part:
+                    part.insert_pdf(doc, from_page=start, to_page=end)
+                    body = part.tobytes(garbage=3, deflate=True, no_new_id=True)
+            yield start, body
+    finally:
+        with fitz_lock:
+            doc.close()
+
+
+def analyze_pdf_with_azure_di(pdf_path: Path) -> List[AnalyzedRange]:
+    """
+    Run prebuilt-layout on a PDF and return the analysis per page range.
+
+    PDFs longer than DOC_INTELLIGENCE_PAGES_PER_RANGE pages are split into
+    page ranges that are analyzed concurrently (at most
+    DOC_INTELLIGENCE_MAX_CONCURRENCY analyses in flight process-wide), so
+    DI latency scales with range size rather than document size. Each range
+    is submitted as soon as it is split off, and the next one is only split
+    when an analysis slot is free, so at most one range per worker is held
+    in memory. Smaller files are sent as a stream rather than read into
+    memory first. Results are served from the on-disk cache when available.
+    Raises on any client or service error (or a cache miss in offline mode).
+    """
+    client = _get_client()
+
+    pages_per_range = settings.DOC_INTELLIGENCE_PAGES_PER_RANGE
+    page_count = _page_count(pdf_path) if pages_per_range > 0 else 0
+
+    if page_count <= pages_per_range or pages_per_range <= 0:
+        with open(pdf_path, "rb") as f:
+            return [AnalyzedRange(0, _analyze(client, f))]
+
+    range_count = -(-page_count // pages_per_range)
+    print(f"  Analyzing {pdf_path.name} in {range_count} page ranges of {pages_per_range} pages")
+    workers = min(range_count, max(1, settings.DOC_INTELLIGENCE_MAX_CONCURRENCY))
+    futures: List[Tuple[int, Future]] = []
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="azure-di") as pool:
+        in_flight = set()
+        for page_offset, body in _iter_page_ranges(pdf_path, pages_per_range):
+            if len(in_flight) >= workers:
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    # Stop splitting at the first failed range
+                    future.result()
+            future = pool.submit(_analyze, client, body)
+            del body
+            in_flight.add(future)
+            futures.append((page_offset, future))
+        return [AnalyzedRange(page_offset, future.result()) for page_offset, future in futures]
+
+
+def iter_azure_di_pages(
+    analyzed: List[AnalyzedRange], pdf_path: Path, file_metadata: dict
+) -> Iterator[Document]:
+    """
+    Yield one Document per non-empty page of the analyzed page ranges,
+    numbered by page of the original PDF. The page number printed on the
+    page, when Document Intelligence found one, is kept as page_label.
+
+    Falls back to a single Document with the full content of a range when
+    that range has no usable page spans.
+    """
+    output_format = settings.DOC_INTELLIGENCE_OUTPUT_FORMAT
+
+    def make_document(content: str, page_number: int, page_label: Optional[str] = None) -> Document:
+        metadata = {
+            **file_metadata,
+            "source": pdf_path.name,
+            "page": page_number,
+            "parser": "azure_doc_intelligence",
+            "result_type": output_format,
+        }
+        if page_label:
+            metadata["page_label"] = page_label
+        return Document(page_content=content, metadata=metadata)
+
+    for page_offset, result in analyzed:
+        pages_yielded = 0
+        page_labels = _extract_page_labels(result)
+        for page_number, page_content in _extract_page_contents(result, page_offset).items():
+            if page_content.strip():
+                pages_yielded += 1
+                yield make_document(
+                    page_content, page_offset + page_number, page_labels.get(page_number)
+                )
+
+        if not pages_yielded and result.content:
+            yield make_document(result.content, page_offset + 1)
 
 
 def load_pdf_with_azure_di(pdf_path: Path, file_metadata: dict) -> List[Document]:
@@ -39,55 +308,8 @@ def load_pdf_with_azure_di(pdf_path: Path, file_metadata: dict) -> List[Document
         List of Document objects with content and metadata.
     """
     try:
-        client = _get_client()
-
-        with open(pdf_path, "rb") as f:
-            pdf_bytes = f.read()
-
-        output_format = settings.DOC_INTELLIGENCE_OUTPUT_FORMAT
-
-        poller = client.begin_analyze_document(
-            "prebuilt-layout",
-            body=pdf_bytes,
-            content_type="application/pdf",
-            output_content_format=output_format,
-        )
-        result = poller.result()
-
-        documents = []
-
-        if result.pages:
-            for page in result.pages:
-                page_number = page.page_number
-
-                page_content = _extract_page_content(result, page_number)
-
-                if page_content.strip():
-                    lc_doc = Document(
-                        page_content=page_content,
-                        metadata={
-                            **file_metadata,
-                            "source": pdf_path.name,
-                            "page": page_number,
-                            "parser": "azure_doc_intelligence",
-                            "result_type": output_format,
-                        },
-                    )
-                    documents.append(lc_doc)
-
-        if not documents and result.content:
-            lc_doc = Document(
-                page_content=result.content,
-                metadata={
-                    **file_metadata,
-                    "source": pdf_path.name,
-                    "page": 1,
-                    "parser": "azure_doc_intelligence",
-                    "result_type": output_format,
-                },
-            )
-            documents.append(lc_doc)
-
+        analyzed = analyze_pdf_with_azure_di(pdf_path)
+        documents = list(iter_azure_di_pages(analyzed, pdf_path, file_metadata))
         print(f"  -> Azure DI extracted {len(documents)} pages from {pdf_path.name}")
         return documents
 
@@ -96,37 +318,60 @@ def load_pdf_with_azure_di(pdf_path: Path, file_metadata: dict) -> List[Document
         return []
 
 
-def _extract_page_content(result, page_number: int) -> str:
+def _extract_page_contents(result, page_offset: int = 0) -> Dict[int, str]:
     """
-    Extract content for a specific page from the analysis result.
+    Extract the content of every page in a single pass over the page spans.
 
-    If the result has markdown content, attempts to split by page.
-    Otherwise falls back to the full content for page 1.
+    Returns {page_number: content} in page order. A page without spans
+    gets the full content if it is page 1 of the original PDF (page 1 of
+    the first range, page_offset 0), otherwise an empty string.
     """
-    if not result.content:
-        return ""
-
-    if hasattr(result, "pages") and result.pages:
-        page_spans = []
-        for page in result.pages:
-            if page.page_number == page_number and hasattr(page, "spans") and page.spans:
-                for span in page.spans:
-                    page_spans.append((span.offset, span.offset + span.length))
+    contents: Dict[int, str] = {}
+    if not result.content or not result.pages:
+        return contents
+
+    for page in result.pages:
+        spans = getattr(page, "spans", None)
+        if spans:
+            page_spans = sorted((span.offset, span.offset + span.length) for span in spans)
+            contents[page.page_number] = "\n".join(
+                result.content[start:end] for start, end in page_spans
+            )
+        elif page.page_number == 1 and page_offset == 0:
+            contents[page.page_number] = result.content
+        else:
+            contents[page.page_number] = ""
 
-        if page_spans:
-            content_parts = []
-            for start, end in sorted(page_spans):
-                content_parts.append(result.content[start:end])
-            return "\n".join(content_parts)
+    return contents
 
-    if page_number == 1:
-        return result.content
 
-    return ""
+def _extract_page_labels(result) -> Dict[int, str]:
+    """
+    Printed page number of each page that has one, as {page_number: label},
+    from the paragraphs Document Intelligence tags with the pageNumber role.
+    """
+    labels: Dict[int, str] = {}
+    for paragraph in getattr(result, "paragraphs", None) or []:
+        regions = getattr(paragraph, "bounding_regions", None)
+        if getattr(paragraph, "role", None) != "pageNumber" or not regions:
+            continue
+        label = (paragraph.content or "").strip()
+        if label:
+            labels.setdefault(regions[0].page_number, label)
+    return labels
 
 
 def is_azure_di_available() -> bool:
     """Check if Azure Document Intelligence is properly configured and available."""
+    if settings.DOC_INTELLIGENCE_OFFLINE and settings.USE_AZURE_DOC_INTELLIGENCE:
+        # Replaying cached results needs no endpoint or key
+        try:
+            from azure.ai.documentintelligence.models import AnalyzeResult
+            return True
+        except ImportError:
+            print("Warning: azure-ai-documentintelligence package not installed")
+            return False
+
     if not settings.AZURE_DOC_INTELLIGENCE_ENDPOINT:
         print("Warning: AZURE_DOC_INTELLIGENCE_ENDPOINT not configured")
         return False
@@ -87,18 +87,21 @@ async def expand_query(question: str, model_id: Optional[str] = None) -> List[st
 async def retrieve_with_expansion(
     question: str,
     model_id: Optional[str] = None,
-    k: int = 4
+    k: int = 4,
+    queries: Optional[List[str]] = None
 ) -> List[Document]:
     """
     Retrieve documents using query expansion for better coverage.
 
-    Performs retrieval with the original query and expanded variants,
-    then deduplicates and ranks the results.
+    Performs retrieval with the original query and expanded variants in
+    one batched search (one embedding request, one vector query, one
+    rerank over the deduplicated union).
 
     Args:
         question: The user's question.
         model_id: LLM model for query expansion.
         k: Number of documents to retrieve per query.
+        queries: Already expanded queries (skips the expansion call).
 
     Returns:
         Deduplicated list of relevant documents.
@@ -106,23 +109,11 @@ async def retrieve_with_expansion(
     retriever = get_retriever(k=k)
 
     # Get expanded queries
-    queries = await expand_query(question, model_id)
-
-    # Retrieve documents for each query
-    all_docs = []
-    seen_content = set()
+    if queries is None:
+        queries = await expand_query(question, model_id)
 
-    for query in queries:
-        docs = retriever.invoke(query)
-        for doc in docs:
-            # Deduplicate by content hash
-            content_hash = hash(doc.page_content[:500])
-            if content_hash not in seen_content:
-                seen_content.add(content_hash)
-                all_docs.append(doc)
-
-    # Limit total documents to avoid context overflow
-    return all_docs[:k * 2]  # Allow up to 2x the normal limit for expanded queries
+    # Allow up to 2x the normal limit for expanded queries
+    return await retriever.amulti_query_search(queries, top_n=k * 2)
 
 
 # System prompt for the Maintenance AI Copilot
@@ -164,6 +155,8 @@ def format_docs(docs: List[Document]) -> str:
             location_info += f", Chapter: {chapter}"
         if section:
             location_info += f", Section: {section}"
+        if doc.metadata.get("referenced_as"):
+            location_info += f" ({doc.metadata['referenced_as']}, referenced by an earlier document)"
 
         formatted.append(f"[Document {i}] {location_info}\n{doc.page_content}")
     return "\n\n---\n\n".join(formatted)
@@ -318,13 +311,13 @@ async def _query_rag_legacy(
 
     # Retrieve documents - with or without query expansion
     if use_query_expansion:
-        docs = await retrieve_with_expansion(question, model_id, k)
-        # Track expanded queries for metadata
         expanded_queries = await expand_query(question, model_id)
+        docs = await retrieve_with_expansion(question, model_id, k, queries=expanded_queries)
+        # Track expanded queries for metadata
         queries_executed = expanded_queries
     else:
         retriever = get_retriever(k=k)
-        docs = retriever.invoke(question)
+        docs = await retriever.ainvoke(question)
 
     # Format context
     context = format_docs(docs)
@@ -412,6 +405,7 @@ async def query_rag_stream(
     """
     llm = get_llm(model_id=model_id)
     queries_executed = [question]
+    full_answer = ""
 
     # Emit initial status
     yield f"event: status\ndata: {json.dumps({'step': 'analyzing', 'message': 'Analyzing your question...'})}\n\n"
@@ -433,6 +427,16 @@ async def query_rag_stream(
         async for event in run_agentic_retrieval_streaming(question, model_id, chat_history):
             if event['type'] == 'status':
                 yield f"event: status\ndata: {json.dumps({'step': event['step'], 'message': event['message'], 'query': event.get('query', ''), 'index': event.get('index')})}\n\n"
+            elif event['type'] == 'token':
+                # The agent's own final answer, streamed as it is generated
+                if not full_answer:
+                    yield f"event: status\ndata: {json.dumps({'step': 'generating', 'message': 'Generating response...'})}\n\n"
+                full_answer += event['token']
+                yield f"event: token\ndata: {json.dumps({'token': event['token']})}\n\n"
+            elif event['type'] == 'discard':
+                # The streamed text preceded tool calls: not the answer
+                full_answer = ""
+                yield f"event: discard\ndata: {{}}\n\n"
             elif event['type'] == 'result':
                 agent_docs = event['docs']
                 queries_executed = event['queries_executed']
@@ -453,7 +457,8 @@ async def query_rag_stream(
             )
             docs.append(doc)
 
-        yield f"event: status\ndata: {json.dumps({'step': 'processing', 'message': f'Retrieved {len(docs)} documents across {len(queries_executed)} searches'})}\n\n"
+        if not full_answer:
+            yield f"event: status\ndata: {json.dumps({'step': 'processing', 'message': f'Retrieved {len(docs)} documents across {len(queries_executed)} searches'})}\n\n"
 
         mode = "agentic_streaming"
 
@@ -467,22 +472,10 @@ async def query_rag_stream(
         expanded_queries = await expand_query(question, model_id)
         queries_executed = expanded_queries
 
-        retriever = get_retriever(k=k)
-        all_docs = []
-        seen_content = set()
-
-        for i, query in enumerate(expanded_queries, 1):
-            short_query = query[:50] + "..." if len(query) > 50 else query
-            yield f"event: status\ndata: {json.dumps({'step': 'searching', 'message': f'Search {i}: {short_query}', 'query': query, 'index': i, 'total': len(expanded_queries)})}\n\n"
-
-            retriever_docs = retriever.invoke(query)
-            for doc in retriever_docs:
-                content_hash = hash(doc.page_content[:500])
-                if content_hash not in seen_content:
-                    seen_content.add(content_hash)
-                    all_docs.append(doc)
+        # All expanded queries are searched in one batch
+        yield f"event: status\ndata: {json.dumps({'step': 'searching', 'message': f'Searching {len(expanded_queries)} queries...', 'total': len(expanded_queries)})}\n\n"
 
-        docs = all_docs[:k * 2]
+        docs = await retrieve_with_expansion(question, model_id, k, queries=expanded_queries)
 
         yield f"event: status\ndata: {json.dumps({'step': 'processing', 'message': f'Found {len(docs)} relevant documents'})}\n\n"
 
@@ -495,48 +488,51 @@ async def query_rag_stream(
         print("Streaming: Using Basic RAG (no expansion)")
         yield f"event: status\ndata: {json.dumps({'step': 'searching', 'message': 'Searching documentation...'})}\n\n"
         retriever = get_retriever(k=k)
-        docs = retriever.invoke(question)
+        docs = await retriever.ainvoke(question)
 
         mode = "streaming"
 
     # =============================================================
     # GENERATE STREAMED RESPONSE
+    # Skipped when the agent already streamed its own final answer;
+    # otherwise (legacy modes, or the agent stopped without answering)
+    # generate the answer from the retrieved documents.
     # =============================================================
-    yield f"event: status\ndata: {json.dumps({'step': 'generating', 'message': 'Generating response...'})}\n\n"
-
-    # Format context from retrieved documents
-    context = format_docs(docs)
-
-    # Format history
-    history_messages = format_chat_history(chat_history or [])
-
-    # Create prompt
-    prompt = ChatPromptTemplate.from_messages([
-        ("system", SYSTEM_PROMPT),
-        MessagesPlaceholder(variable_name="chat_history", optional=True),
-        ("human", "{question}")
-    ])
-
-    # Prepare chain for streaming
-    chain = prompt | llm
-
-    # Stream tokens
-    full_answer = ""
-    async for chunk in chain.astream({
-        "context": context,
-        "question": question,
-        "chat_history": history_messages
-    }):
-        # Extract token from chunk
-        if hasattr(chunk, 'content'):
-            token = chunk.content
-        else:
-            token = str(chunk)
-
-        if token:
-            full_answer += token
-            # Yield SSE formatted token
-            yield f"event: token\ndata: {json.dumps({'token': token})}\n\n"
+    if not full_answer:
+        yield f"event: status\ndata: {json.dumps({'step': 'generating', 'message': 'Generating response...'})}\n\n"
+
+        # Format context from retrieved documents
+        context = format_docs(docs)
+
+        # Format history
+        history_messages = format_chat_history(chat_history or [])
+
+        # Create prompt
+        prompt = ChatPromptTemplate.from_messages([
+            ("system", SYSTEM_PROMPT),
+            MessagesPlaceholder(variable_name="chat_history", optional=True),
+            ("human", "{question}")
+        ])
+
+        # Prepare chain for streaming
+        chain = prompt | llm
+
+        # Stream tokens
+        async for chunk in chain.astream({
+            "context": context,
+            "question": question,
+            "chat_history": history_messages
+        }):
+            # Extract token from chunk
+            if hasattr(chunk, 'content'):
+                token = chunk.content
+            else:
+                token = str(chunk)
+
+            if token:
+                full_answer += token
+                # Yield SSE formatted token
+                yield f"event: token\ndata: {json.dumps({'token': token})}\n\n"
 
     # Format source documents for response
     sources = [
@@ -0,0 +1,190 @@
+"""
+Persisted Chunk Indexes.
+
+Shared plumbing of the indexes kept next to the Chroma data and keyed by
+chunk ID (lexical, reference and NumPy):
+
+- ChunkIndex: SQLite-backed base of the lexical and reference indexes.
+  Ingestion writes each embedding batch in one transaction as it is
+  stored in Chroma, so memory stays bounded by the batch size and another
+  process (the server while the ingestion script runs) reads the
+  committed batches straight from the file.
+- IndexSingleton: the process-wide instance of an index, checked once
+  against the collection and rebuilt from the stored chunks when the
+  index reports that it needs it (a SQLite index only when it is empty:
+  new file, other schema version, or not maintained in the current
+  retrieval mode).
+"""
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Callable, Generic, List, Optional, Sequence, TypeVar
+
+from langchain_core.documents import Document
+
+# Chunks read from Chroma per page during a rebuild
+REBUILD_PAGE_SIZE = 1000
+# Values bound per statement (SQLite limits host parameters)
+_SQL_BATCH = 500
+
+
+class ChunkIndex(ABC):
+    """
+    SQLite file of per-chunk entries.
+
+    Subclasses set NAME, SCHEMA_VERSION and SCHEMA (CREATE statements for a
+    "chunks" table with integer "id", unique "chunk_id" and "source"
+    columns plus their own tables, dropped in TABLES order) and implement
+    _insert() and _delete_rows(). A file with another schema version is
+    emptied on open (and so rebuilt on first use).
+    """
+
+    NAME = "chunk"
+    SCHEMA_VERSION = 1
+    SCHEMA: Sequence[str] = ()
+    TABLES: Sequence[str] = ()
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._lock = threading.Lock()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(path), check_same_thread=False, timeout=30)
+        # WAL: readers in other processes are not blocked by ingestion writes
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+        if version != self.SCHEMA_VERSION:
+            self._drop_tables()
+        self._create_tables()
+        self._conn.execute(f"PRAGMA user_version = {self.SCHEMA_VERSION}")
+        self._conn.commit()
+
+    def _create_tables(self) -> None:
+        for statement in self.SCHEMA:
+            self._conn.execute(statement)
+
+    def _drop_tables(self) -> None:
+        for table in self.TABLES:
+            self._conn.execute(f"DROP TABLE IF EXISTS {table}")
+
+    @abstractmethod
+    def _insert(self, documents: List[Document], ids: List[str]) -> None:
+        """Insert the entries of new chunks (inside the caller's transaction)."""
+
+    @abstractmethod
+    def _delete_rows(self, rows: List[int]) -> None:
+        """Delete the entries of the given chunks rows, except the rows themselves."""
+
+    def _delete_row_ids(self, rows: List[int]) -> None:
+        for start in range(0, len(rows), _SQL_BATCH):
+            batch = rows[start:start + _SQL_BATCH]
+            self._delete_rows(batch)
+            self._conn.execute(
+                f"DELETE FROM chunks WHERE id IN ({','.join('?' * len(batch))})", batch
+            )
+
+    def _delete_chunk_ids(self, chunk_ids: List[str]) -> None:
+        rows = []
+        for start in range(0, len(chunk_ids), _SQL_BATCH):
+            batch = chunk_ids[start:start + _SQL_BATCH]
+            rows.extend(row for (row,) in self._conn.execute(
+                f"SELECT id FROM chunks WHERE chunk_id IN ({','.join('?' * len(batch))})", batch
+            ))
+        self._delete_row_ids(rows)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM chunks").fetchone()[0]
+
+    def add_documents(self, documents: List[Document], ids: List[str]) -> None:
+        """Index chunks under their Chroma IDs (replacing existing entries)."""
+        with self._lock, self._conn:
+            self._delete_chunk_ids(ids)
+            self._insert(documents, ids)
+
+    def delete_source(self, source: str) -> None:
+        """Remove every chunk of a source file."""
+        with self._lock, self._conn:
+            rows = [row for (row,) in self._conn.execute(
+                "SELECT id FROM chunks WHERE source = ?", (source,)
+            )]
+            self._delete_row_ids(rows)
+
+    def delete_ids(self, chunk_ids: List[str]) -> None:
+        """Remove the given chunks (IDs not in the index are ignored)."""
+        with self._lock, self._conn:
+            self._delete_chunk_ids(chunk_ids)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._drop_tables()
+            self._create_tables()
+            self._conn.commit()
+
+    def needs_rebuild(self, collection) -> bool:
+        """
+        True if the index is empty while the collection is not.
+
+        A differing chunk count alone is no reason: while the ingestion
+        script runs, the collection and the file are both being written
+        batch by batch, and a rebuild would clear the file under it.
+        """
+        return len(self) == 0 and collection.count() > 0
+
+    def rebuild(self, collection) -> None:
+        """Re-index every chunk stored in the Chroma collection, page by page."""
+        print(f"Building {self.NAME} index from the vector store...")
+        self.clear()
+        offset = 0
+        while True:
+            result = collection.get(
+                include=["documents", "metadatas"], limit=REBUILD_PAGE_SIZE, offset=offset
+            )
+            ids = result.get("ids") or []
+            if not ids:
+                break
+            documents = [
+                Document(page_content=text or "", metadata=metadata or {})
+                for text, metadata in zip(result["documents"], result["metadatas"])
+            ]
+            self.add_documents(documents, ids)
+            offset += len(ids)
+        print(f"{self.NAME.capitalize()} index: {len(self)} chunks")
+
+
+IndexT = TypeVar("IndexT")
+
+
+class IndexSingleton(Generic[IndexT]):
+    """
+    Process-wide instance of a persisted chunk index.
+
+    The index is created by the factory on first use. With
+    reload_when_stale (indexes that hold a snapshot in memory), it is
+    reloaded whenever is_stale() reports that another process rewrote it.
+    The first time a collection is given (and after each reload), the index
+    is checked against it: if needs_rebuild() is true, it is rebuilt from
+    the stored chunks.
+    """
+
+    def __init__(self, factory: Callable[[], IndexT], reload_when_stale: bool = False):
+        self._factory = factory
+        self._reload_when_stale = reload_when_stale
+        self._index: Optional[IndexT] = None
+        self._lock = threading.Lock()
+        self._verified = False
+
+    def get(self, collection=None) -> IndexT:
+        with self._lock:
+            if self._index is None:
+                self._index = self._factory()
+                self._verified = False
+            elif self._reload_when_stale and self._index.is_stale():
+                self._index.load()
+                self._verified = False
+
+            if collection is not None and not self._verified:
+                if self._index.needs_rebuild(collection):
+                    self._index.rebuild(collection)
+                self._verified = True
+            return self._index
@@ -0,0 +1,468 @@
+"""
+Embedding Cache.
+
+Caches embeddings in front of the Azure OpenAI embeddings client.
+
+Query embeddings: technicians repeat the same questions and the agent /
+query expansion produce many near-identical searches, so a cache hit saves
+an Azure round trip on every retrieval hop. Two tiers:
+1. In-memory LRU (per process, bounded by entry count)
+2. SQLite file on disk (survives restarts, bounded by entry count)
+
+Chunk (document) embeddings: keyed by the exact chunk content, stored on
+disk only (bounded by entry count, least recently used dropped first), so
+re-ingesting unchanged text never calls Azure again.
+
+Keys are derived from the text (normalized for queries, exact for chunks)
+plus the embedding model and deployment, so changing the embedding
+configuration never serves stale vectors.
+"""
+import asyncio
+import hashlib
+import sqlite3
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from langchain_core.embeddings import Embeddings
+
+from app.core.config import settings
+
+# Prune the disk tier every N inserts rather than on every write
+_PRUNE_EVERY = 500
+# Query hits update last_used on disk in batches of up to N keys, not one
+# write per hit
+_TOUCH_FLUSH_EVERY = 100
+
+# Cache schema (SQLite user_version); caches with another schema are reset
+# on open
+CACHE_FORMAT_VERSION = 1
+
+
+def normalize_text(text: str) -> str:
+    """Normalize query text for cache lookups (collapse whitespace, casefold)."""
+    return " ".join(text.split()).casefold()
+
+
+def _cache_key(namespace: str, text: str) -> str:
+    """Hash of namespace + embedding configuration + text."""
+    raw = "|".join([
+        namespace,
+        settings.EMBEDDING_MODEL,
+        settings.AZURE_EMBEDDING_DEPLOYMENT,
+        text,
+    ])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _encode(vector: List[float]) -> bytes:
+    # float32, like the search backends: half the size of float64
+    return array("f", vector).tobytes()
+
+
+def _decode(blob: bytes) -> List[float]:
+    values = array("f")
+    values.frombytes(blob)
+    return values.tolist()
+
+
+class EmbeddingCache:
+    """Two-tier (memory LRU + SQLite) store for query and chunk embeddings."""
+
+    def __init__(
+        self,
+        db_path: Path,
+        memory_size: int,
+        max_disk_entries: int,
+        max_document_entries: int = 500000,
+    ):
+        self.db_path = db_path
+        self.memory_size = memory_size
+        self.max_disk_entries = max_disk_entries
+        self.max_document_entries = max_document_entries
+
+        # Encoded vectors: a list of Python floats takes ~8x the memory
+        self._memory: "OrderedDict[str, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._inserts_since_prune = 0
+        self._document_inserts_since_prune = 0
+        # Query keys hit since the last flush -> time of the last hit
+        self._pending_touches: Dict[str, float] = {}
+        self.stats = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "documents_reused": 0,
+            "documents_computed": 0,
+        }
+
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._closed = False
+        self._conn = sqlite3.connect(str(db_path), check_same_thread=False, timeout=30)
+        # WAL: the ingestion script and the server share the file without
+        # readers blocking on each other's writes
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+        if version != CACHE_FORMAT_VERSION:
+            self._conn.execute("DROP TABLE IF EXISTS query_embeddings")
+            self._conn.execute("DROP TABLE IF EXISTS document_embeddings")
+        self._conn.execute(f"PRAGMA user_version = {CACHE_FORMAT_VERSION}")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS query_embeddings ("
+            " key TEXT PRIMARY KEY, vector BLOB NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS document_embeddings ("
+            " key TEXT PRIMARY KEY, vector BLOB NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS document_embeddings_last_used"
+            " ON document_embeddings (last_used)"
+        )
+        self._conn.commit()
+
+    # -- memory tier ---------------------------------------------------------
+
+    def _memory_get(self, key: str) -> Optional[bytes]:
+        blob = self._memory.get(key)
+        if blob is not None:
+            self._memory.move_to_end(key)
+        return blob
+
+    def _memory_put(self, key: str, blob: bytes) -> None:
+        self._memory[key] = blob
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+    # -- query recency -------------------------------------------------------
+
+    def _touch(self, key: str) -> None:
+        """Record a query hit; last_used is written with the next flush."""
+        self._pending_touches[key] = time.time()
+        if len(self._pending_touches) >= _TOUCH_FLUSH_EVERY:
+            try:
+                self._flush_touches()
+                self._conn.commit()
+            except sqlite3.Error as e:
+                # Recency is best effort: drop the batch rather than grow it
+                print(f"Embedding cache: could not record query hits: {e}")
+                self._pending_touches.clear()
+
+    def _flush_touches(self) -> None:
+        """Write the pending last_used updates (inside the caller's transaction)."""
+        if not self._pending_touches:
+            return
+        self._conn.executemany(
+            "UPDATE query_embeddings SET last_used = ? WHERE key = ?",
+            [(last_used, key) for key, last_used in self._pending_touches.items()],
+        )
+        self._pending_touches.clear()
+
+    # -- public API ----------------------------------------------------------
+    #
+    # SQLite errors ("database is locked", corrupt file, ...) never reach the
+    # caller: a failed lookup is a miss and a failed store is skipped, so the
+    # embedding still comes from Azure. A closed cache (after shutdown)
+    # behaves like a disabled one.
+
+    def get_query(self, text: str) -> Optional[List[float]]:
+        """Look up a query embedding in memory, then on disk."""
+        key = _cache_key("query", normalize_text(text))
+        with self._lock:
+            if self._closed:
+                return None
+
+            blob = self._memory_get(key)
+            if blob is not None:
+                # Keeps the disk entry of queries only served from memory
+                self._touch(key)
+                self.stats["memory_hits"] += 1
+                return _decode(blob)
+
+            try:
+                row = self._conn.execute(
+                    "SELECT vector FROM query_embeddings WHERE key = ?", (key,)
+                ).fetchone()
+            except sqlite3.Error as e:
+                print(f"Embedding cache: query lookup failed: {e}")
+                row = None
+            if row is None:
+                self.stats["misses"] += 1
+                return None
+
+            self._touch(key)
+            self._memory_put(key, row[0])
+            self.stats["disk_hits"] += 1
+            return _decode(row[0])
+
+    def put_query(self, text: str, vector: List[float]) -> None:
+        """Store a query embedding in both tiers."""
+        key = _cache_key("query", normalize_text(text))
+        blob = _encode(vector)
+        with self._lock:
+            if self._closed:
+                return
+            self._memory_put(key, blob)
+            self._pending_touches.pop(key, None)
+            try:
+                self._flush_touches()
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO query_embeddings (key, vector, last_used) VALUES (?, ?, ?)",
+                    (key, blob, time.time()),
+                )
+                self._inserts_since_prune += 1
+                if self._inserts_since_prune >= _PRUNE_EVERY:
+                    self._prune()
+                self._conn.commit()
+            except sqlite3.Error as e:
+                print(f"Embedding cache: query store skipped: {e}")
+                self._pending_touches.clear()
+                self._rollback()
+
+    def get_documents(self, texts: List[str]) -> List[Optional[List[float]]]:
+        """Look up chunk embeddings by exact content; None for each miss."""
+        keys = [_cache_key("document", text) for text in texts]
+        found: Dict[str, List[float]] = {}
+        now = time.time()
+        with self._lock:
+            if self._closed:
+                return [None] * len(keys)
+            try:
+                # Stay well below SQLite's bound-parameter limit
+                for start in range(0, len(keys), 500):
+                    batch = keys[start:start + 500]
+                    placeholders = ",".join("?" * len(batch))
+                    rows = self._conn.execute(
+                        f"SELECT key, vector FROM document_embeddings WHERE key IN ({placeholders})",
+                        batch,
+                    ).fetchall()
+                    for key, blob in rows:
+                        found[key] = _decode(blob)
+                    if rows:
+                        # Chunks still in the corpus stay the most recently used
+                        self._conn.execute(
+                            f"UPDATE document_embeddings SET last_used = ? WHERE key IN ({placeholders})",
+                            [now, *batch],
+                        )
+                self._conn.commit()
+            except sqlite3.Error as e:
+                # Vectors already read are still valid; the rest are misses
+                print(f"Embedding cache: chunk lookup failed: {e}")
+                self._rollback()
+            self.stats["documents_reused"] += sum(1 for key in keys if key in found)
+        return [found.get(key) for key in keys]
+
+    def put_documents(self, texts: List[str], vectors: List[List[float]]) -> None:
+        """Store freshly computed chunk embeddings."""
+        now = time.time()
+        with self._lock:
+            self.stats["documents_computed"] += len(texts)
+            if self._closed:
+                return
+            try:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO document_embeddings (key, vector, last_used) VALUES (?, ?, ?)",
+                    [(_cache_key("document", text), _encode(vector), now)
+                     for text, vector in zip(texts, vectors)],
+                )
+                self._document_inserts_since_prune += len(texts)
+                if self._document_inserts_since_prune >= _PRUNE_EVERY:
+                    self._prune_documents()
+                self._conn.commit()
+            except sqlite3.Error as e:
+                print(f"Embedding cache: chunk store skipped: {e}")
+                self._rollback()
+
+    def _rollback(self) -> None:
+        """Discard the failed transaction (best effort)."""
+        try:
+            self._conn.rollback()
+        except sqlite3.Error:
+            pass
+
+    def _prune(self) -> None:
+        """Drop least recently used disk entries beyond the size limit."""
+        self._inserts_since_prune = 0
+        self._conn.execute(
+            "DELETE FROM query_embeddings WHERE key NOT IN ("
+            " SELECT key FROM query_embeddings ORDER BY last_used DESC LIMIT ?)",
+            (self.max_disk_entries,),
+        )
+
+    def _prune_documents(self) -> None:
+        """
+        Drop least recently used chunk embeddings beyond the size limit.
+
+        Re-ingesting a changed file adds embeddings for its new chunks; the
+        old ones are no longer looked up and age out here.
+        """
+        self._document_inserts_since_prune = 0
+        self._conn.execute(
+            "DELETE FROM document_embeddings WHERE last_used < ("
+            " SELECT last_used FROM document_embeddings"
+            " ORDER BY last_used DESC LIMIT 1 OFFSET ?)",
+            (self.max_document_entries,),
+        )
+
+    def close(self) -> None:
+        """
+        Write the pending query hits and close the database. Later calls
+        on the instance behave as with the cache disabled.
+        """
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._memory.clear()
+            try:
+                self._flush_touches()
+                self._conn.commit()
+            except sqlite3.Error as e:
+                print(f"Embedding cache: could not record query hits: {e}")
+            self._conn.close()
+
+    def get_stats(self) -> Dict[str, int]:
+        """Hit/miss counters and tier sizes."""
+        with self._lock:
+            if self._closed:
+                return {**self.stats, "memory_entries": 0, "disk_entries": 0, "document_entries": 0}
+            disk_entries = self._conn.execute(
+                "SELECT COUNT(*) FROM query_embeddings"
+            ).fetchone()[0]
+            document_entries = self._conn.execute(
+                "SELECT COUNT(*) FROM document_embeddings"
+            ).fetchone()[0]
+            return {
+                **self.stats,
+                "memory_entries": len(self._memory),
+                "disk_entries": disk_entries,
+                "document_entries": document_entries,
+            }
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    Embeddings wrapper that serves query and chunk embeddings from the
+    EmbeddingCache, calling the wrapped client only for cache misses.
+    """
+
+    def __init__(self, base: Embeddings, cache: EmbeddingCache):
+        self.base = base
+        self.cache = cache
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        vectors = self.cache.get_documents(texts)
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+        if missing:
+            computed = self.base.embed_documents([texts[i] for i in missing])
+            self.cache.put_documents([texts[i] for i in missing], computed)
+            for i, vector in zip(missing, computed):
+                vectors[i] = vector
+        return vectors
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        vectors = await asyncio.to_thread(self.cache.get_documents, texts)
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+        if missing:
+            computed = await self.base.aembed_documents([texts[i] for i in missing])
+            await asyncio.to_thread(
+                self.cache.put_documents, [texts[i] for i in missing], computed
+            )
+            for i, vector in zip(missing, computed):
+                vectors[i] = vector
+        return vectors
+
+    def embed_query(self, text: str) -> List[float]:
+        vector = self.cache.get_query(text)
+        if vector is None:
+            vector = self.base.embed_query(text)
+            self.cache.put_query(text, vector)
+        return vector
+
+    async def aembed_query(self, text: str) -> List[float]:
+        # SQLite lookups are short but still blocking I/O
+        vector = await asyncio.to_thread(self.cache.get_query, text)
+        if vector is None:
+            vector = await self.base.aembed_query(text)
+            await asyncio.to_thread(self.cache.put_query, text, vector)
+        return vector
+
+    def embed_queries(self, texts: List[str]) -> List[List[float]]:
+        """Embed several queries: query cache first, then one request for the misses."""
+        vectors = [self.cache.get_query(text) for text in texts]
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+        if missing:
+            computed = self.base.embed_documents([texts[i] for i in missing])
+            for i, vector in zip(missing, computed):
+                self.cache.put_query(texts[i], vector)
+                vectors[i] = vector
+        return vectors
+
+    async def aembed_queries(self, texts: List[str]) -> List[List[float]]:
+        vectors = await asyncio.to_thread(lambda: [self.cache.get_query(text) for text in texts])
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+        if missing:
+            computed = await self.base.aembed_documents([texts[i] for i in missing])
+
+            def store() -> None:
+                for i, vector in zip(missing, computed):
+                    self.cache.put_query(texts[i], vector)
+
+            await asyncio.to_thread(store)
+            for i, vector in zip(missing, computed):
+                vectors[i] = vector
+        return vectors
+
+
+# Global cache instance shared by all embeddings clients in the process
+_embedding_cache: Optional[EmbeddingCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_embedding_cache() -> EmbeddingCache:
+    """Get the process-wide embedding cache (singleton)."""
+    global _embedding_cache
+    with _cache_lock:
+        if _embedding_cache is None:
+            _embedding_cache = EmbeddingCache(
+                db_path=Path(settings.EMBEDDING_CACHE_DIRECTORY) / "embeddings.sqlite3",
+                memory_size=settings.QUERY_EMBEDDING_CACHE_MEMORY_SIZE,
+                max_disk_entries=settings.QUERY_EMBEDDING_CACHE_MAX_DISK_ENTRIES,
+                max_document_entries=settings.DOCUMENT_EMBEDDING_CACHE_MAX_ENTRIES,
+            )
+        return _embedding_cache
+
+
+def close_embedding_cache() -> None:
+    """Flush and close the process-wide embedding cache (on shutdown)."""
+    global _embedding_cache
+    with _cache_lock:
+        if _embedding_cache is not None:
+            _embedding_cache.close()
+            _embedding_cache = None
+
+
+def get_document_cache_counters() -> Dict[str, int]:
+    """Cheap snapshot of the chunk-embedding reuse counters (no disk access)."""
+    if not settings.EMBEDDING_CACHE_ENABLED:
+        return {"documents_reused": 0, "documents_computed": 0}
+    stats = get_embedding_cache().stats
+    return {
+        "documents_reused": stats["documents_reused"],
+        "documents_computed": stats["documents_computed"],
+    }
+
+
+def get_embedding_cache_stats() -> Dict[str, int]:
+    """Get embedding cache metrics, or an empty dict when caching is disabled."""
+    if not settings.EMBEDDING_CACHE_ENABLED:
+        return {}
+    try:
+        return get_embedding_cache().get_stats()
+    except Exception as e:
+        print(f"Error reading embedding cache stats: {e}")
+        return {}
@@ -1,17 +1,62 @@
 """Azure OpenAI Embeddings Configuration."""
-import httpx
+from typing import List
+
+from langchain_core.embeddings import Embeddings
 from langchain_openai import AzureOpenAIEmbeddings
 from app.core.config import settings
+from app.core.http_clients import AZURE_OPENAI, get_async_http_client, get_http_client
 
 
-def get_embeddings() -> AzureOpenAIEmbeddings:
-    """Get Azure OpenAI embeddings instance with SSL handling for corporate networks."""
-    http_client = httpx.Client(verify=False)
+def get_azure_embeddings() -> AzureOpenAIEmbeddings:
+    """
+    Get Azure OpenAI embeddings instance with SSL handling for corporate networks.
 
+    Client-side retries are disabled: 429s, connection errors, timeouts and
+    5xx responses are retried by the rate limiter.
+    """
     return AzureOpenAIEmbeddings(
         azure_deployment=settings.AZURE_EMBEDDING_DEPLOYMENT,
         azure_endpoint=settings.AZURE_OPENAI_ENDPOINT,
         api_key=settings.AZURE_OPENAI_API_KEY,
         api_version=settings.AZURE_EMBEDDING_API_VERSION,
-        http_client=http_client,
-    )
\ No newline at end of file
+        http_client=get_http_client(AZURE_OPENAI),
+        http_async_client=get_async_http_client(AZURE_OPENAI),
+        max_retries=0,
+    )
+
+
+def get_embeddings() -> Embeddings:
+    """
+    Get the embeddings client used by the vector store.
+
+    Wraps the Azure client with the shared rate limiter (TPM/RPM quota,
+    Retry-After aware retries) and, when EMBEDDING_CACHE_ENABLED is set,
+    the embedding cache in front of it, so cache hits use no quota.
+    """
+    from app.rag.rate_limiter import RateLimitedEmbeddings, get_embedding_rate_limiter
+    embeddings = RateLimitedEmbeddings(get_azure_embeddings(), get_embedding_rate_limiter())
+    if not settings.EMBEDDING_CACHE_ENABLED:
+        return embeddings
+
+    from app.rag.embedding_cache import CachedEmbeddings, get_embedding_cache
+    return CachedEmbeddings(embeddings, get_embedding_cache())
+
+
+def embed_queries(embeddings: Embeddings, queries: List[str]) -> List[List[float]]:
+    """
+    Embed several search queries in one request.
+
+    Uses the query tier of the embedding cache when the client has one
+    (only the misses are sent); otherwise one embed_documents call, which
+    returns the same vectors as embed_query for each text.
+    """
+    if hasattr(embeddings, "embed_queries"):
+        return embeddings.embed_queries(queries)
+    return embeddings.embed_documents(queries)
+
+
+async def aembed_queries(embeddings: Embeddings, queries: List[str]) -> List[List[float]]:
+    """Async version of embed_queries."""
+    if hasattr(embeddings, "aembed_queries"):
+        return await embeddings.aembed_queries(queries)
+    return await embeddings.aembed_documents(queries)
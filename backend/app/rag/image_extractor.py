@@ -12,18 +12,51 @@ Uses a caption-anchored approach to extract complete figure regions:
 This captures the full visual composition including vector graphics,
 text annotations, labels, and all embedded images - exactly as they
 appear in the original PDF document.
+
+Pages are processed in ranges on a process pool (each worker opens its
+own fitz document) and the per-page manifests are merged at the end.
+PyMuPDF is not thread-safe: within a process, every fitz call holds
+fitz_lock.
+
+With FIGURE_RENDER_MODE=lazy, ingestion only records each figure (page,
+clip rect, caption) in figures.json; the image route renders a figure
+the first time it is requested and keeps the PNG as a cache.
 """
+import bisect
 import json
+import multiprocessing
+import os
 import re
+import shutil
+import threading
 import fitz  # PyMuPDF
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
 
 from app.core.config import settings
 
 # Base directory for extracted images
 IMAGES_BASE_DIR = Path(settings.RAW_PDFS_DIRECTORY).parent / "images"
 
+# Figure manifest (clip rect + caption per figure) kept next to the images
+FIGURES_MANIFEST_FILENAME = "figures.json"
+
+# PyMuPDF is not thread-safe: every fitz call of the process (PDF loader,
+# page counting, DI page-range splitting, figure rendering) holds this
+# lock. Process pool workers each have their own, uncontended copy.
+fitz_lock = threading.RLock()
+
+# Held while a file's figure directory is swapped and while an on-demand
+# render writes its PNG, so a render never writes into a directory being
+# swapped (a directory cannot be renamed over another on Windows)
+_images_dir_lock = threading.Lock()
+
+# On-demand renders in flight: (pdf_stem, image_file) -> [lock, waiters]
+_figure_render_locks: Dict[Tuple[str, str], list] = {}
+_figure_render_locks_guard = threading.Lock()
+
 # Rendering quality (DPI). PDF default is 72 DPI.
 RENDER_DPI = 200
 ZOOM_FACTOR = RENDER_DPI / 72
@@ -63,62 +96,120 @@ def get_manifest_path(pdf_name: str) -> Path:
     return get_images_dir(pdf_name) / "manifest.json"
 
 
+def _rects_near(a: fitz.Rect, b: fitz.Rect, merge_distance: float) -> bool:
+    """True if a, grown by merge_distance on every side, intersects b (fitz semantics)."""
+    if b.is_empty:
+        return False
+    x0 = a.x0 - merge_distance
+    y0 = a.y0 - merge_distance
+    x1 = a.x1 + merge_distance
+    y1 = a.y1 + merge_distance
+    return x0 < x1 and y0 < y1 and x0 < b.x1 and b.x0 < x1 and y0 < b.y1 and b.y0 < y1
+
+
 def _merge_rectangles(rects: List[fitz.Rect], merge_distance: float) -> List[fitz.Rect]:
     """
     Merge overlapping or nearby rectangles into larger figure groups.
 
-    Uses iterative merging: keeps combining rectangles that are within
-    merge_distance of each other until no more merges are possible.
-    This groups all sub-images of a composite figure into a single region.
+    Groups all sub-images of a composite figure into a single region: any
+    two groups whose bounding boxes are within merge_distance of each other
+    are merged, until no such pair is left.
+
+    Each round sweeps the groups left to right (by x0), comparing each one
+    only with the clusters still open on the sweep line (clusters whose
+    right edge plus merge_distance reaches it) rather than with every other
+    rectangle, and absorbs every open cluster it is near. Clusters grow
+    during the sweep, so a round can miss a pair; rounds repeat until a
+    sweep merges nothing.
+
+    Growing a box never makes it less near to another, so the result is the
+    same as merging pairs in any order: regions are returned in the order of
+    their first input rectangle, exactly like the original pairwise
+    expand-and-intersect loop.
     """
     if not rects:
         return []
 
-    merged = [fitz.Rect(r) for r in rects]
-    changed = True
+    # (index of the first input rectangle in the group, group bounding box)
+    groups = [(index, fitz.Rect(r)) for index, r in enumerate(rects)]
 
-    while changed:
-        changed = False
-        new_merged = []
-        used = [False] * len(merged)
+    while True:
+        merged_any = False
+        closed: List[Tuple[int, fitz.Rect]] = []
+        open_clusters: List[Tuple[int, fitz.Rect]] = []
 
-        for i in range(len(merged)):
-            if used[i]:
-                continue
+        for first, rect in sorted(groups, key=lambda group: group[1].x0):
+            still_open = []
+            for other_first, other_rect in open_clusters:
+                if other_rect.x1 + merge_distance <= rect.x0:
+                    # Cannot reach this or any later group: the cluster is final for this round
+                    closed.append((other_first, other_rect))
+                    continue
+                # Grow the earlier group, as the pairwise loop did
+                near = (
+                    _rects_near(other_rect, rect, merge_distance)
+                    if other_first < first
+                    else _rects_near(rect, other_rect, merge_distance)
+                )
+                if near:
+                    first = min(first, other_first)
+                    rect = rect | other_rect
+                    merged_any = True
+                else:
+                    still_open.append((other_first, other_rect))
+            still_open.append((first, rect))
+            open_clusters = still_open
 
-            current = fitz.Rect(merged[i])
+        groups = sorted(closed + open_clusters, key=lambda group: group[0])
+        if not merged_any:
+            return [rect for _, rect in groups]
 
-            for j in range(i + 1, len(merged)):
-                if used[j]:
-                    continue
 
-                # Expand current rect by merge_distance and check overlap
-                expanded = fitz.Rect(
-                    current.x0 - merge_distance,
-                    current.y0 - merge_distance,
-                    current.x1 + merge_distance,
-                    current.y1 + merge_distance
-                )
+class _VerticalIndex:
+    """
+    Items of a page sorted by top edge, for vertical range queries.
 
-                if expanded.intersects(merged[j]):
-                    # Merge: union of current and the nearby rect
-                    current = current | merged[j]
-                    used[j] = True
-                    changed = True
+    Lookups return candidates from a bisect range (padded by the tallest
+    item); callers apply their exact conditions to the candidates. The sort
+    is stable, so items with the same top keep their page order.
+    """
 
-            new_merged.append(current)
-            used[i] = True
+    def __init__(self, items: List, rects: List[Tuple[float, float, float, float]]):
+        order = sorted(range(len(items)), key=lambda i: rects[i][1])
+        self.items = [items[i] for i in order]
+        self.tops = [rects[i][1] for i in order]
+        self.max_height = max((r[3] - r[1] for r in rects), default=0.0)
+
+    def starting_between(self, y0: float, y1: float) -> List:
+        """Items whose top edge may lie in [y0, y1], in top-to-bottom order."""
+        lo = bisect.bisect_left(self.tops, y0 - 1)
+        hi = bisect.bisect_right(self.tops, y1 + 1)
+        return self.items[lo:hi]
+
+    def overlapping(self, y0: float, y1: float) -> List:
+        """Items whose vertical extent may overlap [y0, y1]."""
+        return self.starting_between(y0 - self.max_height, y1)
+
+
+def _index_text_blocks(text_blocks: List[Tuple]) -> _VerticalIndex:
+    """Index the text blocks of a page as (block, is_caption) items."""
+    blocks = [block for block in text_blocks if block[6] == 0]  # 0 = text, 1 = image
+    items = [
+        (block, any(pattern.search(block[4]) for pattern in FIGURE_CAPTION_PATTERNS))
+        for block in blocks
+    ]
+    return _VerticalIndex(items, [block[:4] for block in blocks])
 
-        merged = new_merged
 
-    return merged
+def _index_rects(rects: List[fitz.Rect]) -> _VerticalIndex:
+    return _VerticalIndex(rects, [tuple(rect) for rect in rects])
 
 
 def _find_caption_below(
     fig_rect: fitz.Rect,
-    text_blocks: List[Tuple],
+    text_index: _VerticalIndex,
     search_distance: float,
-) -> Optional[fitz.Rect]:
+) -> Optional[Tuple]:
     """
     Search for a figure caption text block below a figure region.
 
@@ -127,39 +218,27 @@ def _find_caption_below(
     The caption does NOT need to horizontally overlap with the image
     since annotations can shift captions left/right.
 
-    Returns the caption's bounding rect, or None if not found.
+    Returns the caption's text block (the nearest one), or None if not found.
     """
-    best_caption = None
-    best_distance = search_distance + 1  # sentinel
-
-    for block in text_blocks:
-        # text blocks: (x0, y0, x1, y1, text, block_no, block_type)
-        # block_type 0 = text, 1 = image
-        if block[6] != 0:
-            continue
-
-        bx0, by0, bx1, by1, text = block[0], block[1], block[2], block[3], block[4]
+    candidates = text_index.starting_between(fig_rect.y1 - 10, fig_rect.y1 + search_distance)
 
+    # Candidates come top to bottom: the first caption in range is the nearest
+    for block, is_caption in candidates:
         # Caption must start below (or near the bottom of) the figure
-        distance_below = by0 - fig_rect.y1
+        distance_below = block[1] - fig_rect.y1
         if distance_below < -10 or distance_below > search_distance:
             continue
 
-        # Check if the text matches a figure caption pattern
-        for pattern in FIGURE_CAPTION_PATTERNS:
-            if pattern.search(text):
-                if distance_below < best_distance:
-                    best_distance = distance_below
-                    best_caption = fitz.Rect(bx0, by0, bx1, by1)
-                break
+        if is_caption:
+            return block
 
-    return best_caption
+    return None
 
 
 def _expand_region_with_content(
     fig_rect: fitz.Rect,
-    text_blocks: List[Tuple],
-    image_rects: List[fitz.Rect],
+    text_index: _VerticalIndex,
+    image_index: _VerticalIndex,
 ) -> fitz.Rect:
     """
     Expand the figure region horizontally to include all text annotations
@@ -176,10 +255,7 @@ def _expand_region_with_content(
     result = fitz.Rect(fig_rect)
 
     # Include text blocks that are vertically within the figure range
-    for block in text_blocks:
-        if block[6] != 0:
-            continue
-
+    for block, _ in text_index.overlapping(y_top - 5, y_bottom + 5):
         bx0, by0, bx1, by1, text = block[0], block[1], block[2], block[3], block[4]
         block_rect = fitz.Rect(bx0, by0, bx1, by1)
 
@@ -200,7 +276,7 @@ def _expand_region_with_content(
         result = result | block_rect
 
     # Also include all image rects that overlap vertically
-    for img_rect in image_rects:
+    for img_rect in image_index.overlapping(y_top - 5, y_bottom + 5):
         if img_rect.y1 < y_top - 5 or img_rect.y0 > y_bottom + 5:
             continue
         result = result | img_rect
@@ -208,23 +284,8 @@ def _expand_region_with_content(
     return result
 
 
-def extract_images_from_pdf(pdf_path: Path) -> Dict[int, List[str]]:
-    """
-    Extract complete figure regions from a PDF using page region rendering.
-
-    Uses a caption-anchored approach:
-    1. Detects all image bounding boxes using get_image_info()
-    2. Filters out small decorative images (icons, bullets)
-    3. Groups nearby images into figure clusters using rectangle merging
-    4. For each cluster, searches for a figure caption ("Fig.X-Y") below
-    5. Expands the region to include all text annotations within the
-       vertical range of the figure (labels, notes, mass info, etc.)
-    6. Renders the complete region with get_pixmap(clip=rect) at high DPI
-
-    This produces complete figures with all vector graphics, annotations,
-    captions and labels preserved - exactly as they appear in the PDF.
-    """
-    pdf_name = pdf_path.name
+def prepare_images_dir(pdf_name: str) -> Path:
+    """Create the images directory for a PDF, removing previously rendered figures."""
     images_dir = get_images_dir(pdf_name)
 
     # Clear existing images for this PDF
@@ -237,122 +298,367 @@ def extract_images_from_pdf(pdf_path: Path) -> Dict[int, List[str]]:
             old_file.unlink()
 
     images_dir.mkdir(parents=True, exist_ok=True)
+    return images_dir
 
-    manifest: Dict[int, List[str]] = {}
 
-    try:
-        doc = fitz.open(str(pdf_path))
-        print(f"  Extracting figure regions from {pdf_name} ({len(doc)} pages)...")
+def prepare_staging_dir(pdf_name: str) -> Path:
+    """Create an empty staging directory for new figures of a PDF (see FigureExtraction.commit)."""
+    staging_dir = IMAGES_BASE_DIR / f".staging_{Path(pdf_name).stem}"
+    shutil.rmtree(staging_dir, ignore_errors=True)
+    staging_dir.mkdir(parents=True)
+    return staging_dir
 
-        zoom_matrix = fitz.Matrix(ZOOM_FACTOR, ZOOM_FACTOR)
-        total_figures = 0
 
-        for page_num in range(len(doc)):
-            page = doc[page_num]
-            page_number = page_num + 1
+class FigureRegion(NamedTuple):
+    """A detected figure: page region to render and its caption text (if found)."""
+    clip: fitz.Rect
+    caption: Optional[str]
 
-            # Get image info with bounding boxes on the page
-            image_info = page.get_image_info(xrefs=True)
 
-            if not image_info:
-                continue
+def find_figures(
+    page: fitz.Page,
+    text_blocks: Optional[List[Tuple]] = None,
+) -> List[FigureRegion]:
+    """
+    Detect the complete figure regions of a page (padded, clipped to the page).
 
-            # Collect valid image rectangles (filter out tiny decorative images)
-            image_rects = []
-            for img in image_info:
-                bbox = img.get("bbox")
-                if not bbox:
-                    continue
+    text_blocks are the page's get_text("blocks") output; pass them when the
+    caller already extracted them (e.g. for the page text) to avoid a second
+    text extraction. They are only computed here for pages with images.
+    """
+    # Get image info with bounding boxes on the page
+    image_info = page.get_image_info(xrefs=True)
 
-                rect = fitz.Rect(bbox)
+    if not image_info:
+        return []
 
-                # Filter out small images (icons, bullets, decorative elements)
-                if rect.width < MIN_IMAGE_WIDTH_PT or rect.height < MIN_IMAGE_HEIGHT_PT:
-                    continue
+    # Collect valid image rectangles (filter out tiny decorative images)
+    image_rects = []
+    for img in image_info:
+        bbox = img.get("bbox")
+        if not bbox:
+            continue
 
-                image_rects.append(rect)
+        rect = fitz.Rect(bbox)
 
-            if not image_rects:
-                continue
+        # Filter out small images (icons, bullets, decorative elements)
+        if rect.width < MIN_IMAGE_WIDTH_PT or rect.height < MIN_IMAGE_HEIGHT_PT:
+            continue
 
-            # Merge nearby images into figure groups
-            figure_regions = _merge_rectangles(image_rects, MERGE_DISTANCE_PT)
+        image_rects.append(rect)
 
-            # Get text blocks for caption detection and content expansion
-            text_blocks = page.get_text("blocks")
+    if not image_rects:
+        return []
 
-            page_rect = page.rect
+    # Merge nearby images into figure groups
+    figure_regions = _merge_rectangles(image_rects, MERGE_DISTANCE_PT)
+
+    # Get text blocks for caption detection and content expansion
+    if text_blocks is None:
+        text_blocks = page.get_text("blocks")
+
+    # Sorted by top edge, so each figure only visits nearby blocks/images
+    text_index = _index_text_blocks(text_blocks)
+    image_index = _index_rects(image_rects)
+
+    page_rect = page.rect
+
+    # Phase 1: Build expanded regions for each figure cluster
+    expanded_regions = []
+    captions: List[Tuple[fitz.Rect, str]] = []
+    for fig_rect in figure_regions:
+        # Step 1: Search for a figure caption below this image cluster
+        caption = _find_caption_below(
+            fig_rect, text_index, CAPTION_SEARCH_DISTANCE_PT
+        )
+
+        # Step 2: Build vertical extent (images top -> caption bottom)
+        if caption:
+            caption_rect = fitz.Rect(caption[:4])
+            fig_rect = fig_rect | caption_rect
+            captions.append((caption_rect, " ".join(caption[4].split())))
+
+        # Step 3: Expand horizontally to include all annotations/labels
+        # within the figure's vertical range
+        fig_rect = _expand_region_with_content(
+            fig_rect, text_index, image_index
+        )
+
+        expanded_regions.append(fig_rect)
+
+    # Phase 2: Merge overlapping expanded regions
+    # (e.g. robot arm + CAUTION sign that both map to the same caption)
+    final_regions = _merge_rectangles(expanded_regions, 0)
+
+    figures = []
+    for fig_rect in final_regions:
+        # Add small padding for visual breathing room
+        padded = fitz.Rect(
+            fig_rect.x0 - FIGURE_PADDING_PT,
+            fig_rect.y0 - FIGURE_PADDING_PT,
+            fig_rect.x1 + FIGURE_PADDING_PT,
+            fig_rect.y1 + FIGURE_PADDING_PT
+        )
+
+        # Clip to page bounds
+        padded = padded & page_rect
+
+        if padded.is_empty:
+            continue
 
-            # Phase 1: Build expanded regions for each figure cluster
-            expanded_regions = []
-            for fig_rect in figure_regions:
-                # Step 1: Search for a figure caption below this image cluster
-                caption_rect = _find_caption_below(
-                    fig_rect, text_blocks, CAPTION_SEARCH_DISTANCE_PT
-                )
+        # Captions of the clusters that ended up in this region
+        texts = []
+        for caption_rect, text in captions:
+            if fig_rect.contains(caption_rect) and text not in texts:
+                texts.append(text)
 
-                # Step 2: Build vertical extent (images top -> caption bottom)
-                if caption_rect:
-                    fig_rect = fig_rect | caption_rect
+        figures.append(FigureRegion(padded, " / ".join(texts) or None))
 
-                # Step 3: Expand horizontally to include all annotations/labels
-                # within the figure's vertical range
-                fig_rect = _expand_region_with_content(
-                    fig_rect, text_blocks, image_rects
-                )
+    return figures
 
-                expanded_regions.append(fig_rect)
-
-            # Phase 2: Merge overlapping expanded regions
-            # (e.g. robot arm + CAUTION sign that both map to the same caption)
-            final_regions = _merge_rectangles(expanded_regions, 0)
-
-            # Phase 3: Render each unique figure region
-            page_images = []
-            for fig_idx, fig_rect in enumerate(final_regions):
-                # Add small padding for visual breathing room
-                padded = fitz.Rect(
-                    fig_rect.x0 - FIGURE_PADDING_PT,
-                    fig_rect.y0 - FIGURE_PADDING_PT,
-                    fig_rect.x1 + FIGURE_PADDING_PT,
-                    fig_rect.y1 + FIGURE_PADDING_PT
-                )
 
-                # Clip to page bounds
-                padded = padded & page_rect
+def find_figure_regions(
+    page: fitz.Page,
+    text_blocks: Optional[List[Tuple]] = None,
+) -> List[fitz.Rect]:
+    """Detect the complete figure regions of a page (see find_figures)."""
+    return [figure.clip for figure in find_figures(page, text_blocks)]
 
-                if padded.is_empty:
-                    continue
 
-                # Render the figure region at high DPI
-                pixmap = page.get_pixmap(matrix=zoom_matrix, clip=padded)
+def _figure_records(page_number: int, figures: List[FigureRegion]) -> List[Dict]:
+    """Manifest entries (file name, clip rect, caption) for the figures of a page."""
+    return [
+        {
+            "file": f"page_{page_number}_fig_{fig_idx + 1}.png",
+            "clip": [figure.clip.x0, figure.clip.y0, figure.clip.x1, figure.clip.y1],
+            "caption": figure.caption,
+        }
+        for fig_idx, figure in enumerate(figures)
+    ]
+
+
+def _render_png(page: fitz.Page, clip: fitz.Rect) -> bytes:
+    """Render a figure region at RENDER_DPI as PNG bytes."""
+    zoom_matrix = fitz.Matrix(ZOOM_FACTOR, ZOOM_FACTOR)
+    return page.get_pixmap(matrix=zoom_matrix, clip=clip).tobytes("png")
+
+
+def _write_image(image_path: Path, data: bytes) -> None:
+    # Write to a temporary file first: the image route may be reading it
+    tmp_path = image_path.with_name(f".{image_path.name}.tmp")
+    tmp_path.write_bytes(data)
+    tmp_path.replace(image_path)
+
 
-                image_filename = f"page_{page_number}_fig_{fig_idx + 1}.png"
-                image_path = images_dir / image_filename
-                pixmap.save(str(image_path))
+def render_figure(page: fitz.Page, clip: fitz.Rect, image_path: Path) -> None:
+    """Render a figure region at RENDER_DPI and save it as PNG."""
+    _write_image(image_path, _render_png(page, clip))
 
-                page_images.append(image_filename)
-                total_figures += 1
 
-            if page_images:
-                manifest[page_number] = page_images
+def _render_records(page: fitz.Page, records: List[Dict], images_dir: Path) -> None:
+    for record in records:
+        render_figure(page, fitz.Rect(record["clip"]), images_dir / record["file"])
 
-        doc.close()
 
-        # Save manifest
-        _save_manifest(pdf_name, manifest)
+def _extract_page_range(
+    pdf_path: str, images_dir: str, first_page: int, last_page: int, render: bool
+) -> Dict[int, List[Dict]]:
+    """Worker task: detect (and render) the figures of pages [first_page, last_page)."""
+    figures: Dict[int, List[Dict]] = {}
+    with fitz_lock, fitz.open(pdf_path) as doc:
+        for page_num in range(first_page, last_page):
+            page = doc[page_num]
+            records = _figure_records(page_num + 1, find_figures(page))
+            if records:
+                if render:
+                    _render_records(page, records, Path(images_dir))
+                figures[page_num + 1] = records
+    return figures
+
+
+def _render_pages(pdf_path: str, images_dir: str, figures: Dict[int, List[Dict]]) -> Dict[int, List[Dict]]:
+    """Worker task: render figures already detected by the caller."""
+    with fitz_lock, fitz.open(pdf_path) as doc:
+        for page_number, records in figures.items():
+            _render_records(doc[page_number - 1], records, Path(images_dir))
+    return figures
+
+
+class FigureExtraction:
+    """
+    Figure extraction of one PDF, spread over a process pool by page range.
+
+    Each task opens its own fitz document in the worker and handles a range
+    of pages; per-page results are merged by result(), which writes the
+    image manifest and the figure manifest (clip rect and caption of every
+    figure). Either submit every page for detection (submit_page_ranges),
+    or feed figures detected by the caller page by page (add_page_figures).
+
+    With FIGURE_RENDER_MODE=lazy figures are only detected and recorded;
+    the image route renders each one the first time it is requested (see
+    get_figure_image). Without an executor tasks run inline.
+
+    With staged=True the figures and manifests are written to a staging
+    directory and the previous figures of the file stay in place until
+    commit() swaps the new ones in (or discard() drops them); ingestion
+    commits once every chunk of the file is stored.
+    """
 
-        print(f"  -> Rendered {total_figures} figure regions from {len(manifest)} pages of {pdf_name}")
+    def __init__(self, pdf_path: Path, executor: Optional[Executor] = None, staged: bool = False):
+        self.pdf_path = pdf_path
+        self.staged = staged
+        if staged:
+            self.images_dir = prepare_staging_dir(pdf_path.name)
+        else:
+            self.images_dir = prepare_images_dir(pdf_path.name)
+        # Set once result() has written the manifests
+        self.finished = False
+        self.executor = executor
+        self.render = settings.FIGURE_RENDER_MODE.lower() != "lazy"
+        self.pages_per_task = max(1, settings.INGESTION_FIGURE_PAGES_PER_TASK)
+        self._futures: List[Future] = []
+        self._pending: Dict[int, List[Dict]] = {}
+
+    def _submit(self, fn, *args) -> None:
+        if self.executor is not None:
+            self._futures.append(self.executor.submit(fn, *args))
+            return
+        future: Future = Future()
+        try:
+            future.set_result(fn(*args))
+        except Exception as e:
+            future.set_exception(e)
+        self._futures.append(future)
+
+    def submit_page_ranges(self, page_count: Optional[int] = None) -> None:
+        """Queue detection (+ rendering) of every page, pages_per_task pages per task."""
+        if page_count is None:
+            with fitz_lock, fitz.open(str(self.pdf_path)) as doc:
+                page_count = len(doc)
+        for first_page in range(0, page_count, self.pages_per_task):
+            last_page = min(page_count, first_page + self.pages_per_task)
+            self._submit(
+                _extract_page_range, str(self.pdf_path), str(self.images_dir),
+                first_page, last_page, self.render,
+            )
+
+    def add_page_figures(self, page_number: int, figures: List[FigureRegion]) -> None:
+        """Record the figures detected on a page (queued for rendering unless lazy)."""
+        if not figures:
+            return
+        self._pending[page_number] = _figure_records(page_number, figures)
+        if len(self._pending) >= self.pages_per_task:
+            self._flush()
+
+    def _flush(self) -> None:
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, {}
+        if self.render:
+            self._submit(_render_pages, str(self.pdf_path), str(self.images_dir), pending)
+        else:
+            future: Future = Future()
+            future.set_result(pending)
+            self._futures.append(future)
+
+    def result(self) -> Dict[int, List[str]]:
+        """Wait for every task, merge the page results and save the manifests."""
+        self._flush()
+        figures: Dict[int, List[Dict]] = {}
+        error: Optional[Exception] = None
+        for future in self._futures:
+            try:
+                figures.update(future.result())
+            except Exception as e:
+                error = error or e
+        figures = dict(sorted(figures.items()))
+        manifest = {page: [record["file"] for record in records] for page, records in figures.items()}
+        save_figures_manifest(self.pdf_path.name, figures, self.images_dir)
+        save_manifest(self.pdf_path.name, manifest, self.images_dir)
+        self.finished = True
+
+        total_figures = sum(len(images) for images in manifest.values())
+        action = "Rendered" if self.render else "Recorded (rendered on demand)"
+        print(f"  -> {action} {total_figures} figure regions from {len(manifest)} pages of {self.pdf_path.name}")
+        if error is not None:
+            raise error
         return manifest
 
+    def commit(self) -> None:
+        """Replace the previous figures of the file with the staged ones."""
+        if not self.staged:
+            return
+        target = get_images_dir(self.pdf_path.name)
+        old_dir = target.with_name(f".old_{target.name}")
+        with _images_dir_lock:
+            shutil.rmtree(old_dir, ignore_errors=True)
+            if target.exists():
+                target.rename(old_dir)
+            self.images_dir.rename(target)
+        shutil.rmtree(old_dir, ignore_errors=True)
+        self.images_dir = target
+        self.staged = False
+
+    def discard(self) -> None:
+        """Drop the staged figures, keeping the previous figures of the file."""
+        if self.staged:
+            shutil.rmtree(self.images_dir, ignore_errors=True)
+            self.staged = False
+
+
+def extract_images_from_pdf(pdf_path: Path, executor: Optional[Executor] = None) -> Dict[int, List[str]]:
+    """
+    Extract complete figure regions from a PDF using page region rendering.
+
+    Uses a caption-anchored approach:
+    1. Detects all image bounding boxes using get_image_info()
+    2. Filters out small decorative images (icons, bullets)
+    3. Groups nearby images into figure clusters using rectangle merging
+    4. For each cluster, searches for a figure caption ("Fig.X-Y") below
+    5. Expands the region to include all text annotations within the
+       vertical range of the figure (labels, notes, mass info, etc.)
+    6. Renders the complete region with get_pixmap(clip=rect) at high DPI
+       (or, with FIGURE_RENDER_MODE=lazy, on the first request)
+
+    This produces complete figures with all vector graphics, annotations,
+    captions and labels preserved - exactly as they appear in the PDF.
+
+    Page ranges are processed in parallel: on the given executor, or on a
+    temporary process pool (INGESTION_FIGURE_WORKERS) for PDFs longer than
+    one range.
+    """
+    pdf_name = pdf_path.name
+    own_pool = None
+
+    try:
+        with fitz_lock, fitz.open(str(pdf_path)) as doc:
+            page_count = len(doc)
+        print(f"  Extracting figure regions from {pdf_name} ({page_count} pages)...")
+
+        workers = settings.INGESTION_FIGURE_WORKERS or os.cpu_count() or 1
+        if executor is None and workers > 1 and page_count > settings.INGESTION_FIGURE_PAGES_PER_TASK:
+            # spawn: fork is unsafe when called from a threaded server
+            own_pool = ProcessPoolExecutor(
+                max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+            )
+
+        extraction = FigureExtraction(pdf_path, executor or own_pool)
+        extraction.submit_page_ranges(page_count)
+        return extraction.result()
+
     except Exception as e:
         print(f"  Error extracting figures from {pdf_name}: {e}")
         return {}
+    finally:
+        if own_pool is not None:
+            own_pool.shutdown(wait=True, cancel_futures=True)
 
 
-def _save_manifest(pdf_name: str, manifest: Dict[int, List[str]]) -> None:
-    """Save the page-to-images manifest as JSON."""
-    manifest_path = get_manifest_path(pdf_name)
+def save_manifest(
+    pdf_name: str, manifest: Dict[int, List[str]], images_dir: Optional[Path] = None
+) -> None:
+    """Save the page-to-images manifest as JSON (in images_dir, default the PDF's images directory)."""
+    manifest_path = (images_dir or get_images_dir(pdf_name)) / "manifest.json"
     serializable = {str(k): v for k, v in manifest.items()}
     with open(manifest_path, "w", encoding="utf-8") as f:
         json.dump(serializable, f, indent=2)
@@ -373,6 +679,98 @@ def load_manifest(pdf_name: str) -> Dict[int, List[str]]:
         return {}
 
 
+def get_figures_manifest_path(pdf_name: str) -> Path:
+    """Get the figure manifest JSON path (clip rect and caption of every figure)."""
+    return get_images_dir(pdf_name) / FIGURES_MANIFEST_FILENAME
+
+
+def save_figures_manifest(
+    pdf_name: str, figures: Dict[int, List[Dict]], images_dir: Optional[Path] = None
+) -> None:
+    """Save the figure manifest: source PDF and per-page figure records."""
+    data = {
+        "source": pdf_name,
+        "render_dpi": RENDER_DPI,
+        "pages": {str(k): v for k, v in figures.items()},
+    }
+    figures_path = (images_dir or get_images_dir(pdf_name)) / FIGURES_MANIFEST_FILENAME
+    with open(figures_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+
+
+def _find_figure_record(pdf_stem: str, image_file: str) -> Optional[Tuple[str, int, Dict]]:
+    """Look up (source PDF name, page number, record) of a figure image file."""
+    figures_path = IMAGES_BASE_DIR / pdf_stem / FIGURES_MANIFEST_FILENAME
+    if not figures_path.exists():
+        return None
+    try:
+        with open(figures_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except Exception as e:
+        print(f"Warning: Could not load figure manifest for {pdf_stem}: {e}")
+        return None
+
+    for page, records in data.get("pages", {}).items():
+        for record in records:
+            if record["file"] == image_file:
+                return data["source"], int(page), record
+    return None
+
+
+@contextmanager
+def _figure_render_lock(pdf_stem: str, image_file: str) -> Iterator[None]:
+    """Serialize the on-demand renders of one figure (other figures are not blocked)."""
+    key = (pdf_stem, image_file)
+    with _figure_render_locks_guard:
+        entry = _figure_render_locks.setdefault(key, [threading.Lock(), 0])
+        entry[1] += 1
+    try:
+        with entry[0]:
+            yield
+    finally:
+        with _figure_render_locks_guard:
+            entry[1] -= 1
+            if not entry[1]:
+                del _figure_render_locks[key]
+
+
+def get_figure_image(pdf_stem: str, image_file: str) -> Optional[Path]:
+    """
+    Path of a figure image, rendering it on first request.
+
+    Figures recorded with FIGURE_RENDER_MODE=lazy (or whose PNG was
+    deleted) are rendered from the source PDF using the clip rect in the
+    figure manifest, then kept in the images directory as a cache.
+    Returns None for unknown figures or when the source PDF is missing.
+    """
+    image_path = IMAGES_BASE_DIR / pdf_stem / image_file
+    if image_path.exists():
+        return image_path
+
+    found = _find_figure_record(pdf_stem, image_file)
+    if found is None:
+        return None
+    source, page_number, record = found
+
+    pdf_path = Path(settings.RAW_PDFS_DIRECTORY) / source
+    if not pdf_path.exists():
+        print(f"Warning: Cannot render {image_file}, source PDF {source} not found")
+        return None
+
+    # Requests for a figure that is being rendered wait for that render and
+    # reuse the cached file; other figures render meanwhile. Only the
+    # PyMuPDF calls hold fitz_lock (shared with every fitz call of the
+    # process), not the wait or the file write.
+    with _figure_render_lock(pdf_stem, image_file):
+        # Another request may have rendered it while we waited
+        if not image_path.exists():
+            with fitz_lock, fitz.open(str(pdf_path)) as doc:
+                png = _render_png(doc[page_number - 1], fitz.Rect(record["clip"]))
+            with _images_dir_lock:
+                _write_image(image_path, png)
+    return image_path
+
+
 def get_images_for_page(pdf_name: str, page_number: int) -> List[str]:
     """Get image URLs for a specific page of a PDF."""
     manifest = load_manifest(pdf_name)
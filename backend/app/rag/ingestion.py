@@ -3,20 +3,45 @@
 This module handles the ingestion of PDF documents into the vector store.
 It supports two parsing modes:
 1. Azure Document Intelligence (default): Accurate table/figure extraction
-2. PyPDFLoader (fallback): Traditional text-based PDF extraction
+2. PyMuPDF (fallback): Fast single-pass text + figure extraction
+   (PDF_FALLBACK_PARSER=pypdf selects the traditional PyPDFLoader)
 """
+import gc
+import hashlib
+import json
+import multiprocessing
 import os
+import queue
 import re
+import shutil
+import threading
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
 from langchain_core.documents import Document
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from langchain_community.document_loaders import PyPDFLoader
 
 from app.core.config import settings
 from app.rag.vector_store import get_vector_store, clear_collection, get_collection_stats
-from app.rag.azure_doc_intelligence import load_pdf_with_azure_di, is_azure_di_available
-from app.rag.image_extractor import extract_images_from_pdf
+from app.rag.lexical_index import get_lexical_index, get_lexical_index_path, lexical_index_enabled
+from app.rag.numpy_index import get_numpy_index
+from app.rag.reference_index import get_reference_index
+from app.rag.azure_doc_intelligence import (
+    analyze_pdf_with_azure_di,
+    is_azure_di_available,
+    iter_azure_di_pages,
+)
+from app.rag.image_extractor import FigureExtraction, get_images_dir
+from app.rag.pymupdf_loader import iter_pymupdf_pages
+from app.rag.embedding_cache import get_document_cache_counters
+from app.rag.rate_limiter import estimate_tokens, get_embedding_rate_limiter_stats
 
 
 def extract_metadata_from_filename(filename: str) -> Dict[str, str]:
@@ -51,19 +76,29 @@ def extract_metadata_from_filename(filename: str) -> Dict[str, str]:
     }
 
 
-def load_pdf(pdf_path: Path, use_azure_di: Optional[bool] = None) -> List[Document]:
+def open_pdf_pages(
+    pdf_path: Path,
+    use_azure_di: Optional[bool] = None,
+    figures: Optional[FigureExtraction] = None,
+) -> Iterator[Document]:
     """
-    Load a single PDF and return documents with metadata.
+    Start parsing a PDF and return an iterator over its pages.
 
-    Uses Azure Document Intelligence by default for better table extraction.
-    Falls back to PyPDFLoader if Azure DI fails or is disabled.
+    Uses Azure Document Intelligence by default for better table extraction;
+    the analysis call runs eagerly (it is network bound, so callers run it on
+    a worker thread) and pages are then yielded one at a time. Falls back to
+    the PDF_FALLBACK_PARSER (PyMuPDF or PyPDFLoader, both parse lazily page
+    by page) if Azure DI fails or is disabled.
 
     Args:
         pdf_path: Path to the PDF file.
         use_azure_di: Override config setting for Azure DI usage.
+        figures: Optional figure extraction for the file. The PyMuPDF parser
+            feeds it the figure regions detected while parsing; with other
+            parsers every page range is queued on it for extraction.
 
     Returns:
-        List of Document objects with content and metadata.
+        Iterator of Document objects (one per page) with content and metadata.
     """
     file_metadata = extract_metadata_from_filename(pdf_path.name)
 
@@ -71,79 +106,466 @@ def load_pdf(pdf_path: Path, use_azure_di: Optional[bool] = None) -> List[Docume
 
     if should_use_azure_di and is_azure_di_available():
         print(f"  Using Azure Document Intelligence for: {pdf_path.name}")
-        pages = load_pdf_with_azure_di(pdf_path, file_metadata)
-        if pages:
-            return pages
-        print(f"  Azure DI failed, falling back to PyPDFLoader for: {pdf_path.name}")
+        try:
+            analyzed = analyze_pdf_with_azure_di(pdf_path)
+            if any(r.result.pages or r.result.content for r in analyzed):
+                _queue_figure_extraction(pdf_path, figures)
+                return iter_azure_di_pages(analyzed, pdf_path, file_metadata)
+        except Exception as e:
+            print(f"Error loading {pdf_path.name} with Azure Document Intelligence: {e}")
+        print(f"  Azure DI failed, falling back to {settings.PDF_FALLBACK_PARSER} for: {pdf_path.name}")
 
-    # Fallback to PyPDFLoader
-    try:
+    if settings.PDF_FALLBACK_PARSER.lower() == "pypdf":
         print(f"  Using PyPDFLoader for: {pdf_path.name}")
-        loader = PyPDFLoader(str(pdf_path))
-        pages = loader.load()
+        _queue_figure_extraction(pdf_path, figures)
+        return _iter_pypdf_pages(pdf_path, file_metadata)
+
+    # Text and figure regions in one pass over each page
+    print(f"  Using PyMuPDF for: {pdf_path.name}")
+    return iter_pymupdf_pages(pdf_path, file_metadata, figures=figures)
 
+
+def _queue_figure_extraction(pdf_path: Path, figures: Optional[FigureExtraction]) -> None:
+    """Queue every page range for figure extraction (parsers without PyMuPDF pages)."""
+    if figures is not None:
+        # Extract images from PDF using PyMuPDF (process pool, by page range)
+        print(f"Extracting images: {pdf_path.name}")
+        figures.submit_page_ranges()
+
+
+def _iter_pypdf_pages(pdf_path: Path, file_metadata: Dict[str, str]) -> Iterator[Document]:
+    loader = PyPDFLoader(str(pdf_path))
+    for page in loader.lazy_load():
         # Add metadata to each page
-        for page in pages:
-            page.metadata.update(file_metadata)
-            page.metadata["source"] = pdf_path.name
-            page.metadata["parser"] = "pypdf"
+        page.metadata.update(file_metadata)
+        page.metadata["source"] = pdf_path.name
+        page.metadata["parser"] = "pypdf"
+        yield page
+
 
-        print(f"  -> PyPDFLoader extracted {len(pages)} pages from {pdf_path.name}")
+def load_pdf(pdf_path: Path, use_azure_di: Optional[bool] = None) -> List[Document]:
+    """
+    Load a single PDF and return documents with metadata.
+
+    Uses Azure Document Intelligence by default for better table extraction.
+    Falls back to PyMuPDF (or PyPDFLoader) if Azure DI fails or is disabled.
+
+    Args:
+        pdf_path: Path to the PDF file.
+        use_azure_di: Override config setting for Azure DI usage.
+
+    Returns:
+        List of Document objects with content and metadata.
+    """
+    try:
+        pages = list(open_pdf_pages(pdf_path, use_azure_di))
+        print(f"  -> Extracted {len(pages)} pages from {pdf_path.name}")
         return pages
     except Exception as e:
         print(f"Error loading {pdf_path.name}: {e}")
         return []
 
 
-def chunk_documents(documents: List[Document], chunk_size: int = 1000, chunk_overlap: int = 200) -> List[Document]:
-    """Split documents into chunks for embedding with chunk index metadata."""
-    text_splitter = RecursiveCharacterTextSplitter(
+def _make_text_splitter(chunk_size: int, chunk_overlap: int) -> RecursiveCharacterTextSplitter:
+    return RecursiveCharacterTextSplitter(
         chunk_size=chunk_size,
         chunk_overlap=chunk_overlap,
         length_function=len,
         separators=["\n\n", "\n", ". ", " ", ""]
     )
 
-    chunks = text_splitter.split_documents(documents)
 
-    # Group chunks by source and add chunk index metadata
-    source_chunks: Dict[str, List[Document]] = {}
-    for chunk in chunks:
-        source = chunk.metadata.get("source", "unknown")
-        if source not in source_chunks:
-            source_chunks[source] = []
-        source_chunks[source].append(chunk)
-
-    # Add chunk index and total chunks metadata
-    for source, source_chunk_list in source_chunks.items():
-        total = len(source_chunk_list)
-        for idx, chunk in enumerate(source_chunk_list, 1):
-            chunk.metadata["chunk_index"] = idx
-            chunk.metadata["total_chunks"] = total
+def iter_chunks(
+    pages: Iterable[Document],
+    chunk_size: int = 1000,
+    chunk_overlap: int = 200
+) -> Iterator[Document]:
+    """
+    Split pages into chunks one page at a time.
+
+    Chunk indexes are numbered per source as chunks are produced. The
+    total_chunks metadata is not known until the source is exhausted, so
+    it is left to the caller (see chunk_documents and ingest_pdfs).
+    """
+    text_splitter = _make_text_splitter(chunk_size, chunk_overlap)
+    next_index: Dict[str, int] = {}
+
+    for page in pages:
+        for chunk in text_splitter.split_documents([page]):
+            source = chunk.metadata.get("source", "unknown")
+            next_index[source] = next_index.get(source, 0) + 1
+            chunk.metadata["chunk_index"] = next_index[source]
             # Try to extract section info from content
             content_preview = chunk.page_content[:200].lower()
             if "chapter" in content_preview or "capitolo" in content_preview:
                 chunk.metadata["section_type"] = "chapter"
             elif "section" in content_preview or "sezione" in content_preview:
                 chunk.metadata["section_type"] = "section"
+            yield chunk
+
+
+def chunk_documents(documents: List[Document], chunk_size: int = 1000, chunk_overlap: int = 200) -> List[Document]:
+    """Split documents into chunks for embedding with chunk index metadata."""
+    chunks = list(iter_chunks(documents, chunk_size, chunk_overlap))
+
+    # Add total chunks metadata per source
+    totals: Dict[str, int] = {}
+    for chunk in chunks:
+        source = chunk.metadata.get("source", "unknown")
+        totals[source] = totals.get(source, 0) + 1
+    for chunk in chunks:
+        chunk.metadata["total_chunks"] = totals[chunk.metadata.get("source", "unknown")]
 
     return chunks
 
 
+MANIFEST_FILENAME = "ingestion_manifest.json"
+
+# Upper bound on chunks per embedding / upsert call (batches are sized by tokens)
+MAX_BATCH_CHUNKS = 256
+
+
+def _embedding_batch_token_budget() -> int:
+    """Tokens per embedding batch, never more than 10 seconds of TPM quota."""
+    return max(1, min(settings.EMBEDDING_BATCH_MAX_TOKENS, settings.EMBEDDING_TOKENS_PER_MINUTE // 6))
+
+
+def get_ingestion_manifest_path() -> Path:
+    """Path of the file fingerprint manifest (kept next to the Chroma data)."""
+    return Path(settings.CHROMA_PERSIST_DIRECTORY) / MANIFEST_FILENAME
+
+
+def load_ingestion_manifest() -> Dict[str, Dict]:
+    """Load {filename: fingerprint} for the files currently in the vector store."""
+    manifest_path = get_ingestion_manifest_path()
+    if not manifest_path.exists():
+        return {}
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception as e:
+        print(f"Error loading ingestion manifest, re-ingesting all files: {e}")
+        return {}
+
+
+def _save_ingestion_manifest(manifest: Dict[str, Dict]) -> None:
+    manifest_path = get_ingestion_manifest_path()
+    manifest_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = manifest_path.with_suffix(".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    tmp_path.replace(manifest_path)
+
+
+def _hash_file(path: Path) -> str:
+    """SHA-256 of the file contents, read in 1 MB blocks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def fingerprint_pdf(pdf_path: Path, previous: Optional[Dict] = None) -> Dict:
+    """
+    Fingerprint a PDF by size, mtime and content hash.
+
+    The content hash is reused from the previous fingerprint when size and
+    mtime are unchanged, so unchanged files are never re-read.
+    """
+    stat = pdf_path.stat()
+    if previous and previous.get("size") == stat.st_size and previous.get("mtime") == stat.st_mtime:
+        sha256 = previous["sha256"]
+    else:
+        sha256 = _hash_file(pdf_path)
+    return {"size": stat.st_size, "mtime": stat.st_mtime, "sha256": sha256}
+
+
+def chunk_version(file_hash: str, chunk_size: int, chunk_overlap: int) -> str:
+    """Version of a file's chunks: its content hash plus the chunking parameters."""
+    return f"{file_hash[:16]}-{chunk_size}-{chunk_overlap}"
+
+
+def _chunk_id_prefix(source: str, version: str) -> str:
+    """Common prefix of the chunk IDs of one version of a file."""
+    return f"{source}::{version}::"
+
+
+def make_chunk_id(source: str, version: str, chunk_index: int) -> str:
+    """
+    Deterministic chunk ID: the same file content chunked with the same
+    parameters always yields the same IDs.
+    """
+    return f"{_chunk_id_prefix(source, version)}{chunk_index}"
+
+
+def _source_is_indexed(collection, source: str) -> bool:
+    """True if the collection still holds at least one chunk for the source."""
+    result = collection.get(where={"source": source}, limit=1, include=[])
+    return bool(result.get("ids"))
+
+
+def _delete_source_chunks(collection, source: str) -> None:
+    """Delete every chunk of a source file from the collection and the lexical / reference indexes."""
+    collection.delete(where={"source": source})
+    if lexical_index_enabled():
+        get_lexical_index().delete_source(source)
+    get_reference_index().delete_source(source)
+
+
+def _delete_source_version(collection, source: str, version: str, keep: bool) -> None:
+    """
+    Delete the chunks of a source file that are (keep=False) or are not
+    (keep=True) of the given chunk version.
+    """
+    prefix = _chunk_id_prefix(source, version)
+    ids = collection.get(where={"source": source}, include=[]).get("ids") or []
+    ids = [chunk_id for chunk_id in ids if chunk_id.startswith(prefix) != keep]
+    for start in range(0, len(ids), 1000):
+        collection.delete(ids=ids[start:start + 1000])
+    if lexical_index_enabled():
+        get_lexical_index().delete_ids(ids)
+    get_reference_index().delete_ids(ids)
+
+
+def _report(progress_callback: Optional[Callable[[Dict], None]], stage: str, **data) -> None:
+    """Send a progress event to the callback; callback errors never abort ingestion."""
+    if progress_callback is None:
+        return
+    try:
+        progress_callback({"stage": stage, **data})
+    except Exception as e:
+        print(f"Error in ingestion progress callback: {e}")
+
+
+def _open_file(
+    pdf_path: Path,
+    figure_pool: ProcessPoolExecutor,
+    progress_callback: Optional[Callable[[Dict], None]],
+) -> Tuple[Iterator[Document], FigureExtraction]:
+    """
+    Parse task for the thread pool (Azure DI calls are I/O bound).
+
+    Only the Azure DI analysis runs here. The PyMuPDF and PyPDF parsers
+    return lazy page iterators, so their pages are parsed later, one file
+    at a time, in the producer thread as they are chunked.
+    """
+    print(f"Loading: {pdf_path.name}")
+    _report(progress_callback, "loading", file=pdf_path.name)
+    # Staged: the previous figures stay in place until the file's chunks are stored
+    figures = FigureExtraction(pdf_path, figure_pool, staged=True)
+    try:
+        return open_pdf_pages(pdf_path, figures=figures), figures
+    except BaseException:
+        figures.discard()
+        raise
+
+
+class _Batch(NamedTuple):
+    """
+    Queue item: chunks to upsert, then files whose last chunk has been
+    queued and files that failed after some of their chunks were queued.
+    """
+    items: List[tuple]
+    completed_files: List[tuple]
+    failed_files: List[tuple]
+
+
+def _set_total_chunks(collection, source: str, version: str, total: int) -> None:
+    """Write total_chunks into every chunk of a file once its chunk count is known."""
+    ids = [make_chunk_id(source, version, index) for index in range(1, total + 1)]
+    for start in range(0, len(ids), 1000):
+        batch_ids = ids[start:start + 1000]
+        collection.update(ids=batch_ids, metadatas=[{"total_chunks": total}] * len(batch_ids))
+
+
+def _produce_chunk_batches(
+    to_ingest: List[Path],
+    manifest: Dict[str, Dict],
+    chunk_size: int,
+    chunk_overlap: int,
+    batches: "queue.Queue",
+    stop: threading.Event,
+    pipeline_stats: Dict,
+    progress_callback: Optional[Callable[[Dict], None]],
+) -> None:
+    """
+    Parse files and queue embedding batches sized by estimated token count.
+
+    At most INGESTION_PARSE_WORKERS files are opened at once, which runs
+    their Azure DI analyses concurrently; pages of the lazy PyMuPDF / PyPDF
+    parsers are read here, one file at a time, as they are chunked. Pages are
+    streamed through the splitter into batches (pages -> chunks ->
+    batches), so no file is ever held in memory as a whole and batches
+    reach the embedding stage while later files are still being parsed.
+    Figures are extracted in a process pool in parallel, page range by
+    page range (figures of several files share the pool). The bounded batch
+    queue applies backpressure: when embedding falls behind, parsing
+    pauses. Ends with None (or the exception that stopped it) on the queue.
+    """
+
+    def put(item) -> bool:
+        while not stop.is_set():
+            try:
+                batches.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    parse_workers = max(1, settings.INGESTION_PARSE_WORKERS)
+    pending = iter(to_ingest)
+    in_flight: Dict[Future, Path] = {}
+    # Shared with the consumer, which commits or discards the staged figures
+    figure_extractions: List[FigureExtraction] = pipeline_stats["figures"]
+    buffer: List[tuple] = []
+    buffer_tokens = 0
+    completed_files: List[tuple] = []
+    failed_files: List[tuple] = []
+    token_budget = _embedding_batch_token_budget()
+    chunks_total = 0
+
+    def flush() -> bool:
+        nonlocal buffer, buffer_tokens, completed_files, failed_files
+        if not buffer and not completed_files and not failed_files:
+            return True
+        ok = put(_Batch(buffer, completed_files, failed_files))
+        buffer, buffer_tokens, completed_files, failed_files = [], 0, [], []
+        return ok
+
+    parse_pool = ThreadPoolExecutor(max_workers=parse_workers, thread_name_prefix="ingest-parse")
+    # spawn: the pool may be started from an API worker thread, where fork is unsafe
+    figure_pool = ProcessPoolExecutor(
+        max_workers=settings.INGESTION_FIGURE_WORKERS or os.cpu_count() or 1,
+        mp_context=multiprocessing.get_context("spawn"),
+    )
+
+    def submit_next() -> None:
+        pdf_path = next(pending, None)
+        if pdf_path is not None:
+            in_flight[parse_pool.submit(_open_file, pdf_path, figure_pool, progress_callback)] = pdf_path
+
+    try:
+        for _ in range(parse_workers):
+            submit_next()
+
+        while in_flight and not stop.is_set():
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                pdf_path = in_flight.pop(future)
+                version = chunk_version(manifest[pdf_path.name]["sha256"], chunk_size, chunk_overlap)
+                pages_count = 0
+                file_chunks = 0
+
+                def counted(pages: Iterator[Document]) -> Iterator[Document]:
+                    nonlocal pages_count
+                    for page in pages:
+                        pages_count += 1
+                        yield page
+
+                try:
+                    pages, figures = future.result()
+                    # Figures render in the process pool while the pages are chunked
+                    figure_extractions.append(figures)
+
+                    for chunk in iter_chunks(counted(pages), chunk_size, chunk_overlap):
+                        file_chunks = chunk.metadata["chunk_index"]
+                        chunk_tokens = estimate_tokens(chunk.page_content)
+                        if buffer and (
+                            buffer_tokens + chunk_tokens > token_budget
+                            or len(buffer) >= MAX_BATCH_CHUNKS
+                        ):
+                            if not flush():
+                                return
+                        buffer.append((chunk, make_chunk_id(pdf_path.name, version, file_chunks)))
+                        buffer_tokens += chunk_tokens
+                except Exception as e:
+                    print(f"Error loading {pdf_path.name}: {e}")
+                    if file_chunks:
+                        # Drop the chunks still buffered; the consumer deletes
+                        # those already queued (the previous version is kept)
+                        prefix = _chunk_id_prefix(pdf_path.name, version)
+                        buffer = [item for item in buffer if not item[1].startswith(prefix)]
+                        buffer_tokens = sum(estimate_tokens(chunk.page_content) for chunk, _ in buffer)
+                        failed_files.append((pdf_path.name, version))
+                    file_chunks = 0
+
+                if not file_chunks:
+                    pipeline_stats["failed"].append(pdf_path.name)
+                    _report(progress_callback, "file_failed", file=pdf_path.name)
+                    submit_next()
+                    continue
+
+                pipeline_stats["processed"].append(pdf_path.name)
+                pipeline_stats["pages"] += pages_count
+                manifest[pdf_path.name]["chunk_count"] = file_chunks
+                completed_files.append((pdf_path.name, version, file_chunks))
+                chunks_total += file_chunks
+                print(f"  -> {pdf_path.name}: {pages_count} pages, {file_chunks} chunks")
+                _report(progress_callback, "loaded", file=pdf_path.name, pages=pages_count,
+                        pages_total=pipeline_stats["pages"])
+                _report(progress_callback, "chunked", file=pdf_path.name, chunks=file_chunks,
+                        chunks_total=chunks_total)
+
+                # Parser objects (pypdf readers, DI results) form reference
+                # cycles; collect them now instead of letting them pile up
+                # across files until the next full GC
+                del pages
+                gc.collect()
+
+                # Refill the parse slot only after this file's chunks are batched
+                submit_next()
+
+        if not flush():
+            return
+
+        for figures in figure_extractions:
+            try:
+                figures.result()
+            except Exception as e:
+                name = figures.pdf_path.name
+                print(f"Error extracting images from {name}: {e}")
+                pipeline_stats["figure_errors"].append(name)
+
+        put(None)
+    except BaseException as e:
+        put(e)
+    finally:
+        parse_pool.shutdown(wait=True, cancel_futures=True)
+        figure_pool.shutdown(wait=True, cancel_futures=True)
+
+
 def ingest_pdfs(
     pdf_directory: Optional[str] = None,
     clear_existing: bool = False,
     chunk_size: int = 1000,
-    chunk_overlap: int = 200
+    chunk_overlap: int = 200,
+    progress_callback: Optional[Callable[[Dict], None]] = None
 ) -> Dict[str, any]:
     """
-    Ingest all PDFs from directory into ChromaDB.
+    Incrementally ingest PDFs from directory into ChromaDB.
+
+    Each PDF is fingerprinted (size, mtime, SHA-256) and compared with the
+    ingestion manifest. Only new or changed files, and files chunked with
+    other chunk_size / chunk_overlap values, are parsed, chunked and
+    upserted; chunks of removed files are deleted first. Chunk
+    IDs are deterministic, so re-running never duplicates vectors. The
+    chunks of a changed file's previous version are only deleted once every
+    chunk of the new version is stored, so a file that fails partway keeps
+    its previous version. Its figures are rendered to a staging directory
+    and swapped in at the end of the run, only for files whose chunks were
+    stored.
+
+    Azure DI analyses run concurrently, figures are extracted in a process pool,
+    and embedding batches are upserted while later files are still parsing.
 
     Args:
         pdf_directory: Path to PDF directory. Uses config default if not provided.
-        clear_existing: If True, clears existing collection before ingestion.
+        clear_existing: If True, clears existing collection and manifest before ingestion.
         chunk_size: Size of text chunks.
         chunk_overlap: Overlap between chunks.
+        progress_callback: Optional callable receiving progress events
+            ({"stage": ..., ...}) for files, pages, chunks and batches.
 
     Returns:
         Dict with ingestion statistics.
@@ -159,7 +581,7 @@ def ingest_pdfs(
         }
 
     # Find all PDFs
-    pdf_files = list(pdf_dir.glob("*.pdf"))
+    pdf_files = sorted(pdf_dir.glob("*.pdf"))
 
     if not pdf_files:
         return {
@@ -172,26 +594,151 @@ def ingest_pdfs(
     # Clear existing if requested
     if clear_existing:
         clear_collection()
+        _save_ingestion_manifest({})
 
-    # Load all PDFs
-    all_documents = []
-    files_processed = []
-    files_failed = []
-
+    vector_store = get_vector_store()
+    collection = vector_store._collection
+    # BM25 (hybrid retrieval only) and page / table / figure indexes over
+    # the same chunks (rebuilt first if empty while Chroma is not)
+    lexical_index = get_lexical_index(collection) if lexical_index_enabled() else None
+    reference_index = get_reference_index(collection)
+    previous_manifest = {} if clear_existing else load_ingestion_manifest()
+
+    # Compare fingerprints with the manifest
+    manifest: Dict[str, Dict] = {}
+    to_ingest: List[Path] = []
+    files_skipped = []
     for pdf_path in pdf_files:
-        print(f"Loading: {pdf_path.name}")
-        docs = load_pdf(pdf_path)
-        if docs:
-            all_documents.extend(docs)
-            files_processed.append(pdf_path.name)
-
-            # Extract images from PDF using PyMuPDF
-            print(f"Extracting images: {pdf_path.name}")
-            extract_images_from_pdf(pdf_path)
+        previous = previous_manifest.get(pdf_path.name)
+        fingerprint = {
+            **fingerprint_pdf(pdf_path, previous),
+            "chunk_size": chunk_size,
+            "chunk_overlap": chunk_overlap,
+        }
+        if (
+            previous
+            and previous.get("sha256") == fingerprint["sha256"]
+            and previous.get("chunk_size") == chunk_size
+            and previous.get("chunk_overlap") == chunk_overlap
+            and _source_is_indexed(collection, pdf_path.name)
+        ):
+            manifest[pdf_path.name] = {**previous, **fingerprint}
+            files_skipped.append(pdf_path.name)
+        else:
+            manifest[pdf_path.name] = fingerprint
+            to_ingest.append(pdf_path)
+
+    # Drop chunks and figures of files no longer in the directory
+    files_removed = [name for name in previous_manifest if name not in manifest]
+    for name in files_removed:
+        print(f"Removing: {name}")
+        _delete_source_chunks(collection, name)
+        images_dir = get_images_dir(name)
+        if images_dir.exists():
+            shutil.rmtree(images_dir, ignore_errors=True)
+
+    if files_skipped:
+        print(f"Unchanged, skipping {len(files_skipped)} file(s)")
+    _report(
+        progress_callback, "scanned",
+        files_total=len(pdf_files),
+        files_to_ingest=len(to_ingest),
+        files_skipped=len(files_skipped),
+        files_removed=len(files_removed),
+    )
+
+    # Stage 1-2 (parse, figures, chunking) run on background workers and
+    # feed embedding batches through a bounded queue; stage 3 (embed +
+    # upsert) runs here, starting as soon as the first file is chunked
+    batches: "queue.Queue" = queue.Queue(maxsize=max(1, settings.INGESTION_QUEUE_SIZE))
+    stop = threading.Event()
+    pipeline_stats = {"pages": 0, "processed": [], "failed": [], "figure_errors": [], "figures": []}
+    producer = threading.Thread(
+        target=_produce_chunk_batches,
+        args=(to_ingest, manifest, chunk_size, chunk_overlap, batches, stop,
+              pipeline_stats, progress_callback),
+        name="ingest-producer",
+        daemon=True,
+    )
+    producer.start()
+
+    # Add to vector store; the embeddings client paces calls to the
+    # deployment quota and retries 429s (see rate_limiter)
+    print(f"Adding chunks to vector store as files are parsed "
+          f"(up to {_embedding_batch_token_budget()} tokens per batch)...")
+    cache_start = get_document_cache_counters()
+    limiter_start = get_embedding_rate_limiter_stats()
+    chunks_created = 0
+    batch_num = 0
+    # Files whose new version is fully stored
+    committed_sources = set()
+    try:
+        while True:
+            item = batches.get()
+            if item is None:
+                break
+            if isinstance(item, BaseException):
+                raise item
+
+            batch = [chunk for chunk, _ in item.items]
+            batch_ids = [chunk_id for _, chunk_id in item.items]
+
+            if batch:
+                batch_num += 1
+                print(f"  Batch {batch_num} ({len(batch)} chunks)...")
+                vector_store.add_documents(batch, ids=batch_ids)
+                if lexical_index is not None:
+                    lexical_index.add_documents(batch, batch_ids)
+                reference_index.add_documents(batch, batch_ids)
+                chunks_created += len(batch)
+                _report(progress_callback, "batch", batch=batch_num, chunks_done=chunks_created)
+
+            # Every chunk of these files is stored: fill in total_chunks and
+            # drop the previous version (also removes chunks with random IDs
+            # left by earlier, non-incremental ingestions)
+            for source, version, total in item.completed_files:
+                _set_total_chunks(collection, source, version, total)
+                _delete_source_version(collection, source, version, keep=True)
+                committed_sources.add(source)
+
+            # These files failed partway: drop the part of the new version
+            # that was stored
+            for source, version in item.failed_files:
+                _delete_source_version(collection, source, version, keep=False)
+    finally:
+        stop.set()
+        producer.join()
+        # Swap in the new figures of the files whose chunks were stored;
+        # the others keep their previous figures, like their chunks
+        for figures in pipeline_stats["figures"]:
+            if figures.finished and figures.pdf_path.name in committed_sources:
+                figures.commit()
+            else:
+                figures.discard()
+
+    if files_removed or pipeline_stats["processed"]:
+        # Not maintained in vector mode: empty it, so it is rebuilt from
+        # Chroma if hybrid retrieval is switched on later
+        if lexical_index is None and get_lexical_index_path().exists():
+            get_lexical_index().clear()
+        # The NumPy export is a snapshot of the collection: refresh it (or
+        # drop it, so it is re-exported if the backend is switched later)
+        if settings.VECTOR_BACKEND.lower() == "numpy":
+            get_numpy_index().export(collection)
         else:
-            files_failed.append(pdf_path.name)
+            get_numpy_index().clear()
+
+    files_processed = sorted(pipeline_stats["processed"])
+    files_failed = sorted(pipeline_stats["failed"])
+    for name in files_failed:
+        # Back to the entry of the version still indexed (or none), so the
+        # next run retries the file and a later removal still deletes it
+        if name in previous_manifest:
+            manifest[name] = previous_manifest[name]
+        else:
+            manifest.pop(name, None)
 
-    if not all_documents:
+    if files_failed and not files_processed and not files_skipped:
         return {
             "success": False,
             "error": "No documents could be loaded from PDFs",
@@ -199,31 +746,19 @@ def ingest_pdfs(
             "chunks_created": 0
         }
 
-    # Chunk documents
-    print(f"Chunking {len(all_documents)} pages...")
-    chunks = chunk_documents(all_documents, chunk_size, chunk_overlap)
+    cache_end = get_document_cache_counters()
+    embeddings_reused = cache_end["documents_reused"] - cache_start["documents_reused"]
+    embeddings_computed = cache_end["documents_computed"] - cache_start["documents_computed"]
+    print(f"Embeddings: {embeddings_reused} reused from cache, {embeddings_computed} computed")
+    limiter_end = get_embedding_rate_limiter_stats()
+    rate_limited_retries = limiter_end["rate_limited"] - limiter_start["rate_limited"]
+    rate_limit_wait_seconds = round(limiter_end["wait_seconds"] - limiter_start["wait_seconds"], 2)
+    if rate_limited_retries or rate_limit_wait_seconds:
+        print(f"Rate limiting: {rate_limited_retries} retries after 429, "
+              f"{rate_limit_wait_seconds}s waiting for quota")
 
-    # Add to vector store in batches to avoid rate limits
-    import time
-    BATCH_SIZE = 50
-    print(f"Adding {len(chunks)} chunks to vector store (batch size {BATCH_SIZE})...")
-    vector_store = get_vector_store()
-    for i in range(0, len(chunks), BATCH_SIZE):
-        batch = chunks[i:i + BATCH_SIZE]
-        batch_num = i // BATCH_SIZE + 1
-        total_batches = (len(chunks) + BATCH_SIZE - 1) // BATCH_SIZE
-        print(f"  Batch {batch_num}/{total_batches} ({len(batch)} chunks)...")
-        try:
-            vector_store.add_documents(batch)
-        except Exception as e:
-            if "429" in str(e) or "RateLimit" in str(e):
-                print(f"  Rate limited, waiting 60s...")
-                time.sleep(60)
-                vector_store.add_documents(batch)
-            else:
-                raise
-        if i + BATCH_SIZE < len(chunks):
-            time.sleep(5)
+    # Persist the manifest only after all upserts succeeded
+    _save_ingestion_manifest(manifest)
 
     # Get final stats
     stats = get_collection_stats()
@@ -232,11 +767,19 @@ def ingest_pdfs(
         "success": True,
         "files_processed": len(files_processed),
         "files_failed": len(files_failed),
-        "pages_loaded": len(all_documents),
-        "chunks_created": len(chunks),
+        "files_skipped": len(files_skipped),
+        "files_removed": len(files_removed),
+        "pages_loaded": pipeline_stats["pages"],
+        "chunks_created": chunks_created,
+        "embeddings_reused": embeddings_reused,
+        "embeddings_computed": embeddings_computed,
+        "rate_limited_retries": rate_limited_retries,
+        "rate_limit_wait_seconds": rate_limit_wait_seconds,
         "total_documents_in_db": stats.get("count", 0),
         "processed_files": files_processed,
-        "failed_files": files_failed
+        "failed_files": files_failed,
+        "skipped_files": files_skipped,
+        "removed_files": files_removed
     }
 
 
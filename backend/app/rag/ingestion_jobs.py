@@ -0,0 +1,164 @@
+"""
+Background Ingestion Jobs.
+
+Runs `ingest_pdfs` off the API event loop. Azure DI polling, PyMuPDF
+rendering and the rate-limit sleeps between embedding batches are all
+blocking, so jobs execute on a dedicated worker thread while chat requests
+keep being served. Jobs run one at a time (they share the Chroma collection
+and the ingestion manifest) and record every progress event so clients can
+poll the status or follow the SSE stream.
+"""
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from app.rag.ingestion import ingest_pdfs
+
+# Finished jobs kept in memory for status lookups
+MAX_FINISHED_JOBS = 20
+
+# Job states
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+
+
+class IngestionJob:
+    """State and progress of a single ingestion run."""
+
+    def __init__(self, clear_existing: bool = False):
+        self.id = uuid.uuid4().hex
+        self.clear_existing = clear_existing
+        self.status = QUEUED
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.progress: Dict[str, object] = {
+            "stage": QUEUED,
+            "files_total": 0,
+            "files_done": 0,
+            "current_file": None,
+            "pages_loaded": 0,
+            "chunks_total": 0,
+            "chunks_done": 0,
+            "batches_done": 0,
+        }
+        self.events: List[Dict] = []
+        self.result: Optional[Dict] = None
+        self.error: Optional[str] = None
+        self._lock = threading.Lock()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (COMPLETED, FAILED)
+
+    def record(self, event: Dict) -> None:
+        """Progress callback for ingest_pdfs: update counters and store the event."""
+        with self._lock:
+            stage = event.get("stage")
+            progress = self.progress
+            progress["stage"] = stage
+            if stage == "scanned":
+                progress["files_total"] = event["files_to_ingest"]
+            elif stage == "loading":
+                progress["current_file"] = event["file"]
+            elif stage in ("loaded", "file_failed"):
+                progress["files_done"] += 1
+                progress["current_file"] = None
+                progress["pages_loaded"] = event.get("pages_total", progress["pages_loaded"])
+            elif stage == "chunked":
+                progress["chunks_total"] = event["chunks_total"]
+            elif stage == "batch":
+                progress["batches_done"] = event["batch"]
+                progress["chunks_done"] = event["chunks_done"]
+            self.events.append({"time": time.time(), **event})
+
+    def events_since(self, cursor: int) -> List[Dict]:
+        with self._lock:
+            return list(self.events[cursor:])
+
+    def to_dict(self) -> Dict:
+        with self._lock:
+            return {
+                "job_id": self.id,
+                "status": self.status,
+                "clear_existing": self.clear_existing,
+                "created_at": self.created_at,
+                "started_at": self.started_at,
+                "finished_at": self.finished_at,
+                "progress": dict(self.progress),
+                "result": self.result,
+                "error": self.error,
+            }
+
+
+# Single worker: ingestion runs never overlap
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ingestion")
+_jobs: Dict[str, IngestionJob] = {}
+_jobs_lock = threading.Lock()
+
+
+def _run_job(job: IngestionJob) -> None:
+    with job._lock:
+        job.status = RUNNING
+        job.started_at = time.time()
+    try:
+        result = ingest_pdfs(clear_existing=job.clear_existing, progress_callback=job.record)
+    except Exception as e:
+        print(f"Ingestion job {job.id} failed: {e}")
+        result = None
+        error = str(e)
+    else:
+        error = None if result.get("success") else result.get("error", "Unknown error")
+
+    job.record({"stage": COMPLETED if error is None else FAILED, "error": error})
+    with job._lock:
+        job.result = result
+        job.error = error
+        job.status = COMPLETED if error is None else FAILED
+        job.finished_at = time.time()
+
+
+def _prune_finished_jobs() -> None:
+    finished = sorted(
+        (job for job in _jobs.values() if job.finished),
+        key=lambda job: job.created_at,
+    )
+    for job in finished[:-MAX_FINISHED_JOBS]:
+        del _jobs[job.id]
+
+
+def start_ingestion_job(clear_existing: bool = False) -> IngestionJob:
+    """Queue an ingestion run on the background worker and return its job."""
+    job = IngestionJob(clear_existing=clear_existing)
+    with _jobs_lock:
+        _prune_finished_jobs()
+        _jobs[job.id] = job
+    _executor.submit(_run_job, job)
+    return job
+
+
+def get_ingestion_job(job_id: str) -> Optional[IngestionJob]:
+    """Get a job by ID (None if unknown or pruned)."""
+    with _jobs_lock:
+        return _jobs.get(job_id)
+
+
+def list_ingestion_jobs() -> List[IngestionJob]:
+    """All known jobs, newest first."""
+    with _jobs_lock:
+        return sorted(_jobs.values(), key=lambda job: job.created_at, reverse=True)
+
+
+def has_active_ingestion_job() -> bool:
+    """True while a job is queued or running."""
+    with _jobs_lock:
+        return any(not job.finished for job in _jobs.values())
+
+
+def shutdown_ingestion_jobs() -> None:
+    """Drop queued jobs on shutdown; a running job finishes in its thread."""
+    _executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,119 @@
+"""
+Lexical (BM25) Index.
+
+Full-text index over the same chunks as the Chroma collection, keyed by
+chunk ID. Dense embeddings blur exact tokens - error codes ("H0039"),
+part numbers, table IDs - so hybrid retrieval fuses BM25 hits with the
+vector results (see VectorStoreSearchRetriever).
+
+The index is an SQLite FTS5 table in CHROMA_PERSIST_DIRECTORY, ranked by
+FTS5's bm25() (Okapi defaults, k1=1.2 and b=0.75). Each chunk is stored as
+its tokenize() terms and the FTS5 tokenizer keeps those terms whole, so
+compound codes match the same way in the index and in queries.
+
+With RETRIEVAL_MODE=hybrid, ingestion writes each batch as it is stored in
+Chroma. In vector mode the index is not maintained: an ingestion that
+changed the collection empties it, and it is rebuilt from the chunks
+stored in Chroma on first hybrid use (as is a missing index or one with
+another schema version).
+"""
+import re
+from pathlib import Path
+from typing import List, Tuple
+
+from langchain_core.documents import Document
+
+from app.core.config import settings
+from app.rag.chunk_index import ChunkIndex, IndexSingleton
+
+INDEX_FILENAME = "lexical_index.sqlite3"
+
+# Words joined by - . / _ are kept whole ("srvo-023", "a05b-2255") and also
+# indexed part by part, so both "SRVO-023" and "SRVO 023" match
+_TOKEN_PATTERN = re.compile(r"\w+(?:[-./]\w+)*")
+_PART_PATTERN = re.compile(r"[-./]")
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into casefolded terms (compound codes plus their parts)."""
+    terms = []
+    for token in _TOKEN_PATTERN.findall(text.casefold()):
+        terms.append(token)
+        if _PART_PATTERN.search(token):
+            terms.extend(part for part in _PART_PATTERN.split(token) if part)
+    return terms
+
+
+class LexicalIndex(ChunkIndex):
+    """BM25 index of chunk terms in an SQLite FTS5 table."""
+
+    NAME = "lexical"
+    SCHEMA_VERSION = 2
+    SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS chunks ("
+        " id INTEGER PRIMARY KEY, chunk_id TEXT NOT NULL UNIQUE, source TEXT NOT NULL)",
+        "CREATE INDEX IF NOT EXISTS chunks_source ON chunks (source)",
+        # Terms are split on spaces only: tokenize() already did the rest
+        "CREATE VIRTUAL TABLE IF NOT EXISTS terms USING fts5("
+        " text, tokenize = \"unicode61 remove_diacritics 0 tokenchars '-./_'\")",
+    )
+    TABLES = ("terms", "chunks")
+
+    def _insert(self, documents: List[Document], ids: List[str]) -> None:
+        for doc, chunk_id in zip(documents, ids):
+            row = self._conn.execute(
+                "INSERT INTO chunks (chunk_id, source) VALUES (?, ?)",
+                (chunk_id, doc.metadata.get("source", "")),
+            ).lastrowid
+            self._conn.execute(
+                "INSERT INTO terms (rowid, text) VALUES (?, ?)",
+                (row, " ".join(tokenize(doc.page_content))),
+            )
+
+    def _delete_rows(self, rows: List[int]) -> None:
+        self._conn.execute(
+            f"DELETE FROM terms WHERE rowid IN ({','.join('?' * len(rows))})", rows
+        )
+
+    def search(self, query: str, k: int) -> List[Tuple[str, float]]:
+        """Top-k (chunk_id, BM25 score) pairs for the query terms."""
+        terms = sorted(set(tokenize(query)))
+        if not terms:
+            return []
+        # Any term may match, like a sum of per-term BM25 scores
+        match = " OR ".join(f'"{term}"' for term in terms)
+        with self._lock:
+            # bm25() is negative, lower is better
+            rows = self._conn.execute(
+                "SELECT chunks.chunk_id, -bm25(terms) AS score FROM terms"
+                " JOIN chunks ON chunks.id = terms.rowid"
+                " WHERE terms MATCH ? ORDER BY score DESC, chunks.chunk_id LIMIT ?",
+                (match, k),
+            ).fetchall()
+        return [(chunk_id, score) for chunk_id, score in rows]
+
+
+# Global index instance (rebuilt on first use if empty)
+_lexical_index = IndexSingleton(lambda: LexicalIndex(get_lexical_index_path()))
+
+
+def get_lexical_index_path() -> Path:
+    """Path of the index database (kept next to the Chroma data)."""
+    return Path(settings.CHROMA_PERSIST_DIRECTORY) / INDEX_FILENAME
+
+
+def lexical_index_enabled() -> bool:
+    """True if retrieval reads the lexical index, so ingestion maintains it."""
+    return settings.RETRIEVAL_MODE.lower() == "hybrid"
+
+
+def get_lexical_index(collection=None) -> LexicalIndex:
+    """
+    Get the process-wide lexical index (singleton).
+
+    If a collection is given, the index is checked against it once per
+    process: an empty index over a non-empty collection (new file, other
+    schema version, or not maintained in vector mode) is rebuilt from the
+    stored chunks.
+    """
+    return _lexical_index.get(collection)
@@ -1,8 +1,8 @@
 """Azure OpenAI LLM Configuration."""
-import httpx
 from typing import Optional
 from langchain_openai import AzureChatOpenAI
 from app.core.config import settings
+from app.core.http_clients import AZURE_OPENAI, get_async_http_client, get_http_client
 
 
 # Model ID -> display name and Azure deployment config
@@ -19,6 +19,25 @@ _MODEL_DEPLOYMENT_MAP = {
     "gpt-4.1": (settings.AZURE_GPT41_DEPLOYMENT, settings.AZURE_GPT41_API_VERSION),
 }
 
+# Model used when the requested (or configured default) model is unknown
+FALLBACK_MODEL = "gpt-5.2"
+
+
+def resolve_model_id(model_id: Optional[str] = None) -> str:
+    """
+    Map a requested model ID to the model get_llm() actually serves.
+
+    Args:
+        model_id: Model ID (e.g., 'gpt-5.2'). Uses default if not provided.
+
+    Returns:
+        The model ID, settings.DEFAULT_MODEL, or FALLBACK_MODEL if unknown.
+    """
+    model = model_id or settings.DEFAULT_MODEL
+    if model not in _MODEL_DEPLOYMENT_MAP:
+        return FALLBACK_MODEL
+    return model
+
 
 def get_llm(model_id: Optional[str] = None, temperature: float = 0.3) -> AzureChatOpenAI:
     """
@@ -31,28 +50,21 @@ def get_llm(model_id: Optional[str] = None, temperature: float = 0.3) -> AzureCh
     Returns:
         AzureChatOpenAI instance.
     """
-    model = model_id or settings.DEFAULT_MODEL
-
-    deployment, api_version = _MODEL_DEPLOYMENT_MAP.get(
-        model,
-        (settings.AZURE_GPT52_DEPLOYMENT, settings.AZURE_GPT52_API_VERSION)
-    )
+    model = resolve_model_id(model_id)
+    deployment, api_version = _MODEL_DEPLOYMENT_MAP[model]
 
     # GPT-5 only supports temperature=1
     if model == "gpt-5":
         temperature = 1.0
 
-    http_client = httpx.Client(verify=False)
-    async_http_client = httpx.AsyncClient(verify=False)
-
     return AzureChatOpenAI(
         azure_deployment=deployment,
         azure_endpoint=settings.AZURE_OPENAI_ENDPOINT,
         api_key=settings.AZURE_OPENAI_API_KEY,
         api_version=api_version,
         temperature=temperature,
-        http_client=http_client,
-        http_async_client=async_http_client,
+        http_client=get_http_client(AZURE_OPENAI),
+        http_async_client=get_async_http_client(AZURE_OPENAI),
     )
 
 
@@ -0,0 +1,237 @@
+"""
+NumPy Exact-Search Index.
+
+Brute-force alternative to Chroma's HNSW index for VECTOR_BACKEND=numpy.
+The chunk embeddings are exported from the Chroma collection into an
+L2-normalized float32 matrix (.npy, memory-mapped on load) plus a compact
+JSON file of the chunk IDs in row order. A search is a blocked
+matrix product with the query vectors and an argpartition top-k per query:
+exact recall, latency linear in the corpus size, and the matrix lives in
+the OS page cache rather than the Python heap.
+
+Each export writes a new matrix file and then points the JSON file at it,
+so a matrix mapped by a running server is never overwritten (Windows
+cannot replace a mapped file); superseded files are deleted by a later
+export once nothing maps them.
+
+Scores are cosine similarities. The OpenAI embeddings are unit length, so
+the ranking is the same as Chroma's (L2) ranking.
+
+The export is a snapshot: the ingestion script rewrites it after each run
+that changed the collection (or removes it when another backend is
+selected), and a file that no longer matches the collection is re-exported
+on first use.
+"""
+import json
+import threading
+import time
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+from app.rag.chunk_index import IndexSingleton
+
+INDEX_DIRNAME = "numpy_index"
+EMBEDDINGS_PATTERN = "embeddings_*.npy"
+CHUNKS_FILENAME = "chunks.json"
+INDEX_VERSION = 1
+
+# Rows multiplied per step, bounds the score buffer (rows x queries floats)
+SEARCH_BLOCK_ROWS = 65536
+# Chunks read from Chroma per page during an export
+EXPORT_PAGE_SIZE = 1000
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    """Scale rows to unit length (zero rows stay zero)."""
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+class NumpyIndex:
+    """Memory-mapped embedding matrix with exact (brute-force) top-k search."""
+
+    def __init__(self, directory: Path):
+        self.directory = directory
+        self.chunks_path = directory / CHUNKS_FILENAME
+        self._lock = threading.Lock()
+        self._matrix: Optional[np.ndarray] = None
+        self._ids: List[str] = []
+        self._mtime: Optional[float] = None
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def _empty(self) -> None:
+        with self._lock:
+            self._matrix = None
+            self._ids = []
+
+    def clear(self) -> None:
+        """Remove the exported files and empty the index."""
+        self._empty()
+        self.chunks_path.unlink(missing_ok=True)
+        self._mtime = None
+        self._remove_unused_files(keep=None)
+
+    def _remove_unused_files(self, keep: Optional[str]) -> None:
+        """Delete superseded matrix files (skipping any still mapped elsewhere)."""
+        for path in self.directory.glob(EMBEDDINGS_PATTERN):
+            if path.name == keep:
+                continue
+            try:
+                path.unlink()
+            except OSError:
+                # Still memory-mapped by another process (Windows)
+                pass
+
+    def search(self, embeddings: List[List[float]], k: int) -> List[List[Tuple[str, float]]]:
+        """Top-k (chunk_id, cosine score) pairs for each query embedding."""
+        with self._lock:
+            matrix, ids = self._matrix, self._ids
+        if matrix is None or not ids or not embeddings:
+            return [[] for _ in embeddings]
+
+        queries = _normalize(np.asarray(embeddings, dtype=np.float32))
+        k = min(k, len(ids))
+        best_rows = np.empty((len(queries), 0), dtype=np.int64)
+        best_scores = np.empty((len(queries), 0), dtype=np.float32)
+        for start in range(0, len(ids), SEARCH_BLOCK_ROWS):
+            scores = queries @ matrix[start:start + SEARCH_BLOCK_ROWS].T
+            if scores.shape[1] > k:
+                top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+            else:
+                top = np.broadcast_to(np.arange(scores.shape[1]), scores.shape)
+            # Keep the running top-k of the blocks seen so far
+            best_rows = np.concatenate([best_rows, top + start], axis=1)
+            best_scores = np.concatenate([best_scores, np.take_along_axis(scores, top, axis=1)], axis=1)
+            if best_rows.shape[1] > k:
+                keep = np.argpartition(-best_scores, k - 1, axis=1)[:, :k]
+                best_rows = np.take_along_axis(best_rows, keep, axis=1)
+                best_scores = np.take_along_axis(best_scores, keep, axis=1)
+
+        results = []
+        for rows, scores in zip(best_rows, best_scores):
+            # Highest score first, row order (export order) breaks ties
+            order = np.lexsort((rows, -scores))
+            results.append([(ids[rows[i]], float(scores[i])) for i in order])
+        return results
+
+    def export(self, collection) -> None:
+        """Write every chunk embedding of the Chroma collection to disk and load it."""
+        print("Exporting embeddings for the NumPy index...")
+        self.directory.mkdir(parents=True, exist_ok=True)
+        count = collection.count()
+        ids: List[str] = []
+        embeddings_file = f"embeddings_{time.time_ns()}.npy"
+        matrix = None
+        offset = 0
+        while offset < count:
+            result = collection.get(
+                include=["embeddings"], limit=EXPORT_PAGE_SIZE, offset=offset
+            )
+            page_ids = result.get("ids") or []
+            if not page_ids:
+                break
+            vectors = np.asarray(result["embeddings"], dtype=np.float32)
+            if matrix is None:
+                matrix = np.lib.format.open_memmap(
+                    self.directory / embeddings_file, mode="w+", dtype=np.float32,
+                    shape=(count, vectors.shape[1]),
+                )
+            # Chunks added since count() was taken are left for the next export
+            page_ids = page_ids[:count - offset]
+            matrix[offset:offset + len(page_ids)] = _normalize(vectors[:len(page_ids)])
+            ids.extend(page_ids)
+            offset += len(page_ids)
+
+        if matrix is None:
+            self.clear()
+            print("NumPy index: 0 chunks")
+            return
+        matrix.flush()
+        del matrix
+
+        data = {"version": INDEX_VERSION, "embeddings_file": embeddings_file, "ids": ids}
+        tmp_path = self.chunks_path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"))
+        # The chunks file is replaced last: it switches readers to the new matrix
+        tmp_path.replace(self.chunks_path)
+        self.load()
+        self._remove_unused_files(keep=embeddings_file)
+        print(f"NumPy index: {len(self)} chunks x {self._matrix.shape[1]} dimensions")
+
+    def needs_rebuild(self, collection) -> bool:
+        """True if the export is missing or its chunk count differs from the collection."""
+        return len(self) != collection.count()
+
+    def rebuild(self, collection) -> None:
+        """Re-export from the collection (when out of sync, see IndexSingleton)."""
+        self.export(collection)
+
+    def load(self) -> bool:
+        """Memory-map the exported matrix. Returns False if missing or unreadable."""
+        if not self.chunks_path.exists():
+            self._empty()
+            self._mtime = None
+            return False
+        mtime = self.chunks_path.stat().st_mtime
+        try:
+            with open(self.chunks_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") != INDEX_VERSION:
+                raise ValueError(f"unsupported version {data.get('version')}")
+            matrix = np.load(self.directory / data["embeddings_file"], mmap_mode="r")
+            if matrix.ndim != 2 or matrix.shape[0] < len(data["ids"]):
+                raise ValueError("embedding matrix does not match the chunk list")
+            # Rows past the chunk list (chunks deleted during the export) are unused
+            matrix = matrix[:len(data["ids"])]
+        except Exception as e:
+            print(f"Error loading NumPy index, re-exporting: {e}")
+            self._empty()
+            self._mtime = mtime
+            return False
+        with self._lock:
+            self._matrix = matrix
+            self._ids = data["ids"]
+        self._mtime = mtime
+        return True
+
+    def is_stale(self) -> bool:
+        """True if the export on disk was rewritten by another process."""
+        try:
+            return self.chunks_path.stat().st_mtime != self._mtime
+        except FileNotFoundError:
+            return self._mtime is not None
+
+
+def _open_numpy_index() -> NumpyIndex:
+    index = NumpyIndex(get_numpy_index_dir())
+    index.load()
+    return index
+
+
+# Global index instance (loaded or exported on first use)
+_numpy_index = IndexSingleton(_open_numpy_index, reload_when_stale=True)
+
+
+def get_numpy_index_dir() -> Path:
+    """Directory of the exported matrix (kept next to the Chroma data)."""
+    return Path(settings.CHROMA_PERSIST_DIRECTORY) / INDEX_DIRNAME
+
+
+def get_numpy_index(collection=None) -> NumpyIndex:
+    """
+    Get the process-wide NumPy index (singleton).
+
+    The index is (re)loaded from disk on first use and whenever another
+    process (e.g. the ingestion script) rewrote the export. After each
+    load, if a collection is given, it is checked against it once: a
+    missing export or a chunk count that differs from the collection
+    triggers a new export.
+    """
+    return _numpy_index.get(collection)
@@ -0,0 +1,94 @@
+"""
+Single-pass PyMuPDF PDF Loader.
+
+Fallback parser used when Azure Document Intelligence is disabled or fails.
+Each PDF is opened once and every page is visited once:
+1. Text blocks are extracted with get_text("blocks")
+2. The page text is rebuilt from the blocks in reading order, one
+   paragraph per block, so the splitter can break on block boundaries
+3. The same blocks feed figure detection (caption search and region
+   expansion); the detected figures are handed to a FigureExtraction,
+   which renders them (in the ingestion process pool, page range by page
+   range) while parsing continues, or only records them when figures are
+   rendered on demand
+
+Much faster than PyPDFLoader on scanned-plus-vector manuals, and it
+replaces the separate detection pass of extract_images_from_pdf.
+
+Pages are read under fitz_lock (PyMuPDF is not thread-safe). The lock is
+held per page, not across yields, so a slow consumer never blocks other
+fitz users such as on-demand figure renders.
+"""
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import fitz  # PyMuPDF
+from langchain_core.documents import Document
+
+from app.rag.image_extractor import FigureExtraction, find_figures, fitz_lock
+
+PARSER_NAME = "pymupdf"
+
+
+def blocks_to_text(text_blocks: List[Tuple]) -> str:
+    """
+    Join the text blocks of a page in reading order (top to bottom, then
+    left to right), separated by blank lines.
+    """
+    # Same ordering as get_text("blocks", sort=True)
+    ordered = sorted(
+        (block for block in text_blocks if block[6] == 0),
+        key=lambda block: (block[3], block[0]),
+    )
+    paragraphs = [block[4].strip() for block in ordered]
+    return "\n\n".join(paragraph for paragraph in paragraphs if paragraph)
+
+
+def iter_pymupdf_pages(
+    pdf_path: Path,
+    file_metadata: Dict[str, str],
+    figures: Optional[FigureExtraction] = None,
+) -> Iterator[Document]:
+    """
+    Yield one Document per page, parsing lazily page by page.
+
+    When a FigureExtraction is given, the figures of each page are
+    detected in the same pass and queued on it for rendering (replacing
+    extract_images_from_pdf for this file); the caller collects them with
+    figures.result() once the pages are consumed.
+    """
+    pdf_name = pdf_path.name
+
+    with fitz_lock:
+        doc = fitz.open(str(pdf_path))
+        total_pages = len(doc)
+    try:
+        for page_index in range(total_pages):
+            page_number = page_index + 1
+            with fitz_lock:
+                page = doc[page_index]
+                text_blocks = page.get_text("blocks")
+                # Printed page number from the PDF's page labels ("" if none)
+                page_label = page.get_label()
+
+                if figures is not None:
+                    try:
+                        figures.add_page_figures(page_number, find_figures(page, text_blocks))
+                    except Exception as e:
+                        print(f"  Error extracting figures from page {page_number} of {pdf_name}: {e}")
+                # Release the page while holding the lock (freeing it calls into MuPDF)
+                del page
+
+            metadata = {
+                **file_metadata,
+                "source": pdf_name,
+                "page": page_number,
+                "total_pages": total_pages,
+                "parser": PARSER_NAME,
+            }
+            if page_label:
+                metadata["page_label"] = page_label
+            yield Document(page_content=blocks_to_text(text_blocks), metadata=metadata)
+    finally:
+        with fitz_lock:
+            doc.close()
@@ -0,0 +1,322 @@
+"""
+Adaptive Rate Limiter for Azure OpenAI Embeddings.
+
+Keeps embedding traffic inside the deployment quota instead of sleeping a
+fixed time between batches:
+1. Two token buckets (tokens per minute, requests per minute) sized to the
+   configured quota; a call waits only as long as the buckets require.
+2. On a 429 the limiter honours Retry-After, pauses all callers, lowers its
+   effective rate and retries with jittered exponential backoff.
+3. Successful calls gradually restore the rate to the configured quota.
+4. Transient failures (connection errors, timeouts, 5xx responses) are
+   retried with the same jittered backoff, without touching the rate.
+
+Token counts are estimated from text length (about 4 characters per token
+for English technical text); the adaptive rate absorbs the estimation error.
+"""
+import asyncio
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Awaitable, Callable, Dict, List, Optional, TypeVar
+
+import openai
+from langchain_core.embeddings import Embeddings
+
+from app.core.config import settings
+
+T = TypeVar("T")
+
+# Buckets hold 10 seconds of quota: Azure enforces limits over short windows
+_BURST_SECONDS = 10.0
+
+# Adaptive rate bounds (fraction of the configured quota)
+_MIN_RATE_FACTOR = 0.1
+_DECREASE_FACTOR = 0.7
+_INCREASE_STEP = 0.05
+
+# Backoff when the response carries no Retry-After header
+_BACKOFF_BASE_SECONDS = 2.0
+_BACKOFF_MAX_SECONDS = 60.0
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token)."""
+    return len(text) // 4 + 1
+
+
+class TokenBucket:
+    """Token bucket refilled continuously at `rate` units per second."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until `amount` units are available (0 if available now)."""
+        self._refill(now)
+        # Requests larger than the bucket are admitted once it is full
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def consume(self, amount: float) -> None:
+        self.tokens -= min(amount, self.capacity)
+
+
+class AdaptiveRateLimiter:
+    """Tokens-per-minute + requests-per-minute limiter with AIMD rate control."""
+
+    def __init__(self, tokens_per_minute: int, requests_per_minute: int):
+        self.tokens_per_minute = tokens_per_minute
+        self.requests_per_minute = requests_per_minute
+        self.rate_factor = 1.0
+        self.paused_until = 0.0
+        self._lock = threading.Lock()
+        self._tokens = TokenBucket(
+            tokens_per_minute / 60.0, tokens_per_minute / 60.0 * _BURST_SECONDS
+        )
+        self._requests = TokenBucket(
+            requests_per_minute / 60.0, max(1.0, requests_per_minute / 60.0 * _BURST_SECONDS)
+        )
+        self.stats = {
+            "requests": 0,
+            "tokens": 0,
+            "rate_limited": 0,
+            "transient_errors": 0,
+            "wait_seconds": 0.0,
+        }
+
+    def _reserve(self, tokens: int) -> float:
+        """Consume quota if available; otherwise return how long to wait."""
+        with self._lock:
+            now = time.monotonic()
+            if now < self.paused_until:
+                return self.paused_until - now
+            wait = max(
+                self._tokens.wait_time(tokens, now),
+                self._requests.wait_time(1, now),
+            )
+            if wait > 0:
+                return wait
+            self._tokens.consume(tokens)
+            self._requests.consume(1)
+            self.stats["requests"] += 1
+            self.stats["tokens"] += tokens
+            return 0.0
+
+    def acquire(self, tokens: int) -> None:
+        """Block until a request of `tokens` tokens fits in the quota."""
+        while True:
+            wait = self._reserve(tokens)
+            if wait <= 0:
+                return
+            self.stats["wait_seconds"] += wait
+            time.sleep(wait)
+
+    async def aacquire(self, tokens: int) -> None:
+        """Async version of acquire (does not block the event loop)."""
+        while True:
+            wait = self._reserve(tokens)
+            if wait <= 0:
+                return
+            self.stats["wait_seconds"] += wait
+            await asyncio.sleep(wait)
+
+    def _apply_rate_factor(self) -> None:
+        self._tokens.rate = self.tokens_per_minute / 60.0 * self.rate_factor
+        self._requests.rate = self.requests_per_minute / 60.0 * self.rate_factor
+
+    def on_success(self) -> None:
+        """Additive increase back towards the configured quota."""
+        with self._lock:
+            if self.rate_factor < 1.0:
+                self.rate_factor = min(1.0, self.rate_factor + _INCREASE_STEP)
+                self._apply_rate_factor()
+
+    def on_rate_limited(self, delay: float) -> None:
+        """Multiplicative decrease, and pause every caller for `delay` seconds."""
+        with self._lock:
+            self.stats["rate_limited"] += 1
+            self.rate_factor = max(_MIN_RATE_FACTOR, self.rate_factor * _DECREASE_FACTOR)
+            self._apply_rate_factor()
+            now = time.monotonic()
+            self.paused_until = max(self.paused_until, now + delay)
+            # Start from an empty bucket so traffic resumes gradually
+            self._tokens.tokens = 0.0
+            self._tokens.updated = self.paused_until
+            self._requests.tokens = 0.0
+            self._requests.updated = self.paused_until
+
+    def on_transient_error(self) -> None:
+        with self._lock:
+            self.stats["transient_errors"] += 1
+
+    def get_stats(self) -> Dict[str, float]:
+        with self._lock:
+            return {
+                **self.stats,
+                "wait_seconds": round(self.stats["wait_seconds"], 2),
+                "effective_tokens_per_minute": int(self.tokens_per_minute * self.rate_factor),
+                "effective_requests_per_minute": int(self.requests_per_minute * self.rate_factor),
+            }
+
+
+def is_rate_limit_error(error: Exception) -> bool:
+    """True for HTTP 429 / rate limit errors from the OpenAI client."""
+    return isinstance(error, openai.RateLimitError) or getattr(error, "status_code", None) == 429
+
+
+def is_transient_error(error: Exception) -> bool:
+    """True for connection errors, timeouts and 5xx responses from the OpenAI client."""
+    if isinstance(error, (openai.APIConnectionError, openai.InternalServerError)):
+        return True
+    status_code = getattr(error, "status_code", None)
+    return isinstance(status_code, int) and status_code >= 500
+
+
+def get_retry_after(error: Exception) -> Optional[float]:
+    """Seconds requested by the Retry-After(-ms) response header, if any."""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+
+    retry_after_ms = headers.get("retry-after-ms")
+    if retry_after_ms:
+        try:
+            return float(retry_after_ms) / 1000.0
+        except ValueError:
+            pass
+
+    retry_after = headers.get("retry-after")
+    if retry_after:
+        try:
+            return float(retry_after)
+        except ValueError:
+            try:
+                return max(0.0, parsedate_to_datetime(retry_after).timestamp() - time.time())
+            except (TypeError, ValueError):
+                return None
+    return None
+
+
+def _retry_delay(error: Exception, attempt: int) -> float:
+    """Retry-After plus jitter, or full-jitter exponential backoff."""
+    retry_after = get_retry_after(error)
+    if retry_after is not None:
+        return retry_after + random.uniform(0, 1.0)
+    return random.uniform(0, min(_BACKOFF_MAX_SECONDS, _BACKOFF_BASE_SECONDS * 2 ** attempt))
+
+
+def _retry_or_raise(limiter: AdaptiveRateLimiter, error: Exception, attempt: int) -> float:
+    """
+    Record a failed call and return the delay before retrying it. Raises
+    the error when it is not retryable or the retries are used up.
+    """
+    rate_limited = is_rate_limit_error(error)
+    if not (rate_limited or is_transient_error(error)) or attempt == settings.EMBEDDING_MAX_RETRIES:
+        raise error
+    delay = _retry_delay(error, attempt)
+    if rate_limited:
+        print(f"  Rate limited by Azure OpenAI, retrying in {delay:.1f}s "
+              f"(attempt {attempt + 1}/{settings.EMBEDDING_MAX_RETRIES})")
+        # Pauses every caller, so the retry waits in acquire()
+        limiter.on_rate_limited(delay)
+        return 0.0
+    print(f"  Azure OpenAI request failed ({type(error).__name__}), retrying in {delay:.1f}s "
+          f"(attempt {attempt + 1}/{settings.EMBEDDING_MAX_RETRIES})")
+    limiter.on_transient_error()
+    return delay
+
+
+def call_with_rate_limit(limiter: AdaptiveRateLimiter, tokens: int, fn: Callable[[], T]) -> T:
+    """Run `fn` inside the quota, retrying rate-limited and transient failures."""
+    for attempt in range(settings.EMBEDDING_MAX_RETRIES + 1):
+        limiter.acquire(tokens)
+        try:
+            result = fn()
+        except Exception as e:
+            delay = _retry_or_raise(limiter, e, attempt)
+            if delay > 0:
+                time.sleep(delay)
+            continue
+        limiter.on_success()
+        return result
+    raise RuntimeError("unreachable")
+
+
+async def acall_with_rate_limit(
+    limiter: AdaptiveRateLimiter, tokens: int, fn: Callable[[], Awaitable[T]]
+) -> T:
+    """Async version of call_with_rate_limit."""
+    for attempt in range(settings.EMBEDDING_MAX_RETRIES + 1):
+        await limiter.aacquire(tokens)
+        try:
+            result = await fn()
+        except Exception as e:
+            delay = _retry_or_raise(limiter, e, attempt)
+            if delay > 0:
+                await asyncio.sleep(delay)
+            continue
+        limiter.on_success()
+        return result
+    raise RuntimeError("unreachable")
+
+
+class RateLimitedEmbeddings(Embeddings):
+    """Embeddings wrapper that sends every Azure call through the rate limiter."""
+
+    def __init__(self, base: Embeddings, limiter: AdaptiveRateLimiter):
+        self.base = base
+        self.limiter = limiter
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        tokens = sum(estimate_tokens(text) for text in texts)
+        return call_with_rate_limit(self.limiter, tokens, lambda: self.base.embed_documents(texts))
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        tokens = sum(estimate_tokens(text) for text in texts)
+        return await acall_with_rate_limit(
+            self.limiter, tokens, lambda: self.base.aembed_documents(texts)
+        )
+
+    def embed_query(self, text: str) -> List[float]:
+        return call_with_rate_limit(
+            self.limiter, estimate_tokens(text), lambda: self.base.embed_query(text)
+        )
+
+    async def aembed_query(self, text: str) -> List[float]:
+        return await acall_with_rate_limit(
+            self.limiter, estimate_tokens(text), lambda: self.base.aembed_query(text)
+        )
+
+
+# Global limiter shared by every embeddings client (one deployment quota)
+_embedding_limiter: Optional[AdaptiveRateLimiter] = None
+_limiter_lock = threading.Lock()
+
+
+def get_embedding_rate_limiter() -> AdaptiveRateLimiter:
+    """Get the process-wide limiter for the embedding deployment (singleton)."""
+    global _embedding_limiter
+    with _limiter_lock:
+        if _embedding_limiter is None:
+            _embedding_limiter = AdaptiveRateLimiter(
+                tokens_per_minute=settings.EMBEDDING_TOKENS_PER_MINUTE,
+                requests_per_minute=settings.EMBEDDING_REQUESTS_PER_MINUTE,
+            )
+        return _embedding_limiter
+
+
+def get_embedding_rate_limiter_stats() -> Dict[str, float]:
+    """Get limiter counters (requests, tokens, 429s, time spent waiting)."""
+    return get_embedding_rate_limiter().get_stats()
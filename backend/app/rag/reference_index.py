@@ -0,0 +1,299 @@
+"""
+Reference Index (page store, table / figure / note labels, reference graph).
+
+Maps the targets of cross-references in the manuals to chunk IDs:
+- (source, page)            -> chunks of that page (printed page number,
+                               else PDF page number), in reading order
+- (source, "table", "5-10") -> chunks where Table 5-10 is defined
+- (source, "figure", "3-1") -> chunks where Fig. 3-1 is captioned
+- (source, "note", "4")     -> chunks where Note 4 is written out
+
+Pages are resolved by the page number printed on them first (the
+page_label set by the parsers from the PDF page labels or the page numbers
+Document Intelligence reads off the page), since that is the number the
+text cites: front matter shifts it from the PDF page index. Manuals
+without printed page numbers fall back to the PDF page number.
+
+A label counts as defined when it starts a line ("Table 5-10 Lubrication
+intervals", "Fig.3-1 Assembly", "Note 4) Use grease ..."); in-text
+mentions such as "see Table 5-10" are not definitions, so a lookup lands on
+the table itself rather than on the chunk that referred to it.
+
+Those mentions are recorded as the chunk's outgoing references, which
+turns the index into a chunk-to-chunk graph: referenced_chunks() resolves
+the references of a chunk to target chunks in the same manual. The
+retriever uses it to add referenced content to its results (see
+VectorStoreSearchRetriever), and the agent's lookup_document_reference
+tool resolves "See Table 5-10" or "Refer to Page 131" here. Either way the
+chunks are loaded from Chroma by ID - no embedding call, vector query or
+rerank.
+
+Like the lexical index, it is an SQLite file in CHROMA_PERSIST_DIRECTORY
+written batch by batch at ingestion (see chunk_index), and rebuilt from
+Chroma on first use if missing or empty.
+"""
+import json
+import re
+from pathlib import Path
+from typing import Iterable, List, Optional, Set, Tuple
+
+from langchain_core.documents import Document
+
+from app.core.config import settings
+from app.rag.chunk_index import ChunkIndex, IndexSingleton
+
+INDEX_FILENAME = "reference_index.sqlite3"
+
+# (chunk_id, source, page, chunk_index) of a target chunk
+TargetChunk = Tuple[str, str, Optional[int], int]
+
+# Label at the start of a line, optionally after markdown / table markup
+_LABEL_DEFINITION = re.compile(
+    r"^[\s#*_>|]*(?:<caption>\s*)?(table|tab\.|figure|fig\.?|note)[ \t]*(\d+(?:[ \t]*[-.\u2010\u2011\u2013][ \t]*\d+)*)(?!\w)",
+    re.IGNORECASE | re.MULTILINE,
+)
+
+# Any mention of a page / table / figure / note ("see page 131", "(Note 4)")
+_REFERENCE_MENTION = re.compile(
+    r"\b(page|table|tab\.|figure|fig\.?|note)[ \t]*(\d+(?:[ \t]*[-.\u2010\u2011\u2013][ \t]*\d+)*)(?!\w)",
+    re.IGNORECASE,
+)
+
+# Printed page number as read from the page ("131", "Page 5-12", "- 12 -")
+_PAGE_LABEL = re.compile(
+    r"^[\s\-\u2013]*(?:page|pg\.?|p\.)?[ \t]*(\d+(?:[ \t]*[-.\u2010\u2011\u2013][ \t]*\d+)*)[\s\-\u2013]*$",
+    re.IGNORECASE,
+)
+
+# Reference as written by the agent: "Table 5-10", "Page 131", "Fig. 3-1"
+_REFERENCE = re.compile(
+    r"^\s*(page|pg\.?|p\.|table|tab\.|figure|fig\.?)[ \t]*(\d+(?:[ \t]*[-.\u2010\u2011\u2013][ \t]*\d+)*)(?!\w)\s*$",
+    re.IGNORECASE,
+)
+
+_KINDS = {
+    "page": "page", "pg": "page", "pg.": "page", "p.": "page",
+    "table": "table", "tab.": "table",
+    "figure": "figure", "fig": "figure", "fig.": "figure",
+    "note": "note",
+}
+
+
+def normalize_label(label: str) -> str:
+    """Canonical label: "5.10", "5 - 10" and "5-10" are the same label."""
+    return re.sub(r"\s*[-.\u2010\u2011\u2013]\s*", "-", label.strip())
+
+
+def parse_reference(reference: str) -> Optional[Tuple[str, str]]:
+    """Parse "Table 5-10" / "Page 131" / "Fig. 3-1" into (kind, label), or None."""
+    match = _REFERENCE.match(reference)
+    if not match:
+        return None
+    return _KINDS[match.group(1).lower()], normalize_label(match.group(2))
+
+
+def parse_page_label(page_label: str) -> Optional[str]:
+    """Canonical label of a printed page number, or None if it is not numeric ("iv")."""
+    match = _PAGE_LABEL.match(page_label)
+    return normalize_label(match.group(1)) if match else None
+
+
+def _find_labels(pattern: re.Pattern, text: str) -> List[Tuple[str, str]]:
+    labels = []
+    for match in pattern.finditer(text):
+        label = (_KINDS[match.group(1).lower()], normalize_label(match.group(2)))
+        if label not in labels:
+            labels.append(label)
+    return labels
+
+
+def find_label_definitions(text: str) -> List[Tuple[str, str]]:
+    """(kind, label) of every table / figure / note defined (captioned) in the text."""
+    return _find_labels(_LABEL_DEFINITION, text)
+
+
+def find_references(text: str) -> List[Tuple[str, str]]:
+    """(kind, label) of every page / table / figure / note the text refers to, in order."""
+    defined = set(find_label_definitions(text))
+    return [label for label in _find_labels(_REFERENCE_MENTION, text) if label not in defined]
+
+
+class ReferenceIndex(ChunkIndex):
+    """Page / label index and reference graph of chunk IDs in SQLite tables."""
+
+    NAME = "reference"
+    SCHEMA_VERSION = 4
+    SCHEMA = (
+        # page_label: canonical printed page number; refs: JSON list of the
+        # (kind, label) references the chunk makes
+        "CREATE TABLE IF NOT EXISTS chunks ("
+        " id INTEGER PRIMARY KEY, chunk_id TEXT NOT NULL UNIQUE, source TEXT NOT NULL,"
+        " page INTEGER, page_label TEXT, chunk_index INTEGER NOT NULL, refs TEXT NOT NULL)",
+        "CREATE INDEX IF NOT EXISTS chunks_position ON chunks (source, page, chunk_index)",
+        # (kind, label) defined in a chunk; pages use kind "page" (PDF page
+        # number) and "page_label" (printed page number)
+        "CREATE TABLE IF NOT EXISTS targets ("
+        " kind TEXT NOT NULL, label TEXT NOT NULL, source TEXT NOT NULL, chunk INTEGER NOT NULL)",
+        "CREATE INDEX IF NOT EXISTS targets_label ON targets (kind, label, source)",
+        "CREATE INDEX IF NOT EXISTS targets_chunk ON targets (chunk)",
+    )
+    TABLES = ("targets", "chunks")
+
+    def _insert(self, documents: List[Document], ids: List[str]) -> None:
+        for doc, chunk_id in zip(documents, ids):
+            source = doc.metadata.get("source", "")
+            page = doc.metadata.get("page")
+            page = int(page) if page is not None else None
+            page_label = parse_page_label(str(doc.metadata.get("page_label") or ""))
+            row = self._conn.execute(
+                "INSERT INTO chunks (chunk_id, source, page, page_label, chunk_index, refs)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (chunk_id, source, page, page_label, int(doc.metadata.get("chunk_index") or 0),
+                 json.dumps(find_references(doc.page_content))),
+            ).lastrowid
+            keys = find_label_definitions(doc.page_content)
+            if page is not None:
+                keys.append(("page", str(page)))
+            if page_label is not None:
+                keys.append(("page_label", page_label))
+            self._conn.executemany(
+                "INSERT INTO targets (kind, label, source, chunk) VALUES (?, ?, ?, ?)",
+                [(kind, label, source, row) for kind, label in keys],
+            )
+
+    def _delete_rows(self, rows: List[int]) -> None:
+        self._conn.execute(
+            f"DELETE FROM targets WHERE chunk IN ({','.join('?' * len(rows))})", rows
+        )
+
+    def sources(self) -> List[str]:
+        with self._lock:
+            return [source for (source,) in self._conn.execute(
+                "SELECT DISTINCT source FROM chunks ORDER BY source"
+            )]
+
+    def _target_chunks(self, kind: str, label: str, source: Optional[str] = None) -> Set[TargetChunk]:
+        """Chunks where (kind, label) is defined, in one source or all."""
+        query = (
+            "SELECT chunks.chunk_id, chunks.source, chunks.page, chunks.chunk_index"
+            " FROM targets JOIN chunks ON chunks.id = targets.chunk"
+            " WHERE targets.kind = ? AND targets.label = ?"
+        )
+        params: Tuple = (kind, label)
+        if source is not None:
+            query += " AND targets.source = ?"
+            params += (source,)
+        return set(self._conn.execute(query, params))
+
+    def _page_chunks(self, label: str, source: Optional[str] = None) -> Set[TargetChunk]:
+        """
+        Chunks of a page: by printed page number in the sources that have
+        that number, by PDF page number in the others.
+        """
+        printed = self._target_chunks("page_label", label, source)
+        labelled_sources = {chunk[1] for chunk in printed}
+        return printed | {
+            chunk for chunk in self._target_chunks("page", label, source)
+            if chunk[1] not in labelled_sources
+        }
+
+    def _with_following_chunks(self, chunks: Set[TargetChunk]) -> Set[TargetChunk]:
+        """Add the chunk after each one on the same page (tables run past chunk boundaries)."""
+        result = set(chunks)
+        for _, source, page, chunk_index in chunks:
+            result.update(self._conn.execute(
+                "SELECT chunk_id, source, page, chunk_index FROM chunks"
+                " WHERE source = ? AND page = ? AND chunk_index = ?",
+                (source, page, chunk_index + 1),
+            ))
+        return result
+
+    @staticmethod
+    def _reading_order(chunks: Iterable[TargetChunk]) -> List[str]:
+        return [chunk[0] for chunk in sorted(chunks, key=lambda chunk: (chunk[1], chunk[3]))]
+
+    def lookup(self, kind: str, label: str, source: Optional[str] = None) -> List[str]:
+        """
+        Chunk IDs for a page / table / figure, ordered by source and reading order.
+
+        source matches case-insensitively on the file name or any part of
+        it ("Manual_R2000" finds "Manual_R2000iC.pdf"); None searches all.
+        For tables and figures the chunk that follows each defining chunk on
+        the same page is included, since tables often run past a chunk
+        boundary.
+        """
+        wanted = source.casefold() if source else None
+        with self._lock:
+            label = normalize_label(label)
+            if kind == "page":
+                chunks = self._page_chunks(label)
+            else:
+                chunks = self._target_chunks(kind, label)
+            chunks = {chunk for chunk in chunks if not wanted or wanted in chunk[1].casefold()}
+            if kind != "page":
+                chunks = self._with_following_chunks(chunks)
+            return self._reading_order(chunks)
+
+    def referenced_chunks(self, chunk_id: str) -> List[Tuple[str, str]]:
+        """
+        One hop in the reference graph: (target chunk ID, reference) pairs
+        for every reference of the chunk, resolved in the same manual.
+
+        References are visited in the order they appear; targets of one
+        reference are in reading order. When a label is defined on several
+        pages (notes are often numbered per table), only the definitions on
+        the page closest to the referencing chunk are used. References to
+        the chunk's own page are skipped (page footers, "on this page").
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT source, page, page_label, refs FROM chunks WHERE chunk_id = ?", (chunk_id,)
+            ).fetchone()
+            if row is None:
+                return []
+            source, page, page_label, references = row
+            own_page = page_label or (str(page) if page is not None else None)
+
+            targets: List[Tuple[str, str]] = []
+            seen = {chunk_id}
+            for kind, label in json.loads(references):
+                if kind == "page":
+                    if label == own_page:
+                        continue
+                    chunks = self._page_chunks(label, source)
+                else:
+                    chunks = self._target_chunks(kind, label, source)
+                if not chunks:
+                    continue
+                if kind != "page":
+                    if page is not None:
+                        distance = {chunk: abs((chunk[2] or 0) - page) for chunk in chunks}
+                        nearest = min(distance.values())
+                        chunks = {chunk for chunk in chunks if distance[chunk] == nearest}
+                    chunks = self._with_following_chunks(chunks)
+
+                reference = f"{kind.capitalize()} {label}"
+                for target_id in self._reading_order(chunks):
+                    if target_id not in seen:
+                        seen.add(target_id)
+                        targets.append((target_id, reference))
+            return targets
+
+
+# Global index instance (rebuilt on first use if empty)
+_reference_index = IndexSingleton(lambda: ReferenceIndex(get_reference_index_path()))
+
+
+def get_reference_index_path() -> Path:
+    """Path of the index database (kept next to the Chroma data)."""
+    return Path(settings.CHROMA_PERSIST_DIRECTORY) / INDEX_FILENAME
+
+
+def get_reference_index(collection=None) -> ReferenceIndex:
+    """
+    Get the process-wide reference index (singleton).
+
+    Checked against the collection like the lexical index (see
+    get_lexical_index).
+    """
+    return _reference_index.get(collection)
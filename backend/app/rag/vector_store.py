@@ -1,18 +1,34 @@
 """ChromaDB Vector Store Management."""
+import asyncio
 import os
 from pathlib import Path
-from typing import Optional
+from typing import Dict, List, Optional
 import chromadb
 from chromadb.config import Settings as ChromaSettings
 from langchain_chroma import Chroma
+from langchain_core.callbacks import (
+    AsyncCallbackManagerForRetrieverRun,
+    CallbackManagerForRetrieverRun,
+)
 from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
 
 from app.core.config import settings
-from app.rag.embeddings import get_embeddings
+from app.rag.embeddings import aembed_queries, embed_queries, get_embeddings
+from app.rag.lexical_index import get_lexical_index
+from app.rag.numpy_index import get_numpy_index
+from app.rag.rate_limiter import estimate_tokens
+from app.rag.reference_index import get_reference_index
+
+# Reciprocal rank fusion constant (Cormack et al.): damps the weight of top ranks
+RRF_K = 60
 
 # Global client instance to avoid conflicts
 _chroma_client = None
 
+# Global LangChain wrapper (reset whenever the collection is deleted)
+_vector_store = None
+
 
 def get_chroma_client() -> chromadb.PersistentClient:
     """Get ChromaDB persistent client (singleton)."""
@@ -29,61 +45,332 @@ def get_chroma_client() -> chromadb.PersistentClient:
 
 
 def get_vector_store() -> Chroma:
-    """Get LangChain Chroma vector store instance."""
-    client = get_chroma_client()
+    """Get LangChain Chroma vector store instance (singleton)."""
+    global _vector_store
+    if _vector_store is None:
+        _vector_store = Chroma(
+            client=get_chroma_client(),
+            collection_name=settings.CHROMA_COLLECTION_NAME,
+            embedding_function=get_embeddings()
+        )
+    return _vector_store
 
-    return Chroma(
-        client=client,
-        collection_name=settings.CHROMA_COLLECTION_NAME,
-        embedding_function=get_embeddings()
-    )
 
+def reciprocal_rank_fusion(rankings: List[List[Document]], k: int = RRF_K) -> List[Document]:
+    """
+    Merge ranked lists of documents by reciprocal rank fusion.
 
-def get_retriever(k: int = 4, use_reranker: bool = True):
+    Each document scores sum(1 / (k + rank)) over the lists it appears in
+    (matched by chunk ID); the fused score is stored in metadata["rrf_score"].
     """
-    Get retriever from vector store with optional reranking.
+    scores: Dict[str, float] = {}
+    documents: Dict[str, Document] = {}
+    for ranking in rankings:
+        for rank, doc in enumerate(ranking, start=1):
+            key = doc.id or doc.page_content
+            scores[key] = scores.get(key, 0.0) + 1.0 / (k + rank)
+            documents.setdefault(key, doc)
 
-    When reranking is enabled, retrieves more candidates (k*3) then
-    reranks to return the top k most relevant documents.
+    fused = []
+    # sorted() is stable: ties keep first-seen order (vector results first)
+    for key in sorted(scores, key=lambda key: -scores[key]):
+        doc = documents[key]
+        doc.metadata["rrf_score"] = scores[key]
+        fused.append(doc)
+    return fused
+
+
+def get_documents_by_ids(ids: List[str]) -> List[Document]:
     """
-    from app.rag.reranker import is_reranker_available
+    Load chunks from Chroma by ID, in the given order (no embedding call).
 
-    if use_reranker and is_reranker_available():
-        return _get_reranked_retriever(k=k)
+    IDs no longer in the collection (e.g. deleted since an index was
+    saved) are skipped.
+    """
+    if not ids:
+        return []
+    result = get_vector_store()._collection.get(ids=ids, include=["documents", "metadatas"])
+    found = {
+        chunk_id: Document(page_content=text or "", metadata=metadata or {}, id=chunk_id)
+        for chunk_id, text, metadata in zip(result["ids"], result["documents"], result["metadatas"])
+    }
+    return [found[chunk_id] for chunk_id in ids if chunk_id in found]
 
-    vector_store = get_vector_store()
-    return vector_store.as_retriever(
-        search_type="similarity",
-        search_kwargs={"k": k}
+
+def similarity_search_by_vectors(
+    embeddings: List[List[float]], k: int, backend: str = "chroma"
+) -> List[List[Document]]:
+    """
+    Top-k chunks for each query embedding, in one query.
+
+    backend "chroma" queries the HNSW index of the collection; "numpy"
+    runs an exact search over the exported embedding matrix and loads the
+    hits from Chroma by ID.
+    """
+    if not embeddings:
+        return []
+    if backend == "numpy":
+        hits = get_numpy_index(get_vector_store()._collection).search(embeddings, k)
+        found = {
+            doc.id: doc
+            for doc in get_documents_by_ids(list(dict.fromkeys(cid for query in hits for cid, _ in query)))
+        }
+        return [[found[cid] for cid, _ in query if cid in found] for query in hits]
+
+    result = get_vector_store()._collection.query(
+        query_embeddings=embeddings, n_results=k, include=["documents", "metadatas"]
     )
+    return [
+        [
+            Document(page_content=text or "", metadata=metadata or {}, id=chunk_id)
+            for chunk_id, text, metadata in zip(ids, texts, metadatas)
+        ]
+        for ids, texts, metadatas in zip(result["ids"], result["documents"], result["metadatas"])
+    ]
+
+
+def lexical_search(query: str, k: int) -> List[Document]:
+    """Top-k chunks for the query from the BM25 index, loaded from Chroma."""
+    hits = get_lexical_index(get_vector_store()._collection).search(query, k)
+    return get_documents_by_ids([chunk_id for chunk_id, _ in hits])
+
+
+def expand_references(docs: List[Document], token_budget: int) -> List[Document]:
+    """
+    Append the chunks referenced by the results ("see page 131", "Table 5-10",
+    "Note 4"), one hop in the reference graph, within a token budget.
+
+    Targets are taken in result order (references of the best result
+    first); a target that does not fit the remaining budget is skipped.
+    Added chunks carry metadata["referenced_as"] (e.g. "Table 5-10") and
+    metadata["referenced_by"] (chunk ID of the result that refers to them).
+    """
+    index = get_reference_index(get_vector_store()._collection)
+    seen = {doc.id for doc in docs}
+    targets = []
+    for doc in docs:
+        if not doc.id:
+            continue
+        for target_id, reference in index.referenced_chunks(doc.id):
+            if target_id not in seen:
+                seen.add(target_id)
+                targets.append((target_id, reference, doc.id))
+    if not targets:
+        return docs
+
+    loaded = {doc.id: doc for doc in get_documents_by_ids([target_id for target_id, _, _ in targets])}
+    expanded = []
+    for target_id, reference, referenced_by in targets:
+        doc = loaded.get(target_id)
+        if doc is None:
+            continue
+        tokens = estimate_tokens(doc.page_content)
+        if tokens > token_budget:
+            continue
+        token_budget -= tokens
+        doc.metadata["referenced_as"] = reference
+        doc.metadata["referenced_by"] = referenced_by
+        expanded.append(doc)
+    return docs + expanded
+
+
+class VectorStoreSearchRetriever(BaseRetriever):
+    """
+    Similarity retriever with optional hybrid search and Cohere reranking.
+
+    In "hybrid" mode the vector results are fused with BM25 results from
+    the lexical index (reciprocal rank fusion) before reranking, so exact
+    tokens such as error codes and part numbers are not missed.
+
+    multi_query_search / amulti_query_search retrieve for several queries
+    at once (e.g. query expansion): one embedding request, one Chroma query
+    and one rerank over the fused union.
+
+    backend selects the vector search: "chroma" (HNSW) or "numpy" (exact
+    search over a memory-mapped embedding matrix, see numpy_index).
 
+    With expand_references, the chunks that the final results refer to
+    (pages, tables, figures, notes) are appended within reference_token_budget,
+    so many cross-references are resolved without another search.
 
-def _get_reranked_retriever(k: int = 4):
-    """Get a retriever that uses Cohere reranking after initial retrieval."""
-    from typing import List
-    from langchain_core.callbacks import CallbackManagerForRetrieverRun
-    from langchain_core.retrievers import BaseRetriever
-    from langchain_core.documents import Document as LCDocument
-    from app.rag.reranker import rerank_documents
-
-    class RerankedRetriever(BaseRetriever):
-        """Retriever that fetches candidates then reranks with Cohere."""
-        base_k: int = k
-        candidate_multiplier: int = 3
-
-        def _get_relevant_documents(
-            self, query: str, *, run_manager: CallbackManagerForRetrieverRun
-        ) -> List[LCDocument]:
-            vector_store = get_vector_store()
-            candidates_k = self.base_k * self.candidate_multiplier
-            base_retriever = vector_store.as_retriever(
-                search_type="similarity",
-                search_kwargs={"k": candidates_k}
+    The vector store is resolved on every query rather than captured at
+    construction time, so long-lived retrievers (e.g. inside the shared
+    agent graphs) keep working after the collection is cleared and rebuilt.
+    """
+    base_k: int = 4
+    use_reranker: bool = False
+    candidate_multiplier: int = 3
+    mode: str = "vector"
+    backend: str = "chroma"
+    expand_references: bool = False
+    reference_token_budget: int = 1500
+
+    def _candidates_k(self) -> int:
+        """Candidates per search (more when reranking or fusing)."""
+        if self.use_reranker or self.mode == "hybrid":
+            return self.base_k * self.candidate_multiplier
+        return self.base_k
+
+    def _finish(self, candidates: List[Document], lexical: Optional[List[Document]]) -> List[Document]:
+        """Fuse with the lexical results (hybrid) and cut to the rerank/return size."""
+        if lexical is not None:
+            candidates = reciprocal_rank_fusion([candidates, lexical])
+        if self.use_reranker:
+            return candidates[:self._candidates_k()]
+        return candidates[:self.base_k]
+
+    def _fuse_queries(
+        self, vector_rankings: List[List[Document]], lexical_rankings: Optional[List[List[Document]]]
+    ) -> List[Document]:
+        """Fuse the per-query rankings (RRF) into one deduplicated candidate list."""
+        rankings = list(vector_rankings)
+        if lexical_rankings is not None:
+            rankings += lexical_rankings
+        if len(rankings) == 1:
+            return rankings[0]
+        return reciprocal_rank_fusion(rankings)
+
+    def multi_query_search(self, queries: List[str], top_n: Optional[int] = None) -> List[Document]:
+        """
+        Retrieve for several queries at once; returns up to top_n (default
+        base_k) documents, reranked against the first query.
+        """
+        queries = list(dict.fromkeys(queries))
+        if not queries:
+            return []
+        candidates_k = self._candidates_k()
+        embeddings = embed_queries(get_vector_store().embeddings, queries)
+        vector_rankings = similarity_search_by_vectors(embeddings, candidates_k, self.backend)
+        lexical_rankings = None
+        if self.mode == "hybrid":
+            lexical_rankings = [lexical_search(query, candidates_k) for query in queries]
+        docs = self._fuse_queries(vector_rankings, lexical_rankings)
+        top_n = top_n or self.base_k
+        if self.use_reranker:
+            from app.rag.reranker import rerank_documents
+
+            docs = rerank_documents(queries[0], docs[:candidates_k * len(queries)], top_n=top_n)
+        else:
+            docs = docs[:top_n]
+        if self.expand_references:
+            docs = expand_references(docs, self.reference_token_budget)
+        return docs
+
+    async def amulti_query_search(self, queries: List[str], top_n: Optional[int] = None) -> List[Document]:
+        """Async version of multi_query_search."""
+        queries = list(dict.fromkeys(queries))
+        if not queries:
+            return []
+        vector_store = get_vector_store()
+        candidates_k = self._candidates_k()
+
+        async def vector_search() -> List[List[Document]]:
+            embeddings = await aembed_queries(vector_store.embeddings, queries)
+            return await asyncio.to_thread(
+                similarity_search_by_vectors, embeddings, candidates_k, self.backend
+            )
+
+        def lexical_searches() -> List[List[Document]]:
+            return [lexical_search(query, candidates_k) for query in queries]
+
+        if self.mode == "hybrid":
+            # BM25 lookups run while the queries are being embedded
+            vector_rankings, lexical_rankings = await asyncio.gather(
+                vector_search(), asyncio.to_thread(lexical_searches)
+            )
+        else:
+            vector_rankings, lexical_rankings = await vector_search(), None
+        docs = self._fuse_queries(vector_rankings, lexical_rankings)
+        top_n = top_n or self.base_k
+        if self.use_reranker:
+            from app.rag.reranker import arerank_documents
+
+            docs = await arerank_documents(queries[0], docs[:candidates_k * len(queries)], top_n=top_n)
+        else:
+            docs = docs[:top_n]
+        if self.expand_references:
+            docs = await asyncio.to_thread(expand_references, docs, self.reference_token_budget)
+        return docs
+
+    def _get_relevant_documents(
+        self, query: str, *, run_manager: CallbackManagerForRetrieverRun
+    ) -> List[Document]:
+        vector_store = get_vector_store()
+        candidates_k = self._candidates_k()
+        embedding = vector_store.embeddings.embed_query(query)
+        candidates = similarity_search_by_vectors([embedding], candidates_k, self.backend)[0]
+        lexical = lexical_search(query, candidates_k) if self.mode == "hybrid" else None
+        docs = self._finish(candidates, lexical)
+        if self.use_reranker:
+            from app.rag.reranker import rerank_documents
+
+            docs = rerank_documents(query, docs, top_n=self.base_k)
+        if self.expand_references:
+            docs = expand_references(docs, self.reference_token_budget)
+        return docs
+
+    async def _aget_relevant_documents(
+        self, query: str, *, run_manager: AsyncCallbackManagerForRetrieverRun
+    ) -> List[Document]:
+        # Embed over the async client, then run the (blocking) vector
+        # search in a worker thread so the event loop stays responsive
+        vector_store = get_vector_store()
+        candidates_k = self._candidates_k()
+
+        async def vector_search() -> List[Document]:
+            embedding = await vector_store.embeddings.aembed_query(query)
+            rankings = await asyncio.to_thread(
+                similarity_search_by_vectors, [embedding], candidates_k, self.backend
+            )
+            return rankings[0]
+
+        if self.mode == "hybrid":
+            # BM25 lookup runs while the query is being embedded
+            candidates, lexical = await asyncio.gather(
+                vector_search(), asyncio.to_thread(lexical_search, query, candidates_k)
             )
-            candidates = base_retriever.invoke(query)
-            return rerank_documents(query, candidates, top_n=self.base_k)
+        else:
+            candidates, lexical = await vector_search(), None
+        docs = self._finish(candidates, lexical)
+        if self.use_reranker:
+            from app.rag.reranker import arerank_documents
+
+            docs = await arerank_documents(query, docs, top_n=self.base_k)
+        if self.expand_references:
+            docs = await asyncio.to_thread(expand_references, docs, self.reference_token_budget)
+        return docs
+
+
+def get_retriever(
+    k: int = 4,
+    use_reranker: bool = True,
+    mode: Optional[str] = None,
+    expand_references: Optional[bool] = None,
+):
+    """
+    Get retriever from vector store with optional reranking.
 
-    return RerankedRetriever(base_k=k)
+    mode is "vector" (similarity search only) or "hybrid" (similarity +
+    BM25, fused by reciprocal rank); defaults to RETRIEVAL_MODE. The
+    similarity search uses VECTOR_BACKEND ("chroma" or "numpy").
+    expand_references adds the chunks the results refer to (one hop,
+    REFERENCE_EXPANSION_TOKEN_BUDGET); defaults to RETRIEVAL_EXPAND_REFERENCES.
+
+    When reranking is enabled, retrieves more candidates (k*3) then
+    reranks to return the top k most relevant documents.
+    """
+    from app.rag.reranker import is_reranker_available
+
+    return VectorStoreSearchRetriever(
+        base_k=k,
+        use_reranker=use_reranker and is_reranker_available(),
+        mode=(mode or settings.RETRIEVAL_MODE).lower(),
+        backend=settings.VECTOR_BACKEND.lower(),
+        expand_references=(
+            settings.RETRIEVAL_EXPAND_REFERENCES if expand_references is None else expand_references
+        ),
+        reference_token_budget=settings.REFERENCE_EXPANSION_TOKEN_BUDGET,
+    )
 
 
 def add_documents(documents: list[Document]) -> int:
@@ -116,7 +403,7 @@ def get_collection_stats() -> dict:
 
 def clear_collection() -> bool:
     """Clear all documents from the collection."""
-    global _chroma_client
+    global _chroma_client, _vector_store
     try:
         client = get_chroma_client()
         try:
@@ -124,6 +411,14 @@ def clear_collection() -> bool:
         except ValueError:
             # Collection doesn't exist, that's fine
             pass
+        # The cached wrapper points at the deleted collection, and so do the
+        # retrievers of the compiled agents
+        _vector_store = None
+        from app.rag.agent import clear_agent_registry
+        clear_agent_registry()
+        get_lexical_index().clear()
+        get_reference_index().clear()
+        get_numpy_index().clear()
         return True
     except Exception:
         return False
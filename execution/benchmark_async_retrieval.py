@@ -0,0 +1,170 @@
+"""
+Async Retrieval Benchmark
+Measures how concurrent searches behave with the blocking (invoke) and
+async (ainvoke) retrieval paths against the configured knowledge base.
+
+For each path it reports the wall-clock time for N concurrent searches and
+the worst event-loop stall seen by a heartbeat task - the delay every other
+SSE stream on the worker would experience.
+
+With a simulated latency, it runs offline instead: a throwaway ChromaDB
+with synthetic chunks and a stand-in embeddings client that waits the
+given time per request (no cache, no reranker, vector search only), so
+the numbers isolate how each path handles the embedding round trip.
+
+Usage:
+    python benchmark_async_retrieval.py [concurrency] [simulated_latency_ms]
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add backend to path for imports
+backend_path = Path(__file__).parent.parent / "backend"
+sys.path.insert(0, str(backend_path))
+
+# Change to backend directory for correct .env loading
+os.chdir(backend_path)
+
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv(backend_path / ".env")
+
+QUERIES = [
+    "maintenance schedule 300 operating hours",
+    "grease specifications for J1 axis",
+    "battery replacement procedure",
+    "error code H0039 troubleshooting",
+    "timing belt tension inspection",
+    "lubrication interval shaft",
+    "emergency stop circuit check",
+    "encoder backup battery warning",
+]
+
+HEARTBEAT_INTERVAL = 0.01
+SIMULATED_CHUNKS = 500
+
+
+def setup_simulation(latency_ms: float) -> None:
+    """Offline knowledge base and embeddings with a fixed request latency."""
+    work_dir = Path(tempfile.mkdtemp(prefix="async_retrieval_"))
+    # Must be set before the app settings are imported
+    os.environ["CHROMA_PERSIST_DIRECTORY"] = str(work_dir / "chroma_db")
+    os.environ["EMBEDDING_CACHE_ENABLED"] = "false"
+    os.environ["RETRIEVAL_MODE"] = "vector"
+    os.environ["RETRIEVAL_EXPAND_REFERENCES"] = "false"
+    os.environ["AZURE_RERANKER_ENDPOINT"] = ""
+
+    from langchain_core.documents import Document
+    from langchain_core.embeddings import DeterministicFakeEmbedding
+
+    latency = latency_ms / 1000
+
+    class SlowEmbeddings(DeterministicFakeEmbedding):
+        """Deterministic vectors after a simulated network round trip."""
+
+        def embed_query(self, text):
+            time.sleep(latency)
+            return super().embed_query(text)
+
+        async def aembed_query(self, text):
+            await asyncio.sleep(latency)
+            return super().embed_query(text)
+
+    import app.rag.embeddings as embeddings_module
+
+    embeddings_module.get_azure_embeddings = lambda: SlowEmbeddings(size=256)
+
+    from app.rag.vector_store import get_vector_store
+
+    # Chunks are embedded once at setup, without the simulated latency
+    collection = get_vector_store()._collection
+    base = DeterministicFakeEmbedding(size=256)
+    texts = [f"{QUERIES[i % len(QUERIES)]} - manual section {i}" for i in range(SIMULATED_CHUNKS)]
+    collection.add(
+        ids=[f"chunk-{i:05d}" for i in range(SIMULATED_CHUNKS)],
+        embeddings=base.embed_documents(texts),
+        documents=texts,
+        metadatas=[{"source": "Simulated_Manual.pdf", "page": i // 5 + 1} for i in range(SIMULATED_CHUNKS)],
+    )
+    print(f"\nSimulated knowledge base: {work_dir}")
+    print(f"Simulated embedding latency: {latency_ms:.0f} ms per request")
+
+
+async def _heartbeat(stop: asyncio.Event, lags: list) -> None:
+    """Record how late each scheduled wake-up of the event loop was."""
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        expected = loop.time() + HEARTBEAT_INTERVAL
+        await asyncio.sleep(HEARTBEAT_INTERVAL)
+        lags.append(max(0.0, loop.time() - expected))
+
+
+async def run_searches(retriever, queries: list, use_async: bool) -> dict:
+    """Run all queries concurrently and measure wall time and loop lag."""
+
+    async def search(query: str):
+        if use_async:
+            return await retriever.ainvoke(query)
+        # What the handlers did before: a blocking call inside a coroutine
+        return retriever.invoke(query)
+
+    stop = asyncio.Event()
+    lags: list = []
+    heartbeat = asyncio.create_task(_heartbeat(stop, lags))
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(search(q) for q in queries))
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    await heartbeat
+
+    return {
+        "elapsed": elapsed,
+        "max_lag": max(lags) if lags else elapsed,
+        "docs": sum(len(r) for r in results),
+    }
+
+
+async def main(concurrency: int, latency_ms: float = None):
+    """Main benchmark function."""
+    print("=" * 60)
+    print("  MAINTENANCE AI COPILOT - Async Retrieval Benchmark")
+    print("=" * 60)
+
+    if latency_ms is not None:
+        setup_simulation(latency_ms)
+
+    from app.rag.vector_store import get_collection_stats, get_retriever
+
+    stats = get_collection_stats()
+    print(f"\nCollection: {stats.get('name')} ({stats.get('count', 0)} chunks)")
+    if not stats.get("count"):
+        print("[ERROR] Knowledge base is empty, run ingest_knowledge.py first")
+        return
+
+    queries = [QUERIES[i % len(QUERIES)] for i in range(concurrency)]
+    retriever = get_retriever(k=4)
+
+    # Warm up clients and connections so both runs start from the same state
+    await retriever.ainvoke(queries[0])
+
+    for label, use_async in (("blocking invoke()", False), ("async ainvoke()", True)):
+        result = await run_searches(retriever, queries, use_async)
+        print(f"\n[{label}] {concurrency} concurrent searches")
+        print(f"      Wall time:        {result['elapsed'] * 1000:8.0f} ms")
+        print(f"      Max loop stall:   {result['max_lag'] * 1000:8.0f} ms")
+        print(f"      Docs returned:    {result['docs']}")
+
+    print("\n" + "=" * 60)
+
+
+if __name__ == "__main__":
+    concurrency = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    latency_ms = float(sys.argv[2]) if len(sys.argv) > 2 else None
+    asyncio.run(main(concurrency, latency_ms))
@@ -0,0 +1,150 @@
+"""
+Figure Extraction Scaling Benchmark
+Measures pages per second of extract_images_from_pdf as the process pool
+grows. Pages are split into ranges (INGESTION_FIGURE_PAGES_PER_TASK), each
+worker opens its own fitz document, and the per-page manifests are merged.
+
+Runs on the given PDF, or on a synthetic image-heavy manual (several
+captioned figures built from image tiles on every page). Checks that every
+pool size produces the same manifest as a single process.
+
+Usage:
+    python benchmark_figure_extraction.py [pdf]
+"""
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from importlib import import_module
+from multiprocessing import get_context
+from pathlib import Path
+
+# Add backend to path for imports
+backend_path = Path(__file__).parent.parent / "backend"
+sys.path.insert(0, str(backend_path))
+
+# Change to backend directory for correct .env loading
+os.chdir(backend_path)
+
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv(backend_path / ".env")
+
+SYNTHETIC_PAGES = 120
+FIGURES_PER_PAGE = 3
+
+
+def make_manual(path: Path, pages: int) -> None:
+    """Write a synthetic image-heavy manual (tiled figures with captions)."""
+    import fitz
+
+    doc = fitz.open()
+    for page_number in range(1, pages + 1):
+        page = doc.new_page()
+        page.insert_text((50, 40), f"Section {page_number} - Parts list", fontsize=10)
+        for fig in range(FIGURES_PER_PAGE):
+            top = 70 + fig * 240
+            # Each figure is a 2x2 mosaic of tiles, like exploded parts drawings
+            for row in range(2):
+                for col in range(2):
+                    pixmap = fitz.Pixmap(fitz.csRGB, fitz.IRect(0, 0, 200, 140), 0)
+                    pixmap.clear_with((page_number * 7 + fig * 31 + row * 3 + col) % 200 + 30)
+                    x0 = 80 + col * 160
+                    y0 = top + row * 95
+                    page.insert_image(fitz.Rect(x0, y0, x0 + 150, y0 + 90), pixmap=pixmap)
+            page.insert_text((420, top + 60), f"Bolt M{6 + fig}", fontsize=8)
+            page.insert_text((100, top + 205), f"Fig.{page_number}-{fig + 1} Gearbox assembly", fontsize=9)
+    doc.save(str(path))
+    doc.close()
+
+
+def main():
+    """Run the figure extraction benchmark."""
+    print("=" * 60)
+    print("  MAINTENANCE AI COPILOT - Figure Extraction Benchmark")
+    print("=" * 60)
+
+    # Rendered figures go to a throwaway directory (IMAGES_BASE_DIR is
+    # derived from RAW_PDFS_DIRECTORY, so set it before importing the app)
+    work_dir = Path(tempfile.mkdtemp(prefix="figure_extraction_"))
+    os.environ["RAW_PDFS_DIRECTORY"] = str(work_dir / "raw_pdfs")
+
+    if len(sys.argv) > 1:
+        pdf_path = Path(sys.argv[1]).resolve()
+    else:
+        (work_dir / "raw_pdfs").mkdir()
+        pdf_path = work_dir / "raw_pdfs" / "Manual_Gearbox_Parts.pdf"
+        make_manual(pdf_path, SYNTHETIC_PAGES)
+        print(f"\nGenerated synthetic manual: {SYNTHETIC_PAGES} pages x {FIGURES_PER_PAGE} figures")
+
+    import fitz
+    from app.core.config import settings
+    from app.rag.image_extractor import FigureExtraction
+
+    with fitz.open(str(pdf_path)) as doc:
+        pages = len(doc)
+
+    cores = os.cpu_count() or 1
+    print(f"PDF: {pdf_path.name} ({pages} pages)")
+    print(f"CPU cores: {cores}, pages per task: {settings.INGESTION_FIGURE_PAGES_PER_TASK}")
+
+    # 1, 2, 4, ... workers up to the core count (at least 2, so the
+    # manifest merge is always checked)
+    max_workers = max(cores, 2)
+    worker_counts = [1]
+    while worker_counts[-1] * 2 <= max_workers:
+        worker_counts.append(worker_counts[-1] * 2)
+    if worker_counts[-1] != max_workers:
+        worker_counts.append(max_workers)
+
+    results = []
+    baseline_manifest = None
+    for workers in worker_counts:
+        print(f"\n[{workers} worker(s)] Extracting figures...")
+        pool = None
+        if workers > 1:
+            pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=get_context("spawn"),
+                initializer=import_module,
+                initargs=("app.rag.image_extractor",),
+            )
+            # Start the workers before timing (process spawn + app imports)
+            list(pool.map(abs, range(workers * 4)))
+        try:
+            start = time.perf_counter()
+            extraction = FigureExtraction(pdf_path, pool)
+            extraction.submit_page_ranges()
+            manifest = extraction.result()
+            elapsed = time.perf_counter() - start
+        finally:
+            if pool is not None:
+                pool.shutdown()
+
+        if baseline_manifest is None:
+            baseline_manifest = manifest
+        results.append((workers, sum(len(images) for images in manifest.values()),
+                        elapsed, manifest == baseline_manifest))
+
+    print("\n" + "=" * 60)
+    print("  RESULTS")
+    print("=" * 60)
+    print(f"  {'Workers':>7} {'Figures':>8} {'Time s':>7} {'Pages/s':>8} {'Speedup':>8} {'Same':>5}")
+    for workers, figures, elapsed, same in results:
+        speedup = results[0][2] / elapsed
+        print(f"  {workers:>7} {figures:>8} {elapsed:>7.2f} {pages / elapsed:>8.1f} "
+              f"{speedup:>7.2f}x {'yes' if same else 'NO':>5}")
+
+    if all(same for *_, same in results):
+        print("\n  [OK] Every pool size produced the same manifest")
+    else:
+        print("\n  [ERROR] Manifests differ between pool sizes")
+    if cores == 1:
+        print("  Only one CPU core available: pool sizes above 1 cannot scale here")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,295 @@
+"""
+Figure Region Detection Microbenchmark
+Compares the sweep-line rectangle clustering and the indexed
+caption / content lookups in image_extractor against the original
+pairwise implementation (kept below, verbatim, as the reference).
+
+1. _merge_rectangles on clustered and scattered rectangle sets
+2. find_figure_regions on synthetic dense pages (exploded parts diagrams
+   with hundreds of image tiles and labels)
+
+Every case checks that both implementations return identical regions.
+
+Usage:
+    python benchmark_figure_regions.py [pages]
+"""
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+# Add backend to path for imports
+backend_path = Path(__file__).parent.parent / "backend"
+sys.path.insert(0, str(backend_path))
+
+# Change to backend directory for correct .env loading
+os.chdir(backend_path)
+
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv(backend_path / ".env")
+
+import fitz  # PyMuPDF
+
+from app.rag import image_extractor as ie
+
+
+# =============================================================================
+# Reference implementation (pairwise expand-and-intersect until stable)
+# =============================================================================
+
+def legacy_merge_rectangles(rects, merge_distance):
+    if not rects:
+        return []
+
+    merged = [fitz.Rect(r) for r in rects]
+    changed = True
+
+    while changed:
+        changed = False
+        new_merged = []
+        used = [False] * len(merged)
+
+        for i in range(len(merged)):
+            if used[i]:
+                continue
+
+            current = fitz.Rect(merged[i])
+
+            for j in range(i + 1, len(merged)):
+                if used[j]:
+                    continue
+
+                expanded = fitz.Rect(
+                    current.x0 - merge_distance,
+                    current.y0 - merge_distance,
+                    current.x1 + merge_distance,
+                    current.y1 + merge_distance
+                )
+
+                if expanded.intersects(merged[j]):
+                    current = current | merged[j]
+                    used[j] = True
+                    changed = True
+
+            new_merged.append(current)
+            used[i] = True
+
+        merged = new_merged
+
+    return merged
+
+
+def legacy_find_caption_below(fig_rect, text_blocks, search_distance):
+    best_caption = None
+    best_distance = search_distance + 1
+
+    for block in text_blocks:
+        if block[6] != 0:
+            continue
+
+        bx0, by0, bx1, by1, text = block[0], block[1], block[2], block[3], block[4]
+
+        distance_below = by0 - fig_rect.y1
+        if distance_below < -10 or distance_below > search_distance:
+            continue
+
+        for pattern in ie.FIGURE_CAPTION_PATTERNS:
+            if pattern.search(text):
+                if distance_below < best_distance:
+                    best_distance = distance_below
+                    best_caption = fitz.Rect(bx0, by0, bx1, by1)
+                break
+
+    return best_caption
+
+
+def legacy_expand_region_with_content(fig_rect, text_blocks, image_rects):
+    y_top = fig_rect.y0
+    y_bottom = fig_rect.y1
+    result = fitz.Rect(fig_rect)
+
+    for block in text_blocks:
+        if block[6] != 0:
+            continue
+
+        bx0, by0, bx1, by1, text = block[0], block[1], block[2], block[3], block[4]
+        block_rect = fitz.Rect(bx0, by0, bx1, by1)
+
+        if by1 < y_top - 5 or by0 > y_bottom + 5:
+            continue
+        if by0 < 60 or by0 > 780:
+            continue
+        if by0 > y_bottom and len(text.strip()) > 100:
+            continue
+
+        result = result | block_rect
+
+    for img_rect in image_rects:
+        if img_rect.y1 < y_top - 5 or img_rect.y0 > y_bottom + 5:
+            continue
+        result = result | img_rect
+
+    return result
+
+
+def legacy_find_figure_regions(page, text_blocks):
+    image_rects = []
+    for img in page.get_image_info(xrefs=True):
+        bbox = img.get("bbox")
+        if not bbox:
+            continue
+        rect = fitz.Rect(bbox)
+        if rect.width < ie.MIN_IMAGE_WIDTH_PT or rect.height < ie.MIN_IMAGE_HEIGHT_PT:
+            continue
+        image_rects.append(rect)
+
+    if not image_rects:
+        return []
+
+    figure_regions = legacy_merge_rectangles(image_rects, ie.MERGE_DISTANCE_PT)
+
+    expanded_regions = []
+    for fig_rect in figure_regions:
+        caption_rect = legacy_find_caption_below(fig_rect, text_blocks, ie.CAPTION_SEARCH_DISTANCE_PT)
+        if caption_rect:
+            fig_rect = fig_rect | caption_rect
+        fig_rect = legacy_expand_region_with_content(fig_rect, text_blocks, image_rects)
+        expanded_regions.append(fig_rect)
+
+    final_regions = legacy_merge_rectangles(expanded_regions, 0)
+
+    regions = []
+    for fig_rect in final_regions:
+        padded = fitz.Rect(
+            fig_rect.x0 - ie.FIGURE_PADDING_PT,
+            fig_rect.y0 - ie.FIGURE_PADDING_PT,
+            fig_rect.x1 + ie.FIGURE_PADDING_PT,
+            fig_rect.y1 + ie.FIGURE_PADDING_PT
+        )
+        padded = padded & page.rect
+        if padded.is_empty:
+            continue
+        regions.append(padded)
+    return regions
+
+
+# =============================================================================
+# Synthetic data
+# =============================================================================
+
+def random_rects(count, rng, layout, width=2000.0, height=2000.0):
+    """
+    Random rectangles shaped like image tiles:
+    - clustered: tiles of a few composite figures (most tiles merge)
+    - scattered: a jittered grid of separate parts pictures (few tiles merge,
+      many groups remain, the worst case for the pairwise loop)
+    """
+    rects = []
+    if layout == "clustered":
+        centers = [(rng.uniform(0, width), rng.uniform(0, height)) for _ in range(max(1, count // 25))]
+        for _ in range(count):
+            cx, cy = rng.choice(centers)
+            x0 = cx + rng.gauss(0, 120)
+            y0 = cy + rng.gauss(0, 120)
+            rects.append(fitz.Rect(x0, y0, x0 + rng.uniform(50, 90), y0 + rng.uniform(50, 90)))
+    else:
+        columns = int(count ** 0.5) + 1
+        for i in range(count):
+            x0 = (i % columns) * 170 + rng.uniform(0, 60)
+            y0 = (i // columns) * 170 + rng.uniform(0, 60)
+            rects.append(fitz.Rect(x0, y0, x0 + rng.uniform(50, 70), y0 + rng.uniform(50, 70)))
+        rng.shuffle(rects)
+    return rects
+
+
+def make_dense_pages(path: Path, pages: int, rng) -> None:
+    """Exploded parts diagrams: hundreds of tiles per page, callout labels, captions."""
+    doc = fitz.open()
+    tile = fitz.Pixmap(fitz.csRGB, fitz.IRect(0, 0, 8, 8), 0)
+    tile.clear_with(90)
+    for page_number in range(1, pages + 1):
+        page = doc.new_page()
+        page.insert_text((50, 40), f"Parts catalogue - page {page_number}", fontsize=9)
+        for fig in range(3):
+            top = 70 + fig * 250
+            left = rng.uniform(40, 120)
+            for _ in range(rng.randint(80, 140)):
+                x0 = left + rng.uniform(0, 330)
+                y0 = top + rng.uniform(0, 140)
+                page.insert_image(fitz.Rect(x0, y0, x0 + rng.uniform(50, 70), y0 + rng.uniform(50, 70)),
+                                  pixmap=tile)
+            for label in range(12):
+                page.insert_text((470, top + 10 + label * 15), f"{label + 1}. Washer M{label + 4}", fontsize=7)
+            page.insert_text((100, top + 225), f"Fig.{page_number}-{fig + 1} Exploded view", fontsize=9)
+    doc.save(str(path))
+    doc.close()
+
+
+def main():
+    """Run the region detection microbenchmark."""
+    pages = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    rng = random.Random(42)
+
+    print("=" * 60)
+    print("  MAINTENANCE AI COPILOT - Figure Region Microbenchmark")
+    print("=" * 60)
+
+    all_equal = True
+
+    print("\n[1] _merge_rectangles on random rectangles")
+    print(f"  {'Layout':<10} {'Rects':>6} {'Dist':>5} {'Groups':>7} {'Legacy ms':>10} {'New ms':>8} "
+          f"{'Speedup':>8} {'Same':>5}")
+    for layout, count in [(layout, count) for layout in ("clustered", "scattered")
+                          for count in (50, 100, 200, 400, 800)]:
+        rects = random_rects(count, rng, layout)
+        for distance in (ie.MERGE_DISTANCE_PT, 0):
+            start = time.perf_counter()
+            expected = legacy_merge_rectangles(rects, distance)
+            legacy_ms = (time.perf_counter() - start) * 1000
+            start = time.perf_counter()
+            actual = ie._merge_rectangles(rects, distance)
+            new_ms = (time.perf_counter() - start) * 1000
+            same = [tuple(r) for r in expected] == [tuple(r) for r in actual]
+            all_equal = all_equal and same
+            print(f"  {layout:<10} {count:>6} {distance:>5} {len(actual):>7} {legacy_ms:>10.1f} {new_ms:>8.1f} "
+                  f"{legacy_ms / max(new_ms, 1e-6):>7.1f}x {'yes' if same else 'NO':>5}")
+
+    print(f"\n[2] find_figure_regions on {pages} synthetic dense pages")
+    pdf_path = Path(os.environ.get("TMPDIR", "/tmp")) / "dense_parts_catalogue.pdf"
+    make_dense_pages(pdf_path, pages, rng)
+    legacy_seconds = new_seconds = 0.0
+    regions_found = 0
+    tiles = 0
+    with fitz.open(str(pdf_path)) as doc:
+        for page in doc:
+            text_blocks = page.get_text("blocks")
+            tiles += len(page.get_image_info())
+            start = time.perf_counter()
+            expected = legacy_find_figure_regions(page, text_blocks)
+            legacy_seconds += time.perf_counter() - start
+            start = time.perf_counter()
+            actual = ie.find_figure_regions(page, text_blocks)
+            new_seconds += time.perf_counter() - start
+            same = [tuple(r) for r in expected] == [tuple(r) for r in actual]
+            all_equal = all_equal and same
+            regions_found += len(actual)
+    pdf_path.unlink()
+
+    print(f"  Tiles per page: {tiles / pages:.0f}, regions found: {regions_found}")
+    print(f"  Legacy: {legacy_seconds * 1000 / pages:8.1f} ms/page")
+    print(f"  New:    {new_seconds * 1000 / pages:8.1f} ms/page  "
+          f"({legacy_seconds / max(new_seconds, 1e-9):.1f}x faster)")
+
+    print("\n" + "=" * 60)
+    if all_equal:
+        print("  [OK] New implementation returns the same regions in every case")
+    else:
+        print("  [ERROR] Regions differ from the reference implementation")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+"""
+Hybrid Retrieval Benchmark
+Compares vector-only search with hybrid search (vector + BM25 lexical
+index, fused by reciprocal rank) on exact-token queries: alarm codes and
+part numbers, where every query has exactly one relevant chunk.
+
+Runs offline on a synthetic alarm-code manual in a throwaway ChromaDB.
+Embeddings are hashed character trigrams, a stand-in for a dense model
+with the same weakness on codes: near-identical codes ("SRVO-023" vs
+"SRVO-032") and shared boilerplate produce near-identical vectors.
+
+Reports recall@k and mean latency per query for both modes (no reranker).
+
+Usage:
+    python benchmark_hybrid_retrieval.py [chunks]
+"""
+import hashlib
+import math
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add backend to path for imports
+backend_path = Path(__file__).parent.parent / "backend"
+sys.path.insert(0, str(backend_path))
+
+# Change to backend directory for correct .env loading
+os.chdir(backend_path)
+
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv(backend_path / ".env")
+
+from langchain_core.embeddings import Embeddings
+
+EMBEDDING_DIMENSIONS = 512
+CODES_PER_CHUNK = 4
+QUERIES = 200
+RECALL_AT = (1, 4, 12)
+
+PREFIXES = ["SRVO", "MOTN", "SYST", "INTP", "PRIO", "HOST"]
+CAUSES = [
+    "The servo amplifier detected an overcurrent on the axis motor.",
+    "The position deviation exceeded the allowed limit during motion.",
+    "The encoder pulse coder lost communication with the controller.",
+    "The backup battery voltage of the pulse coder is low.",
+    "The brake release signal was not confirmed within the timeout.",
+    "The teach pendant emergency stop circuit is open.",
+]
+REMEDIES = [
+    "Check the motor power cable and connectors, then replace the amplifier if the alarm persists.",
+    "Reduce the payload or speed override and verify the payload settings.",
+    "Replace the pulse coder cable and perform a mastering of the axis.",
+    "Replace the backup batteries with the controller power on to keep the position data.",
+    "Inspect the brake wiring and measure the brake coil resistance.",
+    "Reset the emergency stop button and check the safety fence interlock.",
+]
+QUERY_TEMPLATES = [
+    "What does alarm {code} mean?",
+    "{code} remedy",
+    "how do I fix error {code} on the controller",
+    "part {part} replacement",
+]
+
+
+class TrigramEmbeddings(Embeddings):
+    """Hashed character trigram embeddings (L2-normalized, offline)."""
+
+    def _embed(self, text: str):
+        vector = [0.0] * EMBEDDING_DIMENSIONS
+        text = f"  {text.casefold()}  "
+        for i in range(len(text) - 2):
+            digest = hashlib.md5(text[i:i + 3].encode("utf-8")).digest()
+            vector[int.from_bytes(digest[:4], "little") % EMBEDDING_DIMENSIONS] += 1.0
+        norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+        return [v / norm for v in vector]
+
+    def embed_documents(self, texts):
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text):
+        return self._embed(text)
+
+
+def make_corpus(chunks: int, rng):
+    """Alarm-code table chunks; returns (documents, ids, [(code, part, chunk id)])."""
+    from langchain_core.documents import Document
+
+    codes = [f"{prefix}-{number:03d}" for prefix in PREFIXES for number in range(1, 1000)]
+    rng.shuffle(codes)
+    documents, ids, entries = [], [], []
+    for index in range(chunks):
+        chunk_id = f"alarm-table-{index:05d}"
+        lines = [f"Alarm code table, section {index // 20 + 1}"]
+        for code in codes[index * CODES_PER_CHUNK:(index + 1) * CODES_PER_CHUNK]:
+            part = f"A05B-{rng.randint(1000, 9999)}-{rng.choice('CHJK')}{rng.randint(100, 999)}"
+            lines.append(f"{code} Cause: {rng.choice(CAUSES)} Remedy: {rng.choice(REMEDIES)} "
+                         f"Spare part {part}.")
+            entries.append((code, part, chunk_id))
+        documents.append(Document(page_content="\n".join(lines),
+                                  metadata={"source": "Alarm_Codes_Manual.pdf", "page": index // 3 + 1}))
+        ids.append(chunk_id)
+    return documents, ids, entries
+
+
+def evaluate(mode: str, queries):
+    """Recall@k and mean latency (ms) of one retrieval mode."""
+    from app.rag.vector_store import get_retriever
+
+    hits = {k: 0 for k in RECALL_AT}
+    elapsed = 0.0
+    retriever = get_retriever(k=max(RECALL_AT), use_reranker=False, mode=mode)
+    for query, expected in queries:
+        start = time.perf_counter()
+        documents = retriever.invoke(query)
+        elapsed += time.perf_counter() - start
+        ranked = [doc.id for doc in documents]
+        for k in RECALL_AT:
+            hits[k] += expected in ranked[:k]
+    return {k: hits[k] / len(queries) for k in RECALL_AT}, elapsed * 1000 / len(queries)
+
+
+def main():
+    """Run the hybrid retrieval benchmark."""
+    chunks = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    rng = random.Random(7)
+
+    print("=" * 60)
+    print("  MAINTENANCE AI COPILOT - Hybrid Retrieval Benchmark")
+    print("=" * 60)
+
+    # Throwaway data directories and offline settings (must be set before
+    # the app settings are imported)
+    work_dir = Path(tempfile.mkdtemp(prefix="hybrid_retrieval_"))
+    os.environ["CHROMA_PERSIST_DIRECTORY"] = str(work_dir / "chroma_db")
+    os.environ["EMBEDDING_CACHE_DIRECTORY"] = str(work_dir / "embedding_cache")
+    os.environ["EMBEDDING_TOKENS_PER_MINUTE"] = "100000000"
+    os.environ["EMBEDDING_REQUESTS_PER_MINUTE"] = "1000000"
+    # Reference expansion is not measured here
+    os.environ["RETRIEVAL_EXPAND_REFERENCES"] = "false"
+
+    import app.rag.embeddings as embeddings_module
+
+    embeddings_module.get_azure_embeddings = TrigramEmbeddings
+
+    from app.rag.lexical_index import get_lexical_index
+    from app.rag.vector_store import get_vector_store
+
+    print(f"\nWork directory: {work_dir}")
+    documents, ids, entries = make_corpus(chunks, rng)
+    vector_store = get_vector_store()
+    for start in range(0, len(documents), 500):
+        vector_store.add_documents(documents[start:start + 500], ids=ids[start:start + 500])
+
+    # First use builds the index from the chunks stored in Chroma
+    start = time.perf_counter()
+    lexical_index = get_lexical_index(vector_store._collection)
+    build_seconds = time.perf_counter() - start
+    # Database plus its write-ahead log
+    index_path = lexical_index.path
+    index_kb = sum(p.stat().st_size for p in index_path.parent.glob(index_path.name + "*")) / 1024
+    print(f"Corpus: {len(documents)} chunks, {len(entries)} alarm codes")
+    print(f"Lexical index: built in {build_seconds:.2f}s, {index_kb:.0f} KB on disk")
+
+    queries = []
+    for _ in range(QUERIES):
+        template = rng.choice(QUERY_TEMPLATES)
+        code, part, chunk_id = rng.choice(entries)
+        queries.append((template.format(code=code, part=part), chunk_id))
+
+    # Warm-up (clients, Chroma caches)
+    evaluate("vector", queries[:5])
+    evaluate("hybrid", queries[:5])
+
+    results = {mode: evaluate(mode, queries) for mode in ("vector", "hybrid")}
+
+    print("\n" + "=" * 60)
+    print("  RESULTS")
+    print("=" * 60)
+    header = " ".join(f"{'R@' + str(k):>7}" for k in RECALL_AT)
+    print(f"  {'Mode':<8} {header} {'ms/query':>9}")
+    for mode, (recall, latency) in results.items():
+        row = " ".join(f"{recall[k]:>7.2f}" for k in RECALL_AT)
+        print(f"  {mode:<8} {row} {latency:>9.2f}")
+
+    vector_recall, hybrid_recall = results["vector"][0], results["hybrid"][0]
+    print()
+    for k in RECALL_AT[1:]:
+        print(f"  Recall@{k}: {vector_recall[k]:.2f} -> {hybrid_recall[k]:.2f}")
+    print(f"  (with the reranker, k=4 searches rerank {RECALL_AT[-1]} fused candidates)")
+    print(f"\n  Added latency: {results['hybrid'][1] - results['vector'][1]:.2f} ms/query")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Ingestion Memory Benchmark
+Shows that peak memory of the ingestion pipeline is bounded by batch size,
+not by corpus size.
+
+Generates synthetic text-dense manuals, ingests corpora of increasing size
+into a throwaway ChromaDB (PyPDF parser, deterministic fake embeddings - no
+Azure calls) and reports the tracemalloc peak of the ingesting process for
+each run. Peak memory should stay roughly flat while the corpus grows.
+
+Usage:
+    python benchmark_ingestion_memory.py [pages_per_manual] [max_manuals]
+"""
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+# Add backend to path for imports
+backend_path = Path(__file__).parent.parent / "backend"
+sys.path.insert(0, str(backend_path))
+sys.path.insert(0, str(Path(__file__).parent))
+
+# Change to backend directory for correct .env loading
+os.chdir(backend_path)
+
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv(backend_path / ".env")
+
+from synthetic_manuals import make_manual
+
+EMBEDDING_DIMENSIONS = 3072  # text-embedding-3-large
+
+
+def main():
+    """Run the memory benchmark."""
+    pages_per_manual = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    max_manuals = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+
+    print("=" * 60)
+    print("  MAINTENANCE AI COPILOT - Ingestion Memory Benchmark")
+    print("=" * 60)
+
+    # Throwaway data directories and offline settings (must be set before
+    # the app settings are imported)
+    work_dir = Path(tempfile.mkdtemp(prefix="ingestion_memory_"))
+    os.environ["CHROMA_PERSIST_DIRECTORY"] = str(work_dir / "chroma_db")
+    os.environ["RAW_PDFS_DIRECTORY"] = str(work_dir / "raw_pdfs")
+    os.environ["EMBEDDING_CACHE_DIRECTORY"] = str(work_dir / "embedding_cache")
+    os.environ["USE_AZURE_DOC_INTELLIGENCE"] = "false"
+    os.environ["INGESTION_FIGURE_WORKERS"] = "1"
+    # Every run must embed its chunks, not replay the previous run's cache
+    os.environ["EMBEDDING_CACHE_ENABLED"] = "false"
+
+    from langchain_core.embeddings import DeterministicFakeEmbedding
+    import app.rag.embeddings as embeddings_module
+
+    embeddings_module.get_azure_embeddings = lambda: DeterministicFakeEmbedding(size=EMBEDDING_DIMENSIONS)
+
+    from app.rag.ingestion import ingest_pdfs
+
+    print(f"\nWork directory: {work_dir}")
+    print(f"Pages per manual: {pages_per_manual}")
+
+    # Corpus sizes: 1, 2, 4, ... manuals
+    sizes = []
+    size = 1
+    while size <= max_manuals:
+        sizes.append(size)
+        size *= 2
+
+    # Warm-up run so one-time allocations (clients, collection) are not counted
+    warmup_dir = work_dir / "warmup"
+    warmup_dir.mkdir()
+    make_manual(warmup_dir / "Warmup_Manual.pdf", 5)
+    ingest_pdfs(pdf_directory=str(warmup_dir), clear_existing=True)
+
+    results = []
+    for manuals in sizes:
+        corpus_dir = work_dir / f"corpus_{manuals}"
+        corpus_dir.mkdir()
+        for i in range(manuals):
+            make_manual(corpus_dir / f"Manual_Machine_{i:02d}.pdf", pages_per_manual)
+        corpus_mb = sum(f.stat().st_size for f in corpus_dir.glob("*.pdf")) / 1e6
+
+        print(f"\n[{manuals} manual(s), {manuals * pages_per_manual} pages] Ingesting...")
+        tracemalloc.start()
+        start = time.perf_counter()
+        result = ingest_pdfs(pdf_directory=str(corpus_dir), clear_existing=True)
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        if not result["success"]:
+            print(f"[ERROR] Ingestion failed: {result.get('error')}")
+            return
+
+        results.append({
+            "manuals": manuals,
+            "pages": result["pages_loaded"],
+            "chunks": result["chunks_created"],
+            "corpus_mb": corpus_mb,
+            "peak_mb": peak / 1e6,
+            "seconds": elapsed,
+        })
+
+    print("\n" + "=" * 60)
+    print("  RESULTS (tracemalloc peak of the ingesting process)")
+    print("=" * 60)
+    print(f"  {'Manuals':>7} {'Pages':>7} {'Chunks':>7} {'PDF MB':>8} {'Peak MB':>8} {'Time s':>7}")
+    for r in results:
+        print(f"  {r['manuals']:>7} {r['pages']:>7} {r['chunks']:>7} "
+              f"{r['corpus_mb']:>8.1f} {r['peak_mb']:>8.1f} {r['seconds']:>7.1f}")
+
+    if len(results) > 1:
+        growth = results[-1]["peak_mb"] / results[0]["peak_mb"]
+        corpus_growth = results[-1]["pages"] / results[0]["pages"]
+        print(f"\n  Corpus grew {corpus_growth:.0f}x, peak memory grew {growth:.2f}x")
+        if growth < 1.5:
+            print("  [OK] Peak memory is flat across corpus sizes")
+        else:
+            print("  [WARN] Peak memory grows with corpus size")
+
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""
+Lazy Figure Rendering Benchmark
+Compares figure extraction at ingestion time with FIGURE_RENDER_MODE=eager
+(every figure rendered to PNG) and FIGURE_RENDER_MODE=lazy (regions and
+captions recorded only), then measures the on-demand render of the image
+route: first request (render + cache) and repeated requests (cached file).
+
+Runs on the given PDFs, or on synthetic manuals with figures when none are
+given. Images go to a throwaway directory; no Azure calls.
+
+Usage:
+    python benchmark_lazy_figures.py [pdf ...]
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add backend to path for imports
+backend_path = Path(__file__).parent.parent / "backend"
+sys.path.insert(0, str(backend_path))
+sys.path.insert(0, str(Path(__file__).parent))
+
+# Change to backend directory for correct .env loading
+os.chdir(backend_path)
+
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv(backend_path / ".env")
+
+SYNTHETIC_MANUALS = 3
+SYNTHETIC_PAGES = 60
+
+
+def images_size(pdf_paths) -> tuple:
+    """(PNG files, bytes on disk) in the images directories of the PDFs."""
+    from app.rag.image_extractor import get_images_dir
+
+    files = size = 0
+    for pdf_path in pdf_paths:
+        for image_path in get_images_dir(pdf_path.name).glob("*.png"):
+            files += 1
+            size += image_path.stat().st_size
+    return files, size
+
+
+def run_extraction(pdf_paths, mode: str):
+    """Extract the figures of every PDF in the given render mode."""
+    from app.core.config import settings
+    from app.rag.image_extractor import extract_images_from_pdf
+
+    settings.FIGURE_RENDER_MODE = mode
+    figures = 0
+    for pdf_path in pdf_paths:
+        manifest = extract_images_from_pdf(pdf_path)
+        figures += sum(len(images) for images in manifest.values())
+    return figures
+
+
+def main():
+    """Run the lazy rendering benchmark."""
+    print("=" * 60)
+    print("  MAINTENANCE AI COPILOT - Lazy Figure Rendering Benchmark")
+    print("=" * 60)
+
+    # Images go to a throwaway directory (IMAGES_BASE_DIR is derived
+    # from RAW_PDFS_DIRECTORY, so set it before importing the app)
+    work_dir = Path(tempfile.mkdtemp(prefix="lazy_figures_"))
+    corpus_dir = work_dir / "raw_pdfs"
+    corpus_dir.mkdir()
+    os.environ["RAW_PDFS_DIRECTORY"] = str(corpus_dir)
+    os.environ["INGESTION_FIGURE_WORKERS"] = "1"
+
+    if len(sys.argv) > 1:
+        # The image route renders from RAW_PDFS_DIRECTORY, so copy them there
+        pdf_paths = []
+        for arg in sys.argv[1:]:
+            pdf_path = corpus_dir / Path(arg).name
+            shutil.copy(arg, pdf_path)
+            pdf_paths.append(pdf_path)
+    else:
+        from benchmark_pdf_parsers import make_manual
+
+        pdf_paths = []
+        for i in range(SYNTHETIC_MANUALS):
+            pdf_path = corpus_dir / f"Manual_Machine_{i:02d}.pdf"
+            make_manual(pdf_path, SYNTHETIC_PAGES)
+            pdf_paths.append(pdf_path)
+        print(f"\nGenerated {SYNTHETIC_MANUALS} synthetic manuals x {SYNTHETIC_PAGES} pages")
+
+    print(f"Work directory: {work_dir}")
+
+    from app.rag.image_extractor import get_figure_image, load_manifest
+
+    # Warm-up (imports, font caches)
+    run_extraction(pdf_paths[:1], "lazy")
+
+    results = {}
+    for mode in ("eager", "lazy"):
+        print(f"\n[{mode}] Extracting figures...")
+        start = time.perf_counter()
+        figures = run_extraction(pdf_paths, mode)
+        elapsed = time.perf_counter() - start
+        results[mode] = (figures, elapsed, *images_size(pdf_paths))
+
+    # Image route after a lazy ingest: first request renders, then cached
+    requests = [
+        (Path(pdf_path).stem, image_file)
+        for pdf_path in pdf_paths
+        for images in load_manifest(pdf_path.name).values()
+        for image_file in images
+    ]
+    start = time.perf_counter()
+    missing = sum(get_figure_image(*request) is None for request in requests)
+    first_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    for request in requests:
+        get_figure_image(*request)
+    cached_seconds = time.perf_counter() - start
+
+    print("\n" + "=" * 60)
+    print("  RESULTS")
+    print("=" * 60)
+    print(f"  {'Mode':<8} {'Figures':>8} {'Time s':>8} {'PNGs':>6} {'Disk KB':>9}")
+    for mode, (figures, elapsed, files, size) in results.items():
+        print(f"  {mode:<8} {figures:>8} {elapsed:>8.2f} {files:>6} {size / 1024:>9.1f}")
+
+    eager_seconds, lazy_seconds = results["eager"][1], results["lazy"][1]
+    print(f"\n  Lazy ingest is {eager_seconds / max(lazy_seconds, 1e-9):.1f}x faster")
+    if requests:
+        print(f"  First request (render + cache): {first_seconds * 1000 / len(requests):.1f} ms/figure")
+        print(f"  Cached request:                 {cached_seconds * 1000 / len(requests):.3f} ms/figure")
+    if missing:
+        print(f"  [ERROR] {missing} figures could not be rendered on demand")
+    else:
+        print("  [OK] Every recorded figure rendered on demand")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
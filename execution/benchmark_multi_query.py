@@ -0,0 +1,180 @@
+"""
+Multi-Query Retrieval Benchmark
+Compares the query expansion retrieval stage done query by query (one
+embedding request, one Chroma query and one rerank per query, as before)
+with the batched multi-query search (one embedding request, one Chroma
+query and one rerank over the fused union).
+
+Runs offline on the synthetic alarm-code manual of
+benchmark_hybrid_retrieval.py in a throwaway ChromaDB. Azure round trips
+are simulated with a fixed latency per embedding and rerank request.
+
+Usage:
+    python benchmark_multi_query.py [queries_per_question] [latency_ms]
+"""
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add backend to path for imports
+backend_path = Path(__file__).parent.parent / "backend"
+sys.path.insert(0, str(backend_path))
+sys.path.insert(0, str(Path(__file__).parent))
+
+# Change to backend directory for correct .env loading
+os.chdir(backend_path)
+
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv(backend_path / ".env")
+
+from benchmark_hybrid_retrieval import QUERY_TEMPLATES, TrigramEmbeddings, make_corpus
+
+CHUNKS = 2000
+QUESTIONS = 30
+K = 4
+
+# Request counters of the simulated Azure services
+requests = {"embedding": 0, "rerank": 0}
+
+
+class SlowEmbeddings(TrigramEmbeddings):
+    """Trigram embeddings with a fixed round-trip latency per request."""
+
+    latency = 0.0
+
+    async def aembed_documents(self, texts):
+        requests["embedding"] += 1
+        await asyncio.sleep(self.latency)
+        return self.embed_documents(texts)
+
+    async def aembed_query(self, text):
+        requests["embedding"] += 1
+        await asyncio.sleep(self.latency)
+        return self.embed_query(text)
+
+
+def install_reranker(latency: float):
+    """Replace the Azure reranker with a fixed-latency stand-in (keeps the order)."""
+    import app.rag.reranker as reranker
+
+    async def arerank_documents(query, documents, top_n=4):
+        requests["rerank"] += 1
+        await asyncio.sleep(latency)
+        return documents[:top_n]
+
+    reranker.is_reranker_available = lambda: True
+    reranker.arerank_documents = arerank_documents
+
+
+async def per_query(retriever, queries):
+    """Expansion retrieval as before: one retriever call per query."""
+    docs, seen = [], set()
+    for query in queries:
+        for doc in await retriever.ainvoke(query):
+            if doc.id not in seen:
+                seen.add(doc.id)
+                docs.append(doc)
+    return docs[:K * 2]
+
+
+async def batched(retriever, queries):
+    """Expansion retrieval with one batched multi-query search."""
+    return await retriever.amulti_query_search(queries, top_n=K * 2)
+
+
+async def evaluate(retrieve, retriever, questions):
+    """Mean latency (ms) and requests per question of one strategy."""
+    for name in requests:
+        requests[name] = 0
+    start = time.perf_counter()
+    hits = 0
+    for queries, expected in questions:
+        docs = await retrieve(retriever, queries)
+        hits += expected in [doc.id for doc in docs]
+    elapsed = time.perf_counter() - start
+    return (
+        elapsed * 1000 / len(questions),
+        requests["embedding"] / len(questions),
+        requests["rerank"] / len(questions),
+        hits / len(questions),
+    )
+
+
+def main():
+    """Run the multi-query retrieval benchmark."""
+    queries_per_question = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    latency_ms = float(sys.argv[2]) if len(sys.argv) > 2 else 60.0
+    rng = random.Random(11)
+
+    print("=" * 60)
+    print("  MAINTENANCE AI COPILOT - Multi-Query Retrieval Benchmark")
+    print("=" * 60)
+
+    # Throwaway data directories and offline settings (must be set before
+    # the app settings are imported); no cache, so every search embeds
+    work_dir = Path(tempfile.mkdtemp(prefix="multi_query_"))
+    os.environ["CHROMA_PERSIST_DIRECTORY"] = str(work_dir / "chroma_db")
+    os.environ["EMBEDDING_CACHE_ENABLED"] = "false"
+    os.environ["EMBEDDING_TOKENS_PER_MINUTE"] = "100000000"
+    os.environ["EMBEDDING_REQUESTS_PER_MINUTE"] = "1000000"
+    os.environ["RETRIEVAL_EXPAND_REFERENCES"] = "false"
+
+    import app.rag.embeddings as embeddings_module
+
+    SlowEmbeddings.latency = latency_ms / 1000
+    embeddings_module.get_azure_embeddings = SlowEmbeddings
+    install_reranker(latency_ms / 1000)
+
+    from app.rag.vector_store import get_retriever, get_vector_store
+
+    print(f"\nWork directory: {work_dir}")
+    print(f"Simulated latency: {latency_ms:.0f} ms per embedding / rerank request")
+    documents, ids, entries = make_corpus(CHUNKS, rng)
+    vector_store = get_vector_store()
+    for start in range(0, len(documents), 500):
+        vector_store.add_documents(documents[start:start + 500], ids=ids[start:start + 500])
+
+    # Question + expansions, all about the same alarm code or part
+    questions = []
+    for _ in range(QUESTIONS):
+        code, part, chunk_id = rng.choice(entries)
+        templates = rng.sample(QUERY_TEMPLATES, min(queries_per_question, len(QUERY_TEMPLATES)))
+        while len(templates) < queries_per_question:
+            templates.append(rng.choice(QUERY_TEMPLATES) + f" ({len(templates)})")
+        questions.append(([t.format(code=code, part=part) for t in templates], chunk_id))
+    print(f"Corpus: {len(documents)} chunks; {QUESTIONS} questions x {queries_per_question} queries")
+
+    retriever = get_retriever(k=K)
+
+    async def run():
+        # Warm-up (clients, Chroma caches, lexical index build)
+        await evaluate(per_query, retriever, questions[:2])
+        await evaluate(batched, retriever, questions[:2])
+        return {
+            "per-query": await evaluate(per_query, retriever, questions),
+            "batched": await evaluate(batched, retriever, questions),
+        }
+
+    results = asyncio.run(run())
+
+    print("\n" + "=" * 60)
+    print("  RESULTS")
+    print("=" * 60)
+    print(f"  {'Strategy':<10} {'ms/question':>12} {'Embed req':>10} {'Rerank req':>11} {'Hit rate':>9}")
+    for name, (latency, embeds, reranks, hit_rate) in results.items():
+        print(f"  {name:<10} {latency:>12.1f} {embeds:>10.1f} {reranks:>11.1f} {hit_rate:>9.2f}")
+
+    per_query_ms, batched_ms = results["per-query"][0], results["batched"][0]
+    print(f"\n  Batched multi-query stage is {per_query_ms / max(batched_ms, 1e-9):.1f}x faster")
+    print(f"  ({batched_ms / max(2 * latency_ms, 1e-9):.2f}x the cost of one embedding + one rerank round trip)")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""
+PDF Fallback Parser Benchmark
+Compares pages per second of the PyPDF path (PyPDFLoader for text, then a
+second PyMuPDF pass in extract_images_from_pdf for figures) against the
+single-pass PyMuPDF loader (text blocks and figure regions in one pass).
+
+Runs on the given PDFs, or on synthetic manuals with text and figures when
+none are given. Rendered figures go to a throwaway directory; no Azure calls.
+
+Usage:
+    python benchmark_pdf_parsers.py [pdf ...]
+"""
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add backend to path for imports
+backend_path = Path(__file__).parent.parent / "backend"
+sys.path.insert(0, str(backend_path))
+
+# Change to backend directory for correct .env loading
+os.chdir(backend_path)
+
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv(backend_path / ".env")
+
+SYNTHETIC_MANUALS = 3
+SYNTHETIC_PAGES = 60
+
+PARAGRAPH = (
+    "Check the lubrication level of the reduction gear every 300 operating hours. "
+    "Replace the grease cartridge if the indicator shows red, then run the axis "
+    "through its full range of motion to distribute the lubricant evenly. "
+)
+
+
+def make_manual(path: Path, pages: int) -> None:
+    """Write a synthetic manual: text on every page, a captioned figure on every other page."""
+    import fitz
+
+    doc = fitz.open()
+    for page_number in range(1, pages + 1):
+        page = doc.new_page()
+        text = f"Section {page_number}\n" + (PARAGRAPH * 6)
+        page.insert_textbox(fitz.Rect(50, 50, 560, 330), text, fontsize=9)
+        if page_number % 2:
+            pixmap = fitz.Pixmap(fitz.csRGB, fitz.IRect(0, 0, 240, 160), 0)
+            pixmap.clear_with(120 + page_number % 100)
+            page.insert_image(fitz.Rect(120, 380, 420, 580), pixmap=pixmap)
+            page.insert_text((140, 610), f"Fig.{page_number}-1 Reduction gear assembly", fontsize=9)
+            page.insert_text((430, 450), "Grease nipple", fontsize=8)
+    doc.save(str(path))
+    doc.close()
+
+
+def run_pypdf(pdf_paths, with_figures: bool):
+    """Current fallback: PyPDFLoader text, then extract_images_from_pdf."""
+    from app.rag.ingestion import _iter_pypdf_pages, extract_metadata_from_filename
+    from app.rag.image_extractor import extract_images_from_pdf
+
+    pages = chars = 0
+    for pdf_path in pdf_paths:
+        for page in _iter_pypdf_pages(pdf_path, extract_metadata_from_filename(pdf_path.name)):
+            pages += 1
+            chars += len(page.page_content)
+        if with_figures:
+            extract_images_from_pdf(pdf_path)
+    return pages, chars
+
+
+def run_pymupdf(pdf_paths, with_figures: bool):
+    """Single-pass PyMuPDF loader."""
+    from app.rag.ingestion import extract_metadata_from_filename
+    from app.rag.image_extractor import FigureExtraction
+    from app.rag.pymupdf_loader import iter_pymupdf_pages
+
+    pages = chars = 0
+    for pdf_path in pdf_paths:
+        # No executor: figures render inline, like the PyPDF figure pass
+        figures = FigureExtraction(pdf_path) if with_figures else None
+        for page in iter_pymupdf_pages(
+            pdf_path, extract_metadata_from_filename(pdf_path.name), figures=figures
+        ):
+            pages += 1
+            chars += len(page.page_content)
+        if figures is not None:
+            figures.result()
+    return pages, chars
+
+
+def main():
+    """Run the parser benchmark."""
+    print("=" * 60)
+    print("  MAINTENANCE AI COPILOT - PDF Fallback Parser Benchmark")
+    print("=" * 60)
+
+    # Rendered figures go to a throwaway directory (IMAGES_BASE_DIR is
+    # derived from RAW_PDFS_DIRECTORY, so set it before importing the app)
+    work_dir = Path(tempfile.mkdtemp(prefix="pdf_parsers_"))
+    os.environ["RAW_PDFS_DIRECTORY"] = str(work_dir / "raw_pdfs")
+    # Compare single-process parsers (figure page ranges run inline)
+    os.environ["INGESTION_FIGURE_WORKERS"] = "1"
+
+    if len(sys.argv) > 1:
+        pdf_paths = [Path(arg).resolve() for arg in sys.argv[1:]]
+    else:
+        corpus_dir = work_dir / "raw_pdfs"
+        corpus_dir.mkdir()
+        pdf_paths = []
+        for i in range(SYNTHETIC_MANUALS):
+            pdf_path = corpus_dir / f"Manual_Machine_{i:02d}.pdf"
+            make_manual(pdf_path, SYNTHETIC_PAGES)
+            pdf_paths.append(pdf_path)
+        print(f"\nGenerated {SYNTHETIC_MANUALS} synthetic manuals x {SYNTHETIC_PAGES} pages")
+
+    print(f"Work directory: {work_dir}")
+
+    # Warm-up (imports, font caches)
+    run_pypdf(pdf_paths[:1], with_figures=False)
+    run_pymupdf(pdf_paths[:1], with_figures=False)
+
+    runs = [
+        ("PyPDF text", run_pypdf, False),
+        ("PyMuPDF text (single pass)", run_pymupdf, False),
+        ("PyPDF text + figure pass", run_pypdf, True),
+        ("PyMuPDF text + figures (single pass)", run_pymupdf, True),
+    ]
+
+    results = []
+    for label, run, with_figures in runs:
+        print(f"\n[{label}] Parsing...")
+        start = time.perf_counter()
+        pages, chars = run(pdf_paths, with_figures)
+        elapsed = time.perf_counter() - start
+        results.append((label, pages, chars, elapsed))
+
+    print("\n" + "=" * 60)
+    print("  RESULTS")
+    print("=" * 60)
+    print(f"  {'Parser':<38} {'Pages':>6} {'Chars':>9} {'Pages/s':>8}")
+    for label, pages, chars, elapsed in results:
+        print(f"  {label:<38} {pages:>6} {chars:>9} {pages / elapsed:>8.1f}")
+
+    text_speedup = results[0][3] / results[1][3]
+    full_speedup = results[2][3] / results[3][3]
+    print(f"\n  Text only: PyMuPDF is {text_speedup:.1f}x faster than PyPDF")
+    print(f"  Text + figures: single pass is {full_speedup:.1f}x faster than PyPDF + figure pass")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""
+Vector Backend Benchmark
+Compares the two similarity search backends of the retriever
+(VECTOR_BACKEND): Chroma's HNSW index and the NumPy exact search over the
+exported, memory-mapped embedding matrix.
+
+1. Export: time to write the matrix from the Chroma collection
+2. Latency: single queries and batches (query expansion) per backend
+3. Recall@k of each backend against the exact top-k
+4. Memory: index size on disk and peak Python/NumPy working memory per
+   search (tracemalloc; Chroma's native HNSW allocations are not counted)
+
+Runs offline on synthetic clustered unit vectors stored directly in a
+throwaway ChromaDB (no embedding calls).
+
+Usage:
+    python benchmark_vector_backends.py [chunks] [dimensions]
+"""
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+# Add backend to path for imports
+backend_path = Path(__file__).parent.parent / "backend"
+sys.path.insert(0, str(backend_path))
+
+# Change to backend directory for correct .env loading
+os.chdir(backend_path)
+
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv(backend_path / ".env")
+
+import numpy as np
+
+QUERIES = 100
+BATCH_SIZE = 4
+K = 12
+CLUSTERS = 200
+INSERT_BATCH = 5000
+
+
+def make_vectors(count: int, dimensions: int, rng) -> np.ndarray:
+    """Unit vectors around random topic centers (embeddings of similar chunks cluster)."""
+    centers = rng.standard_normal((CLUSTERS, dimensions)).astype(np.float32)
+    vectors = centers[rng.integers(0, CLUSTERS, count)]
+    vectors += 0.6 * rng.standard_normal((count, dimensions)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def directory_size(path: Path, pattern: str = "**/*") -> int:
+    return sum(p.stat().st_size for p in path.glob(pattern) if p.is_file())
+
+
+def chroma_search(collection, queries, k):
+    result = collection.query(query_embeddings=queries, n_results=k, include=[])
+    return result["ids"]
+
+
+def numpy_search(index, queries, k):
+    return [[chunk_id for chunk_id, _ in hits] for hits in index.search(queries, k)]
+
+
+def measure(search, target, queries, batch_size: int):
+    """(ms per query, results) running the queries in batches."""
+    results = []
+    start = time.perf_counter()
+    for i in range(0, len(queries), batch_size):
+        results.extend(search(target, queries[i:i + batch_size], K))
+    return (time.perf_counter() - start) * 1000 / len(queries), results
+
+
+def peak_memory_kb(search, target, queries) -> float:
+    """Peak Python/NumPy allocations of one search (tracemalloc)."""
+    tracemalloc.start()
+    search(target, queries, K)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / 1024
+
+
+def main():
+    """Run the vector backend benchmark."""
+    chunks = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    dimensions = int(sys.argv[2]) if len(sys.argv) > 2 else 1536
+    rng = np.random.default_rng(3)
+
+    print("=" * 60)
+    print("  MAINTENANCE AI COPILOT - Vector Backend Benchmark")
+    print("=" * 60)
+
+    # Throwaway Chroma directory (must be set before the app settings are imported)
+    work_dir = Path(tempfile.mkdtemp(prefix="vector_backends_"))
+    os.environ["CHROMA_PERSIST_DIRECTORY"] = str(work_dir / "chroma_db")
+
+    from app.core.config import settings
+    from app.rag.numpy_index import get_numpy_index, get_numpy_index_dir
+    from app.rag.vector_store import get_chroma_client
+
+    print(f"\nWork directory: {work_dir}")
+    print(f"Corpus: {chunks} chunks x {dimensions} dimensions (float32)")
+    vectors = make_vectors(chunks, dimensions, rng)
+    ids = [f"chunk-{i:07d}" for i in range(chunks)]
+    collection = get_chroma_client().get_or_create_collection(settings.CHROMA_COLLECTION_NAME)
+    start = time.perf_counter()
+    for i in range(0, chunks, INSERT_BATCH):
+        collection.add(
+            ids=ids[i:i + INSERT_BATCH],
+            embeddings=vectors[i:i + INSERT_BATCH],
+            documents=[""] * len(ids[i:i + INSERT_BATCH]),
+            metadatas=[{"source": f"Manual_{j // 1000:03d}.pdf"} for j in range(i, min(i + INSERT_BATCH, chunks))],
+        )
+    print(f"Chroma insert (HNSW build): {time.perf_counter() - start:.1f}s")
+
+    start = time.perf_counter()
+    index = get_numpy_index(collection)
+    export_seconds = time.perf_counter() - start
+    print(f"NumPy export: {export_seconds:.1f}s")
+
+    # Queries: noisy copies of stored chunks; exact top-k as ground truth
+    picks = rng.integers(0, chunks, QUERIES)
+    queries = vectors[picks] + 0.3 * rng.standard_normal((QUERIES, dimensions)).astype(np.float32)
+    queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+    exact = [[ids[i] for i in np.argsort(-(vectors @ query), kind="stable")[:K]] for query in queries]
+    queries = queries.tolist()
+    del vectors
+
+    # Warm-up (HNSW segment load, page cache)
+    chroma_search(collection, queries[:BATCH_SIZE], K)
+    numpy_search(index, queries[:BATCH_SIZE], K)
+
+    results = {}
+    for name, search, target in (("chroma", chroma_search, collection), ("numpy", numpy_search, index)):
+        single_ms, found = measure(search, target, queries, 1)
+        batch_ms, _ = measure(search, target, queries, BATCH_SIZE)
+        recall = np.mean([len(set(a) & set(b)) / K for a, b in zip(found, exact)])
+        results[name] = (single_ms, batch_ms, recall, peak_memory_kb(search, target, queries[:BATCH_SIZE]))
+
+    chroma_disk = directory_size(work_dir / "chroma_db") - directory_size(get_numpy_index_dir())
+    numpy_disk = directory_size(get_numpy_index_dir())
+
+    print("\n" + "=" * 60)
+    print("  RESULTS")
+    print("=" * 60)
+    print(f"  {'Backend':<8} {'ms/query':>9} {'ms/q batch' + str(BATCH_SIZE):>12} {'Recall@' + str(K):>10} "
+          f"{'Peak KB':>9}")
+    for name, (single_ms, batch_ms, recall, peak_kb) in results.items():
+        print(f"  {name:<8} {single_ms:>9.2f} {batch_ms:>12.2f} {recall:>10.3f} {peak_kb:>9.0f}")
+    print(f"\n  Disk: Chroma (SQLite + HNSW) {chroma_disk / 2**20:.1f} MB, "
+          f"NumPy matrix + IDs {numpy_disk / 2**20:.1f} MB")
+    print("  Peak KB: Python/NumPy allocations per search of a batch (Chroma's native")
+    print("  HNSW memory is not traced; the NumPy matrix is memory-mapped, so it sits")
+    print("  in the OS page cache rather than the Python heap)")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
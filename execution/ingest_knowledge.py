@@ -2,7 +2,9 @@
 Knowledge Ingestion Script
 Parses PDF documents and stores embeddings in ChromaDB.
 This script is IDEMPOTENT - running it twice won't duplicate vectors.
+Only new or changed PDFs are processed; pass --rebuild to re-ingest everything.
 """
+import argparse
 import os
 import sys
 from pathlib import Path
@@ -20,7 +22,7 @@ from dotenv import load_dotenv
 load_dotenv(backend_path / ".env")
 
 
-def main():
+def main(rebuild: bool = False):
     """Main ingestion function."""
     print("=" * 60)
     print("  MAINTENANCE AI COPILOT - Knowledge Ingestion")
@@ -40,14 +42,18 @@ def main():
     print("\n[2/3] Starting PDF ingestion...")
     print("-" * 40)
 
-    result = ingest_pdfs(clear_existing=True)
+    result = ingest_pdfs(clear_existing=rebuild)
 
     if result["success"]:
         print("-" * 40)
         print(f"\n[SUCCESS] Ingestion completed!")
         print(f"      Files processed: {result['files_processed']}")
+        print(f"      Files unchanged (skipped): {result.get('files_skipped', 0)}")
+        print(f"      Files removed: {result.get('files_removed', 0)}")
         print(f"      Pages loaded: {result.get('pages_loaded', 'N/A')}")
         print(f"      Chunks created: {result['chunks_created']}")
+        print(f"      Embeddings reused: {result.get('embeddings_reused', 0)}")
+        print(f"      Embeddings computed: {result.get('embeddings_computed', 0)}")
         print(f"      Total in DB: {result['total_documents_in_db']}")
 
         if result.get("processed_files"):
@@ -79,4 +85,11 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Ingest PDFs into the knowledge base")
+    parser.add_argument(
+        "--rebuild",
+        action="store_true",
+        help="Clear the collection and re-ingest every PDF",
+    )
+    args = parser.parse_args()
+    main(rebuild=args.rebuild)
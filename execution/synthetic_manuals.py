@@ -0,0 +1,25 @@
+"""
+Synthetic Manuals
+Text-dense PDFs for the ingestion memory benchmark and test (no imports
+of the app, no side effects, so tests can import it freely).
+"""
+from pathlib import Path
+
+PARAGRAPH = (
+    "Check the lubrication level of the reduction gear every 300 operating hours. "
+    "Replace the grease cartridge if the indicator shows red, then run the axis "
+    "through its full range of motion to distribute the lubricant evenly. "
+)
+
+
+def make_manual(path: Path, pages: int) -> None:
+    """Write a synthetic manual with a full page of text on every page."""
+    import fitz
+
+    doc = fitz.open()
+    for page_number in range(1, pages + 1):
+        page = doc.new_page()
+        text = f"Section {page_number}\n" + (PARAGRAPH * 14)
+        page.insert_textbox(fitz.Rect(50, 50, 560, 800), text, fontsize=9)
+    doc.save(str(path))
+    doc.close()
@@ -0,0 +1,195 @@
+"""
+Azure Document Intelligence Offline Test
+Runs the Document Intelligence path on cached results only
+(DOC_INTELLIGENCE_OFFLINE), without an endpoint or any network call.
+
+Writes cached AnalyzeResult JSON files for the page ranges of a synthetic
+5-page PDF split in ranges of 2 pages, then checks the page Documents:
+numbering across ranges, printed page labels, the whole-content fallback
+of a span-less page 1 (first range only), and that a cache miss raises.
+
+Usage:
+    python test_azure_di_offline.py
+    pytest test_azure_di_offline.py
+"""
+import gzip
+import json
+import sys
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+# Add backend to path for imports
+backend_path = Path(__file__).parent.parent / "backend"
+sys.path.insert(0, str(backend_path))
+
+PDF_PAGES = 5
+PAGES_PER_RANGE = 2
+OUTPUT_FORMAT = "markdown"
+
+
+def _page(page_number: int, content: str, text: Optional[str]) -> Dict:
+    """Page entry of an AnalyzeResult; no spans when text is None."""
+    page = {"pageNumber": page_number, "width": 8.5, "height": 11, "unit": "inch"}
+    if text is not None:
+        offset = content.index(text)
+        page["spans"] = [{"offset": offset, "length": len(text)}]
+    return page
+
+
+def _result(content: str, pages: List[Optional[str]], labels: Dict[int, str] = None) -> Dict:
+    """
+    AnalyzeResult JSON (REST field names, as stored by the cache) with one
+    entry per page: the page's text within content, or None for no spans.
+    """
+    paragraphs = [
+        {
+            "role": "pageNumber",
+            "content": label,
+            "boundingRegions": [{"pageNumber": page_number, "polygon": []}],
+            "spans": [],
+        }
+        for page_number, label in (labels or {}).items()
+    ]
+    return {
+        "apiVersion": "2024-11-30",
+        "modelId": "prebuilt-layout",
+        "content": content,
+        "pages": [_page(number, content, text) for number, text in enumerate(pages, start=1)],
+        "paragraphs": paragraphs,
+    }
+
+
+# Cached result of each range, by page offset
+RANGE_RESULTS = {
+    # Span-less page 1 of the first range: gets the whole range content
+    0: _result("Cover page\nSafety notes", [None, "Safety notes"]),
+    # Span-less page 1 of a later range (page 3): no Document
+    2: _result("Loose text\nTorque table", [None, "Torque table"], labels={2: "4-2"}),
+    4: _result("Lubrication intervals", ["Lubrication intervals"]),
+}
+
+
+@contextmanager
+def _offline_settings(cache_dir: Path) -> Iterator[None]:
+    """Replay-only Document Intelligence settings, restored on exit."""
+    from app.core.config import settings
+
+    overrides = {
+        "DOC_INTELLIGENCE_OFFLINE": True,
+        "DOC_INTELLIGENCE_CACHE_DIRECTORY": str(cache_dir),
+        "DOC_INTELLIGENCE_PAGES_PER_RANGE": PAGES_PER_RANGE,
+        "DOC_INTELLIGENCE_OUTPUT_FORMAT": OUTPUT_FORMAT,
+    }
+    saved = {name: getattr(settings, name) for name in overrides}
+    for name, value in overrides.items():
+        setattr(settings, name, value)
+    try:
+        yield
+    finally:
+        for name, value in saved.items():
+            setattr(settings, name, value)
+
+
+def _make_pdf(path: Path, pages: int, title: str) -> None:
+    import fitz
+
+    doc = fitz.open()
+    for page_number in range(1, pages + 1):
+        doc.new_page().insert_text((72, 72), f"{title} page {page_number}")
+    doc.save(str(path))
+    doc.close()
+
+
+def _write_cached_ranges(pdf_path: Path, cache_dir: Path) -> None:
+    """Store RANGE_RESULTS under the cache keys of the PDF's page ranges."""
+    from app.rag.azure_doc_intelligence import (
+        LAYOUT_MODEL, CachingDocumentIntelligenceClient, _body_sha256, _iter_page_ranges,
+    )
+
+    cache = CachingDocumentIntelligenceClient(None, cache_dir)
+    offsets = []
+    for page_offset, body in _iter_page_ranges(pdf_path, PAGES_PER_RANGE):
+        offsets.append(page_offset)
+        cache_path = cache.cache_path(_body_sha256(body), LAYOUT_MODEL, OUTPUT_FORMAT)
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        with gzip.open(cache_path, "wt", encoding="utf-8") as f:
+            json.dump(RANGE_RESULTS[page_offset], f)
+    assert offsets == sorted(RANGE_RESULTS)
+
+
+def test_offline_replay_numbers_pages_across_ranges() -> None:
+    """Cached range results become page Documents numbered by page of the original PDF."""
+    from app.rag.azure_doc_intelligence import analyze_pdf_with_azure_di, iter_azure_di_pages
+
+    with tempfile.TemporaryDirectory(prefix="azure_di_offline_") as tmp:
+        work_dir = Path(tmp)
+        cache_dir = work_dir / "doc_intelligence_cache"
+        pdf_path = work_dir / "Manual_Robot_Arm.pdf"
+        _make_pdf(pdf_path, PDF_PAGES, "Robot arm")
+
+        with _offline_settings(cache_dir):
+            _write_cached_ranges(pdf_path, cache_dir)
+            analyzed = analyze_pdf_with_azure_di(pdf_path)
+            documents = list(iter_azure_di_pages(analyzed, pdf_path, {"machine": "Robot Arm"}))
+
+    assert [r.page_offset for r in analyzed] == [0, 2, 4]
+    pages = {doc.metadata["page"]: doc for doc in documents}
+    assert sorted(pages) == [1, 2, 4, 5]
+    assert pages[1].page_content == "Cover page\nSafety notes"
+    assert pages[2].page_content == "Safety notes"
+    assert pages[4].page_content == "Torque table"
+    assert pages[4].metadata["page_label"] == "4-2"
+    assert pages[5].page_content == "Lubrication intervals"
+    for doc in documents:
+        assert doc.metadata["source"] == pdf_path.name
+        assert doc.metadata["machine"] == "Robot Arm"
+        assert doc.metadata["parser"] == "azure_doc_intelligence"
+
+
+def test_offline_cache_miss_raises() -> None:
+    """Without a cached result, offline mode raises instead of calling Azure."""
+    from app.rag.azure_doc_intelligence import analyze_pdf_with_azure_di
+
+    with tempfile.TemporaryDirectory(prefix="azure_di_offline_") as tmp:
+        work_dir = Path(tmp)
+        pdf_path = work_dir / "Manual_Conveyor.pdf"
+        _make_pdf(pdf_path, 1, "Conveyor")
+
+        with _offline_settings(work_dir / "doc_intelligence_cache"):
+            try:
+                analyze_pdf_with_azure_di(pdf_path)
+            except LookupError:
+                return
+    raise AssertionError("Offline analysis of an uncached PDF did not raise LookupError")
+
+
+def main():
+    """Run the offline Document Intelligence tests."""
+    print("=" * 50)
+    print("Azure Document Intelligence Offline Test")
+    print("=" * 50)
+
+    tests = {
+        "Page numbering across ranges": test_offline_replay_numbers_pages_across_ranges,
+        "Cache miss raises": test_offline_cache_miss_raises,
+    }
+    results = {}
+    for name, test in tests.items():
+        try:
+            test()
+            results[name] = True
+        except AssertionError as e:
+            print(f"  {name}: {e}")
+            results[name] = False
+
+    for name, passed in results.items():
+        icon = "OK" if passed else "FAIL"
+        print(f"  [{icon}] {name}")
+
+    sys.exit(0 if all(results.values()) else 1)
+
+
+if __name__ == "__main__":
+    main()
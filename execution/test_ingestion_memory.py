@@ -0,0 +1,148 @@
+"""
+Ingestion Memory Test
+Checks that the peak memory of the ingestion pipeline is bounded by batch
+size, not by corpus size.
+
+Ingests a synthetic corpus of 1x and Nx size into a throwaway ChromaDB
+(deterministic fake embeddings - no Azure calls) and fails when the
+tracemalloc peak of the larger run exceeds the smaller one by more than
+MAX_PEAK_GROWTH. The work directory is deleted and the environment,
+settings and embeddings factory are restored afterwards.
+
+Usage:
+    python test_ingestion_memory.py
+    pytest test_ingestion_memory.py
+"""
+import os
+import sys
+import tempfile
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+# Add backend to path for imports
+backend_path = Path(__file__).parent.parent / "backend"
+sys.path.insert(0, str(backend_path))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from synthetic_manuals import make_manual
+
+EMBEDDING_DIMENSIONS = 3072  # text-embedding-3-large
+PAGES_PER_MANUAL = 40
+# Corpus multiplier of the large run
+CORPUS_GROWTH = 4
+# Allowed ratio between the large and the small run's peak
+MAX_PEAK_GROWTH = 1.5
+
+
+@contextmanager
+def _offline_ingestion(work_dir: Path) -> Iterator[None]:
+    """
+    Point the app at throwaway directories with fake embeddings, and undo
+    every change on exit.
+    """
+    overrides = {
+        "CHROMA_PERSIST_DIRECTORY": str(work_dir / "chroma_db"),
+        "RAW_PDFS_DIRECTORY": str(work_dir / "raw_pdfs"),
+        "EMBEDDING_CACHE_DIRECTORY": str(work_dir / "embedding_cache"),
+        "USE_AZURE_DOC_INTELLIGENCE": "false",
+        "INGESTION_FIGURE_WORKERS": "1",
+        # Every run must embed its chunks, not replay the previous run's cache
+        "EMBEDDING_CACHE_ENABLED": "false",
+    }
+    saved_environ = {name: os.environ.get(name) for name in overrides}
+    # Read by the settings if this is their first import
+    os.environ.update(overrides)
+
+    from langchain_core.embeddings import DeterministicFakeEmbedding
+    from app.core.config import Settings, settings
+    import app.rag.embeddings as embeddings_module
+    import app.rag.vector_store as vector_store_module
+
+    # Also applied when the settings were already loaded by another test
+    values = Settings().model_dump(include=set(overrides))
+    saved_settings = {name: getattr(settings, name) for name in overrides}
+    for name, value in values.items():
+        setattr(settings, name, value)
+    saved_factory = embeddings_module.get_azure_embeddings
+    embeddings_module.get_azure_embeddings = lambda: DeterministicFakeEmbedding(size=EMBEDDING_DIMENSIONS)
+    try:
+        yield
+    finally:
+        embeddings_module.get_azure_embeddings = saved_factory
+        # The cached client and wrapper point at the work directory and
+        # hold the fake embeddings
+        vector_store_module._chroma_client = None
+        vector_store_module._vector_store = None
+        for name, value in saved_settings.items():
+            setattr(settings, name, value)
+        for name, value in saved_environ.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+
+
+def _peak_ingestion_memory(corpus_dir: Path) -> int:
+    """Ingest a directory from scratch and return the tracemalloc peak in bytes."""
+    from app.rag.ingestion import ingest_pdfs
+
+    tracemalloc.start()
+    try:
+        result = ingest_pdfs(pdf_directory=str(corpus_dir), clear_existing=True)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    assert result["success"], f"Ingestion failed: {result.get('error')}"
+    return peak
+
+
+def test_ingestion_memory_is_flat() -> None:
+    """Peak memory stays within MAX_PEAK_GROWTH while the corpus grows CORPUS_GROWTH times."""
+    with tempfile.TemporaryDirectory(prefix="ingestion_memory_") as tmp, \
+            _offline_ingestion(Path(tmp)):
+        work_dir = Path(tmp)
+
+        # Warm-up run so one-time allocations (clients, collection) are not counted
+        warmup_dir = work_dir / "warmup"
+        warmup_dir.mkdir()
+        make_manual(warmup_dir / "Warmup_Manual.pdf", 5)
+        _peak_ingestion_memory(warmup_dir)
+
+        peaks = {}
+        for manuals in (1, CORPUS_GROWTH):
+            corpus_dir = work_dir / f"corpus_{manuals}"
+            corpus_dir.mkdir()
+            for i in range(manuals):
+                make_manual(corpus_dir / f"Manual_Machine_{i:02d}.pdf", PAGES_PER_MANUAL)
+            peaks[manuals] = _peak_ingestion_memory(corpus_dir)
+
+    growth = peaks[CORPUS_GROWTH] / peaks[1]
+    print(f"  Corpus grew {CORPUS_GROWTH}x, peak memory grew {growth:.2f}x "
+          f"({peaks[1] / 1e6:.1f} MB -> {peaks[CORPUS_GROWTH] / 1e6:.1f} MB)")
+    assert growth <= MAX_PEAK_GROWTH, (
+        f"Peak memory grew {growth:.2f}x for a {CORPUS_GROWTH}x corpus "
+        f"(limit {MAX_PEAK_GROWTH}x)"
+    )
+
+
+def main():
+    """Run the memory test."""
+    print("=" * 50)
+    print("Ingestion Memory Test")
+    print("=" * 50)
+
+    try:
+        test_ingestion_memory_is_flat()
+    except AssertionError as e:
+        print(f"  [FAIL] {e}")
+        sys.exit(1)
+
+    print("  [OK] Peak memory is flat across corpus sizes")
+    sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
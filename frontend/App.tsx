@@ -216,6 +216,16 @@ const App: React.FC = () => {
                 );
               }
             },
+            onDiscard: () => {
+              // The streamed text preceded a tool call: remove it and keep
+              // waiting for the answer
+              streamedContent = '';
+              if (messageCreated) {
+                setMessages(prev => prev.filter(msg => msg.id !== aiMessageId));
+                messageCreated = false;
+              }
+              setIsThinking(true);
+            },
             onSources: (sources) => {
               // Convert sources to references
               streamedReferences = sources.map((source: any, index: number) => ({
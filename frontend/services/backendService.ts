@@ -46,6 +46,8 @@ export interface StatusUpdate {
 // Callbacks for streaming
 interface StreamCallbacks {
   onToken: (token: string) => void;
+  // Drop the tokens streamed so far (agent text that preceded a tool call)
+  onDiscard?: () => void;
   onSources: (sources: SourceDocument[]) => void;
   onMetadata: (metadata: RAGMetadata) => void;
   onStatus?: (status: StatusUpdate) => void;
@@ -200,6 +202,8 @@ export const sendMessageStreaming = async (
             } else if (currentEvent === 'token') {
               const parsed = JSON.parse(data);
               callbacks.onToken(parsed.token);
+            } else if (currentEvent === 'discard') {
+              callbacks.onDiscard?.();
             } else if (currentEvent === 'sources') {
               const sources = JSON.parse(data);
               callbacks.onSources(sources);